@@ -1,8 +1,11 @@
 import logging
 from argparse import Namespace
+from pathlib import Path
+from urllib.parse import quote
 
 from plastron.cli.commands import BaseCommand
 from plastron.jobs.exportjob import ExportJob
+from plastron.jobs.timings import format_timings
 from plastron.serializers import SERIALIZER_CLASSES
 
 logger = logging.getLogger(__name__)
@@ -16,7 +19,6 @@ def configure_cli(subparsers):
     parser.add_argument(
         '-o', '--output-dest',
         help='Where to send the export. Can be a local filename or an SFTP URI',
-        required=True,
         action='store'
     )
     parser.add_argument(
@@ -29,7 +31,6 @@ def configure_cli(subparsers):
         help='Format for exported metadata',
         action='store',
         choices=SERIALIZER_CLASSES.keys(),
-        required=True
     )
     parser.add_argument(
         '--uri-template',
@@ -46,6 +47,76 @@ def configure_cli(subparsers):
         help='Include only binaries with a MIME type from this list',
         action='store'
     )
+    parser.add_argument(
+        '--workers',
+        help='Number of objects to read from the repository concurrently; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--download-workers',
+        help='Number of binaries to download concurrently; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--compress-level',
+        help=(
+            'Compression level (0-9) for the ZIP file; 0 stores the files without compression. '
+            'Already-compressed binaries (e.g., JPEG images) are always stored without compression'
+        ),
+        type=int,
+        choices=range(10),
+        metavar='LEVEL',
+        action='store'
+    )
+    parser.add_argument(
+        '--previous-export',
+        help=(
+            'ZIP file of a previous export of the same resources. Binaries that have not changed '
+            'since then are copied from it instead of downloaded from the repository'
+        ),
+        metavar='ZIP_FILE',
+        action='store'
+    )
+    parser.add_argument(
+        '--skip-unchanged',
+        help='Leave binaries that have not changed since the previous export out of the export',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--job-id',
+        help=(
+            'Save the progress of the export in the jobs directory under this id, '
+            'so that it can be resumed with --resume if it fails'
+        ),
+        action='store'
+    )
+    parser.add_argument(
+        '--resume',
+        help=(
+            'Resume an export that was started with --job-id, using the same options as before. '
+            'Items that were already exported are not fetched again'
+        ),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--log-batch-size',
+        help='number of rows to buffer before writing them to the export job logs; defaults to 1',
+        type=int,
+        default=1,
+        metavar='ROWS',
+        action='store'
+    )
+    parser.add_argument(
+        '--log-fsync-interval',
+        help='sync the export job logs to disk at most this often; by default, they are not explicitly synced',
+        type=float,
+        metavar='SECONDS',
+        action='store'
+    )
     parser.add_argument(
         'uris',
         nargs='*',
@@ -55,15 +126,48 @@ def configure_cli(subparsers):
 
 
 class Command(BaseCommand):
+    @property
+    def jobs_dir(self) -> Path:
+        return Path(self.config.get('JOBS_DIR', 'jobs'))
+
     def __call__(self, args: Namespace):
-        export_job = ExportJob(
-            context=self.context,
-            export_binaries=args.export_binaries,
-            binary_types=args.binary_types,
-            uris=args.uris,
-            export_format=args.format,
-            output_dest=args.output_dest,
-            uri_template=args.uri_template,
-            key=args.key,
-        )
+        job_dir = self.jobs_dir / quote(args.job_id, safe='') if args.job_id is not None else None
+        if args.resume:
+            if job_dir is None:
+                raise RuntimeError('Resuming an export requires a job id')
+            logger.info(f'Resuming export job {args.job_id}')
+            export_job = ExportJob.resume_from(
+                context=self.context,
+                job_dir=str(job_dir),
+                key=args.key,
+                workers=args.workers,
+                download_workers=args.download_workers,
+                log_batch_size=args.log_batch_size,
+                log_fsync_interval=args.log_fsync_interval,
+            )
+        else:
+            if args.output_dest is None or args.format is None:
+                raise RuntimeError('An output destination and format are required unless resuming an export')
+            export_job = ExportJob(
+                context=self.context,
+                export_binaries=args.export_binaries,
+                binary_types=args.binary_types,
+                uris=args.uris,
+                export_format=args.format,
+                output_dest=args.output_dest,
+                uri_template=args.uri_template,
+                key=args.key,
+                workers=args.workers,
+                download_workers=args.download_workers,
+                compress_level=args.compress_level,
+                previous_export=args.previous_export,
+                skip_unchanged=args.skip_unchanged,
+                job_dir=str(job_dir) if job_dir is not None else None,
+                log_batch_size=args.log_batch_size,
+                log_fsync_interval=args.log_fsync_interval,
+            )
         self.run(export_job.run())
+
+        # time spent in each phase, slowest first
+        for line in format_timings(self.result.get('timings', {})):
+            logger.info(f'Timing: {line}')
@@ -7,6 +7,7 @@ from plastron.cli.commands import BaseCommand
 from plastron.jobs import Jobs
 from plastron.jobs.importjob import ImportConfig, ImportJob
 from plastron.jobs.importjob.ndnp import NDNPBatch, write_import_csv
+from plastron.jobs.timings import format_timings
 from plastron.utils import datetimestamp, uri_or_curie
 
 from plastron.models import ModelClassNotFoundError, get_model_from_name
@@ -127,7 +128,8 @@ def configure_cli(subparsers):
             'where to find binaries; either a path to a directory, '
             'a "zip:<path to zipfile>" URI, an SFTP URI in the form '
             '"sftp://<user>@<host>/<path to dir>", or a URI in the '
-            'form "zip+sftp://<user>@<host>/<path to zipfile>"'
+            'form "zip+sftp://<user>@<host>/<path to zipfile>" or '
+            '"zip+https://<host>/<path to zipfile>"'
         ),
         metavar='LOCATION',
         action='store'
@@ -178,6 +180,77 @@ def configure_cli(subparsers):
         help='automatically publish all items in this import',
         action='store_true',
     )
+    parser.add_argument(
+        '--workers',
+        help='number of rows to process concurrently; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--processes',
+        help='number of processes to use with --validate-only; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--prefetch',
+        help='number of rows ahead to read existing items in the background; defaults to 0 (off)',
+        type=int,
+        default=0,
+        metavar='ROWS',
+        action='store'
+    )
+    parser.add_argument(
+        '--batch-size',
+        help='number of rows to load in a single transaction; defaults to 1',
+        type=int,
+        default=1,
+        metavar='ROWS',
+        action='store'
+    )
+    parser.add_argument(
+        '--batch-timeout',
+        help='commit a batch early once its transaction has been open this many seconds',
+        type=float,
+        metavar='SECONDS',
+        action='store'
+    )
+    parser.add_argument(
+        '--retries',
+        help=(
+            'number of times to retry a row that fails because of a transient error '
+            '(e.g., a timeout or a 503 response) at the end of the run; defaults to 2'
+        ),
+        type=int,
+        default=2,
+        metavar='N',
+        action='store'
+    )
+    parser.add_argument(
+        '--retry-backoff',
+        help='seconds to wait before the first round of retries, doubling on each round; defaults to 5',
+        type=float,
+        default=5.0,
+        metavar='SECONDS',
+        action='store'
+    )
+    parser.add_argument(
+        '--log-batch-size',
+        help='number of rows to buffer before writing them to the job logs; defaults to 1',
+        type=int,
+        default=1,
+        metavar='ROWS',
+        action='store'
+    )
+    parser.add_argument(
+        '--log-fsync-interval',
+        help='sync the job logs to disk at most this often; by default, they are not explicitly synced',
+        type=float,
+        metavar='SECONDS',
+        action='store'
+    )
     parser.add_argument(
         'import_file', nargs='?',
         help='name of the file to import from',
@@ -270,7 +343,20 @@ class Command(BaseCommand):
             percentage=args.percentage,
             validate_only=args.validate_only,
             publish=args.publish,
+            workers=args.workers,
+            processes=args.processes,
+            prefetch=args.prefetch,
+            batch_size=args.batch_size,
+            batch_timeout=args.batch_timeout,
+            retries=args.retries,
+            retry_backoff=args.retry_backoff,
+            log_batch_size=args.log_batch_size,
+            log_fsync_interval=args.log_fsync_interval,
         ))
 
         for key, value in self.result['count'].items():
             logger.info(f"{key.title().replace('_', ' ')}: {value}")
+
+        # time spent in each phase, slowest first
+        for line in format_timings(self.result.get('timings', {})):
+            logger.info(f'Timing: {line}')
@@ -60,6 +60,30 @@ def configure_cli(subparsers):
         help='File containing a list of URIs to update',
         action='store'
     )
+    parser.add_argument(
+        '--workers',
+        help='number of URIs to update concurrently, each in its own transaction; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--resource-workers',
+        help='number of resources within each URI\'s tree to update concurrently; defaults to 1',
+        type=int,
+        default=1,
+        action='store'
+    )
+    parser.add_argument(
+        '--batch-size',
+        help=(
+            'update the resources in transactions of this many resources each, '
+            'instead of one transaction per URI'
+        ),
+        type=int,
+        metavar='N',
+        action='store'
+    )
     parser.add_argument(
         'uris', nargs='*',
         help='URIs of repository objects to update'
@@ -110,5 +134,8 @@ class Command(BaseCommand):
             traverse=traverse,
             completed=completed_log,
             dry_run=args.dry_run,
+            workers=args.workers,
+            resource_workers=args.resource_workers,
+            batch_size=args.batch_size,
         )
         self.run(update_job.run())
@@ -1,9 +1,45 @@
+import logging
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from itertools import count
+from time import monotonic
+from typing import Iterable, Optional
+
 from requests import Response
 
 from plastron.client.base import Client
 from plastron.client.endpoint import Endpoint
 from plastron.client.utils import SessionHeaderAttribute
 
+logger = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({'GET', 'HEAD'})
+"""HTTP methods that may be sent to any origin."""
+
+UNAVAILABLE_STATUSES = frozenset({HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.GATEWAY_TIMEOUT})
+"""HTTP status codes that mark an origin as unavailable."""
+
+ORIGIN_RETRY_INTERVAL = 30
+"""Number of seconds to wait before sending requests to an unavailable origin again."""
+
+
+@dataclass(eq=False)
+class Origin:
+    """A backend server that requests are sent to, along with its load and health."""
+    endpoint: Endpoint
+    outstanding: int = 0
+    """Number of requests sent to this origin that have not yet completed."""
+    unavailable_until: float = 0.0
+    """Time (from `time.monotonic()`) before which no requests are sent to this origin."""
+
+    def __str__(self):
+        return str(self.endpoint.url)
+
+    @property
+    def available(self) -> bool:
+        return monotonic() >= self.unavailable_until
+
 
 class ProxiedClient(Client):
     """HTTP client that behaves as if it were sending reversed proxied requests
@@ -11,7 +47,18 @@ class ProxiedClient(Client):
     `origin_endpoint` for the actual URL to make requests to.
 
     Adds `X-Forwarded-Host` and `X-Forwarded-Proto` headers to requests, using
-    the appropriate values from `endpoint`."""
+    the appropriate values from `endpoint`.
+
+    Additional origins serving the same repository may be given as `read_endpoints`.
+    `GET` and `HEAD` requests are then balanced across the `origin_endpoint` (the
+    primary) and the read endpoints, sending each request to the available origin
+    with the fewest requests in progress. All other requests, and any requests
+    within a transaction, are always sent to the primary.
+
+    An origin that cannot be connected to, or responds with a 502, 503, or 504
+    status, is considered unavailable for `retry_interval` seconds, and the request
+    is retried on another origin. The primary is used as a last resort, even when
+    it is unavailable."""
 
     forwarded_host = SessionHeaderAttribute('X-Forwarded-Host')
     """`X-Forwarded-Host` header value, taken from the `endpoint` host (or host and port,
@@ -19,10 +66,24 @@ class ProxiedClient(Client):
     forwarded_protocol = SessionHeaderAttribute('X-Forwarded-Proto')
     """`X-Forwarded-Proto` header value, taken from the `endpoint` URL scheme."""
 
-    def __init__(self, endpoint: Endpoint, origin_endpoint: Endpoint, **kwargs):
+    def __init__(
+            self,
+            endpoint: Endpoint,
+            origin_endpoint: Endpoint,
+            read_endpoints: Iterable[Endpoint] = (),
+            retry_interval: float = ORIGIN_RETRY_INTERVAL,
+            **kwargs,
+    ):
         super().__init__(endpoint, **kwargs)
         self.origin_endpoint = origin_endpoint
-        """Actual request URL."""
+        """Actual request URL of the primary origin."""
+        self.primary = Origin(origin_endpoint)
+        self.read_origins: list[Origin] = [self.primary, *(Origin(e) for e in read_endpoints)]
+        """Origins that `GET` and `HEAD` requests may be sent to, starting with the primary."""
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        # rotates the starting point when choosing between equally loaded origins
+        self._rotation = count()
 
         forwarded_url = self.endpoint.url
         if forwarded_url.port:
@@ -32,9 +93,68 @@ class ProxiedClient(Client):
             self.forwarded_host = forwarded_url.hostname
         self.forwarded_protocol = forwarded_url.scheme
 
+    @staticmethod
+    def is_pinned(method: str, repo_path: str) -> bool:
+        """Whether a request must be sent to the primary origin: either it is not a
+        read request, or it is within a transaction."""
+        return method.upper() not in READ_METHODS or repo_path.startswith('/tx:')
+
+    def choose_origin(self, exclude: Iterable[Origin] = ()) -> Optional[Origin]:
+        """Returns the available read origin, not in `exclude`, with the fewest requests
+        in progress. If no read origins are available, returns the primary, unless it
+        is excluded, in which case returns `None`."""
+        with self._lock:
+            start = next(self._rotation) % len(self.read_origins)
+            candidates = [
+                origin for origin in self.read_origins[start:] + self.read_origins[:start]
+                if origin.available and origin not in exclude
+            ]
+            if candidates:
+                return min(candidates, key=lambda origin: origin.outstanding)
+            if self.primary not in exclude:
+                return self.primary
+            return None
+
+    def mark_unavailable(self, origin: Origin, reason: str):
+        logger.warning(f'Origin {origin} is unavailable ({reason}); retrying it in {self.retry_interval} seconds')
+        with self._lock:
+            origin.unavailable_until = monotonic() + self.retry_interval
+
+    def send(self, origin: Origin, method: str, repo_path: str, **kwargs) -> Response:
+        """Send the request to `origin`, keeping count of its outstanding requests."""
+        with self._lock:
+            origin.outstanding += 1
+        try:
+            return super().request(method, origin.endpoint.url + repo_path, **kwargs)
+        finally:
+            with self._lock:
+                origin.outstanding -= 1
+
     def request(self, method: str, url: str, **kwargs) -> Response:
-        """Swaps in the `origin_endpoint` for the external `endpoint` of the requested
+        """Swaps in the URL of an origin for the external `endpoint` of the requested
         `url`, then sends the request using `Client.request`."""
         repo_path = self.endpoint.repo_path(url)
-        proxied_url = self.origin_endpoint.url + repo_path
-        return super().request(method, proxied_url, **kwargs)
+        if self.is_pinned(method, repo_path) or len(self.read_origins) == 1:
+            return self.send(self.primary, method, repo_path, **kwargs)
+
+        tried = []
+        origin = self.choose_origin()
+        while True:
+            tried.append(origin)
+            try:
+                response = self.send(origin, method, repo_path, **kwargs)
+            except RuntimeError as e:
+                # connection error
+                self.mark_unavailable(origin, str(e))
+                origin = self.choose_origin(exclude=tried)
+                if origin is None:
+                    raise
+                continue
+            if response.status_code in UNAVAILABLE_STATUSES:
+                self.mark_unavailable(origin, f'{response.status_code} {response.reason}')
+                next_origin = self.choose_origin(exclude=tried)
+                if next_origin is not None:
+                    response.close()
+                    origin = next_origin
+                    continue
+            return response
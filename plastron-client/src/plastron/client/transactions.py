@@ -1,15 +1,19 @@
+import heapq
 import logging
 import os
 import threading
 from contextlib import contextmanager
 from http import HTTPStatus
+from itertools import count
+from time import monotonic
 from typing import Optional, Any
 
 from rdflib import URIRef, Graph
 from requests import ConnectionError, Response
 
-from plastron.client.base import Client, ClientError
+from plastron.client.base import Client
 from plastron.client.endpoint import Endpoint
+from plastron.client.proxied import ProxiedClient
 from plastron.client.utils import TypedText
 
 logger = logging.getLogger(__name__)
@@ -28,7 +32,9 @@ def transaction(client, keep_alive: int = 90):
         logger.info(f'Created transaction at {txn_client.tx}')
         try:
             yield txn_client
-        except ClientError:
+        except Exception:
+            # roll back on any failure, so the transaction does not
+            # linger on the server until it times out
             txn_client.rollback()
             raise
         else:
@@ -69,7 +75,7 @@ class Transaction:
 
     def stop(self):
         """
-        Stop the keep-alive thread and set the `active` flag to `False`. This should
+        Stop the keep-alive and set the `active` flag to `False`. This should
         always be called before committing or rolling back a transaction.
         """
         self.keep_alive.stop()
@@ -84,15 +90,23 @@ class TransactionClient(Client):
 
     @classmethod
     def from_client(cls, client: Client):
-        """Build a `TransactionClient` from a regular `Client` object."""
-        return cls(
-            endpoint=client.endpoint,
+        """Build a `TransactionClient` from a regular `Client` object. If `client` is
+        a `ProxiedClient`, returns a `ProxiedTransactionClient` that sends all the
+        requests in the transaction to the primary origin."""
+        kwargs = dict(
             auth=client.session.auth,
             server_cert=client.session.verify,
             ua_string=client.ua_string,
             on_behalf_of=client.delegated_user,
             load_binaries=client.load_binaries,
         )
+        if isinstance(client, ProxiedClient):
+            return ProxiedTransactionClient(
+                endpoint=client.endpoint,
+                origin_endpoint=client.origin_endpoint,
+                **kwargs,
+            )
+        return cls(endpoint=client.endpoint, **kwargs)
 
     def __init__(self, endpoint: Endpoint, **kwargs):
         super().__init__(endpoint, **kwargs)
@@ -100,13 +114,15 @@ class TransactionClient(Client):
         """The transaction"""
 
     def request(self, method: str, url: str, **kwargs) -> Response:
-        """Makes sure the transaction keep-alive thread hasn't failed, and inserts the transaction
+        """Makes sure the transaction keep-alive hasn't failed, and inserts the transaction
         id into the request URL. Then calls the `Client.request()` method with the same arguments.
 
-        Raises a `RuntimeError` if the transaction keep-alive thread has failed."""
+        Raises a `RuntimeError` if the transaction keep-alive has failed."""
         if self.tx.keep_alive.failed.is_set():
             raise RuntimeError('Transaction keep-alive failed') from self.tx.keep_alive.exception
 
+        # any request keeps the transaction alive, so postpone the next keep-alive
+        self.tx.keep_alive.touch()
         request_url = str(self.insert_transaction_uri(URIRef(url)))
         return super().request(method, request_url, **kwargs)
 
@@ -269,19 +285,29 @@ class TransactionClient(Client):
             )
 
 
-class TransactionKeepAlive(threading.Thread):
-    """Thread to run in the background while a long-running transaction is being
-    processed, to ensure that the transaction does not time out due to inactivity.
-    Based on <https://stackoverflow.com/a/12435256/5124907>"""
+class ProxiedTransactionClient(TransactionClient, ProxiedClient):
+    """Transaction client for a `ProxiedClient`. The transaction identifier is added
+    to the request URL first, so the request is then pinned to the primary origin."""
+    pass
+
+
+class TransactionKeepAlive:
+    """Keeps a long-running transaction from timing out due to inactivity. Once
+    started, the shared `TransactionKeepAliveScheduler` sends a transaction
+    maintenance request whenever the transaction has had no other requests for
+    `interval` seconds."""
 
     def __init__(self, txn_client: TransactionClient, interval: int):
-        """Create a transaction keep-alive thread."""
-        super().__init__(name='TransactionKeepAlive')
+        """Create a transaction keep-alive."""
         self.txn_client: TransactionClient = txn_client
         """The transaction client."""
 
         self.interval: int = interval
-        """Time between transaction maintenance requests."""
+        """Maximum time without any requests in the transaction before sending a
+        transaction maintenance request."""
+
+        self.last_activity: float = monotonic()
+        """Time (from `time.monotonic()`) of the most recent request in the transaction."""
 
         self.stopped: threading.Event = threading.Event()
         """Flag indicating whether this transaction has been stopped."""
@@ -293,24 +319,124 @@ class TransactionKeepAlive(threading.Thread):
         """If this transaction could not be maintained, this holds the
         raised `TransactionError`."""
 
-    def run(self):
-        """Send a transaction maintenance request every `interval` seconds.
-        If there is a `TransactionError` raised, set the `stopped` and `failed`
-        flags on this thread, and store the raised exception as `exception`."""
-        while not self.stopped.wait(self.interval):
-            try:
-                self.txn_client.maintain()
-            except TransactionError as e:
-                # stop trying to maintain the transaction
-                self.stop()
-                # set the "failed" flag to communicate back to the main thread
-                # that we were unable to maintain the transaction
-                self.exception = e
-                self.failed.set()
+    def start(self):
+        """Schedule the first transaction maintenance check."""
+        self.touch()
+        get_keep_alive_scheduler().schedule(self, self.last_activity + self.interval)
+
+    def touch(self):
+        """Record that there has just been a request in the transaction."""
+        self.last_activity = monotonic()
+
+    def refresh(self) -> Optional[float]:
+        """Send a transaction maintenance request, unless there has been another
+        request in the transaction within the last `interval` seconds. Returns the
+        time at which to check again, or `None` if this keep-alive has stopped.
+
+        If the transaction cannot be maintained, set the `stopped` and `failed`
+        flags, and store the exception as `exception`. The next request in the
+        transaction raises an error."""
+        if self.stopped.is_set():
+            return None
+        idle_until = self.last_activity + self.interval
+        if idle_until > monotonic():
+            # there has been a recent request in the transaction
+            return idle_until
+        try:
+            self.txn_client.maintain()
+        except Exception as e:
+            if not isinstance(e, TransactionError):
+                e = TransactionError(f'Failed to maintain transaction {self.txn_client.tx}: {e}')
+            # stop trying to maintain the transaction
+            self.stop()
+            # set the "failed" flag to communicate back to the owning thread
+            # that we were unable to maintain the transaction
+            self.exception = e
+            self.failed.set()
+            return None
+        self.touch()
+        return self.last_activity + self.interval
 
     def stop(self):
-        """Set the `stopped` flag on this thread."""
+        """Set the `stopped` flag on this keep-alive."""
         self.stopped.set()
+        get_keep_alive_scheduler().wake()
+
+
+class TransactionKeepAliveScheduler:
+    """Sends the transaction maintenance requests for all the open transactions of
+    a process from a single background thread, using a heap of the times at which
+    each transaction needs to be checked. The thread runs only while there are
+    open transactions."""
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, TransactionKeepAlive]] = []
+        # tie-breaker, so keep-alives with the same deadline are never compared
+        self._sequence = count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, keep_alive: TransactionKeepAlive, deadline: float):
+        """Check `keep_alive` at `deadline` (a time from `time.monotonic()`)."""
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._sequence), keep_alive))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='TransactionKeepAlive', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def wake(self):
+        """Wake up the scheduler thread, so that it drops any stopped keep-alives."""
+        with self._condition:
+            self._condition.notify()
+
+    def _next_due(self) -> Optional[TransactionKeepAlive]:
+        """Wait until the earliest deadline, and return the keep-alive that is due.
+        Returns `None`, and lets the thread exit, once there are no open transactions."""
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2].stopped.is_set():
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._thread = None
+                    return None
+                deadline = self._heap[0][0]
+                timeout = deadline - monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._heap)[2]
+                self._condition.wait(timeout)
+
+    def _run(self):
+        while keep_alive := self._next_due():
+            # the maintenance request is sent without holding the lock,
+            # so that other transactions can still be scheduled or stopped
+            deadline = keep_alive.refresh()
+            if deadline is not None:
+                self.schedule(keep_alive, deadline)
+
+
+_keep_alive_scheduler: Optional[TransactionKeepAliveScheduler] = None
+_keep_alive_scheduler_lock = threading.Lock()
+
+
+def get_keep_alive_scheduler() -> TransactionKeepAliveScheduler:
+    """Returns the keep-alive scheduler shared by all the transactions of this process."""
+    global _keep_alive_scheduler
+    with _keep_alive_scheduler_lock:
+        if _keep_alive_scheduler is None:
+            _keep_alive_scheduler = TransactionKeepAliveScheduler()
+        return _keep_alive_scheduler
+
+
+def _reset_keep_alive_scheduler():
+    # a forked child process does not inherit the scheduler thread
+    global _keep_alive_scheduler, _keep_alive_scheduler_lock
+    _keep_alive_scheduler = None
+    _keep_alive_scheduler_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_keep_alive_scheduler)
 
 
 class TransactionError(Exception):
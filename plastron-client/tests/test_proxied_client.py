@@ -1,10 +1,11 @@
 from unittest.mock import MagicMock
 
 import pytest
-from requests import Session
+from requests import ConnectionError, Session
 
 from plastron.client import Endpoint
 from plastron.client.proxied import ProxiedClient
+from plastron.client.transactions import ProxiedTransactionClient, Transaction, TransactionClient
 
 
 @pytest.mark.parametrize(
@@ -42,3 +43,86 @@ def test_proxied_client_request():
     )
     client.get('https://example.com/fcrepo/rest/dc/2021')
     mock_session.request.assert_called_once_with('GET', 'http://localhost:8080/fcrepo/rest/dc/2021')
+
+
+@pytest.fixture
+def balanced_client():
+    mock_session = MagicMock(spec=Session, headers={}, verify=True)
+    mock_session.request.return_value = MagicMock(status_code=200)
+    return ProxiedClient(
+        endpoint=Endpoint('https://example.com/fcrepo/rest'),
+        origin_endpoint=Endpoint('http://primary:8080/fcrepo/rest'),
+        read_endpoints=[Endpoint('http://replica1:8080/fcrepo/rest'), Endpoint('http://replica2:8080/fcrepo/rest')],
+        session=mock_session,
+    )
+
+
+def requested_hosts(client: ProxiedClient) -> list[str]:
+    return [call.args[1].split('/')[2].split(':')[0] for call in client.session.request.call_args_list]
+
+
+def test_proxied_client_balances_reads(balanced_client):
+    for _ in range(6):
+        balanced_client.get('https://example.com/fcrepo/rest/foo')
+    hosts = requested_hosts(balanced_client)
+    assert hosts.count('primary') == hosts.count('replica1') == hosts.count('replica2') == 2
+
+
+def test_proxied_client_least_outstanding(balanced_client):
+    primary, replica1, replica2 = balanced_client.read_origins
+    primary.outstanding = 3
+    replica1.outstanding = 1
+    replica2.outstanding = 2
+    balanced_client.head('https://example.com/fcrepo/rest/foo')
+    assert requested_hosts(balanced_client) == ['replica1']
+
+
+@pytest.mark.parametrize(
+    ('method', 'url'),
+    [
+        ('POST', 'https://example.com/fcrepo/rest/foo'),
+        ('PUT', 'https://example.com/fcrepo/rest/foo'),
+        ('PATCH', 'https://example.com/fcrepo/rest/foo'),
+        ('DELETE', 'https://example.com/fcrepo/rest/foo'),
+        ('GET', 'https://example.com/fcrepo/rest/tx:123456/foo'),
+    ]
+)
+def test_proxied_client_pins_to_primary(balanced_client, method, url):
+    for _ in range(3):
+        balanced_client.request(method, url)
+    assert requested_hosts(balanced_client) == ['primary'] * 3
+
+
+def test_proxied_client_fails_over(balanced_client):
+    def request(_method, url, **_kwargs):
+        if 'replica1' in url:
+            raise ConnectionError('connection refused')
+        if 'replica2' in url:
+            return MagicMock(status_code=503, reason='Service Unavailable')
+        return MagicMock(status_code=200)
+
+    balanced_client.session.request.side_effect = request
+    for _ in range(3):
+        assert balanced_client.get('https://example.com/fcrepo/rest/foo').status_code == 200
+    # once marked unavailable, the replicas are not tried again
+    assert requested_hosts(balanced_client).count('replica1') == 1
+    assert requested_hosts(balanced_client).count('replica2') == 1
+    assert requested_hosts(balanced_client)[-2:] == ['primary', 'primary']
+
+
+def test_proxied_client_all_unavailable(balanced_client):
+    balanced_client.session.request.side_effect = ConnectionError('connection refused')
+    with pytest.raises(RuntimeError):
+        balanced_client.get('https://example.com/fcrepo/rest/foo')
+    assert sorted(requested_hosts(balanced_client)) == ['primary', 'replica1', 'replica2']
+
+
+def test_proxied_transaction_client(balanced_client):
+    txn_client = TransactionClient.from_client(balanced_client)
+    assert isinstance(txn_client, ProxiedTransactionClient)
+    txn_client.tx = Transaction(client=txn_client, uri='https://example.com/fcrepo/rest/tx:123456', active=False)
+    txn_client.session = balanced_client.session
+    txn_client.get('https://example.com/fcrepo/rest/foo')
+    balanced_client.session.request.assert_called_once_with(
+        'GET', 'http://primary:8080/fcrepo/rest/tx:123456/foo'
+    )
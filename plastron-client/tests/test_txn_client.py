@@ -1,8 +1,19 @@
+import threading
+from time import sleep
+from unittest.mock import MagicMock
+
 import pytest
+import requests
 from rdflib import URIRef, Literal
 
-from plastron.client import Endpoint
-from plastron.client.transactions import transaction, TransactionClient, Transaction, TransactionError
+from plastron.client import Client, Endpoint
+from plastron.client.transactions import (
+    Transaction,
+    TransactionClient,
+    TransactionError,
+    TransactionKeepAlive,
+    transaction,
+)
 
 
 @pytest.fixture()
@@ -57,3 +68,70 @@ def test_cannot_nest_transactions(txn_client):
             pass
 
     assert str(e.value).startswith('Failed to create transaction')
+
+
+def test_rollback_on_any_error(monkeypatch, endpoint):
+    requests_made = []
+
+    def request(_session, method, url, **_kwargs):
+        requests_made.append((method, url))
+        if url == endpoint.transaction_endpoint:
+            return MagicMock(status_code=201, headers={'Location': 'http://example.com/repo/tx:123456'})
+        return MagicMock(status_code=204)
+
+    monkeypatch.setattr(requests.Session, 'request', request)
+    with pytest.raises(ValueError):
+        with transaction(Client(endpoint=endpoint)):
+            raise ValueError('not a client error')
+
+    assert requests_made[-1] == ('POST', 'http://example.com/repo/tx:123456/fcr:tx/fcr:rollback')
+
+
+@pytest.fixture
+def keep_alives():
+    started = []
+
+    def _keep_alive(txn_client, interval):
+        keep_alive = TransactionKeepAlive(txn_client, interval)
+        keep_alive.start()
+        started.append(keep_alive)
+        return keep_alive
+
+    yield _keep_alive
+    for keep_alive in started:
+        keep_alive.stop()
+
+
+def test_keep_alive_maintains_idle_transaction(keep_alives):
+    txn_client = MagicMock()
+    keep_alives(txn_client, 0.05)
+    sleep(0.3)
+    assert txn_client.maintain.call_count >= 2
+
+
+def test_keep_alive_skips_active_transaction(keep_alives):
+    txn_client = MagicMock()
+    keep_alive = keep_alives(txn_client, 0.1)
+    for _ in range(30):
+        keep_alive.touch()
+        sleep(0.01)
+    txn_client.maintain.assert_not_called()
+
+
+def test_keep_alive_failure(endpoint, keep_alives):
+    txn_client = TransactionClient(endpoint=endpoint)
+    txn_client.tx = Transaction(client=txn_client, uri='http://example.com/repo/tx:123456', active=False)
+    txn_client.maintain = MagicMock(side_effect=TransactionError('transaction expired'))
+    txn_client.tx.keep_alive = keep_alives(txn_client, 0.01)
+
+    assert txn_client.tx.keep_alive.failed.wait(timeout=1)
+    assert isinstance(txn_client.tx.keep_alive.exception, TransactionError)
+    with pytest.raises(RuntimeError):
+        txn_client.get('http://example.com/repo/foo')
+
+
+def test_keep_alive_uses_one_thread(keep_alives):
+    for _ in range(5):
+        keep_alives(MagicMock(), 60)
+    threads = [thread for thread in threading.enumerate() if thread.name == 'TransactionKeepAlive']
+    assert len(threads) == 1
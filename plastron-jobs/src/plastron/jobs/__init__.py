@@ -1,5 +1,7 @@
 import dataclasses
+import json
 import logging
+import os
 import re
 import urllib.parse
 from dataclasses import dataclass
@@ -12,11 +14,26 @@ from plastron.jobs.logs import ItemLog
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_FILENAME = 'summary.json'
+
 
 def is_run_dir(path: Path) -> bool:
     return path.is_dir() and re.match(r'^\d{14}$', path.name)
 
 
+def load_summary(job_dir: Path) -> Optional[dict[str, Any]]:
+    """Read the summary file in the given job directory. Returns `None` if there
+    is no summary, or it cannot be read."""
+    try:
+        with (job_dir / SUMMARY_FILENAME).open() as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f'Unable to read summary for job directory {job_dir}: {e}')
+        return None
+
+
 @dataclass
 class JobConfig:
     job_id: str
@@ -65,6 +82,23 @@ class Job:
     def exists(self) -> bool:
         return self.dir.is_dir()
 
+    @property
+    def summary_file(self) -> Path:
+        return self.dir / SUMMARY_FILENAME
+
+    def load_summary(self) -> Optional[dict[str, Any]]:
+        """Returns the most recently saved summary of this job, or `None`."""
+        return load_summary(self.dir)
+
+    def save_summary(self, summary: dict[str, Any]):
+        """Save a small JSON summary of this job (state, counts, etc.), that can be read
+        without loading the job's logs or metadata. The file is replaced atomically, so
+        readers never see a partially written summary."""
+        tmp_file = self.dir / f'.{SUMMARY_FILENAME}.tmp'
+        with tmp_file.open(mode='w') as fh:
+            json.dump(summary, fh)
+        os.replace(tmp_file, self.summary_file)
+
     def load_config(self):
         self.config = self.config_class.from_file(self.config_filename)
         return self
@@ -122,6 +156,18 @@ class Jobs:
         logger.info(f'Created job with id {config.job_id}')
         return job_class(job_id=config.job_id, job_dir=job_dir).load_config()
 
+    def summaries(self) -> list[dict[str, Any]]:
+        """Returns a summary for each job directory, sorted by job directory name. Each
+        summary has at least a `job_id` key; jobs that have not saved a summary yet
+        have no other keys."""
+        if not self.dir.exists():
+            return []
+        return [
+            {**(load_summary(job_dir) or {}), 'job_id': job_dir.name}
+            for job_dir in sorted(self.dir.iterdir())
+            if job_dir.is_dir()
+        ]
+
     def get_job(self, job_class: Type[J], job_id: str) -> J:
         safe_id = urllib.parse.quote(job_id, safe='')
         job_dir = self.dir / safe_id
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import time
+from datetime import date
+from importlib.metadata import version
+from pathlib import PurePosixPath
+from typing import IO, Iterable, Optional
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALGORITHMS = ('sha256', 'sha512')
+"""Manifest algorithms; the same defaults as the `bagit` library."""
+
+STORE_ONLY_TYPES = {
+    'application/gzip',
+    'application/zip',
+    'audio/mpeg',
+    'image/gif',
+    'image/jp2',
+    'image/jpeg',
+    'image/png',
+    'video/mp4',
+}
+"""MIME types of files that are already compressed, and so are stored in the
+ZIP file without compressing them again."""
+
+
+class BagWriteError(Exception):
+    """A file could not be completely written to a bag."""
+
+
+def encode_filename(path: str) -> str:
+    # same encoding of line breaks in manifest paths as the bagit library
+    return path.replace('\r', '%0D').replace('\n', '%0A')
+
+
+class ZipBagWriter:
+    """Writes a [BagIt](https://www.rfc-editor.org/rfc/rfc8493) bag directly
+    into a ZIP file, in a single pass over the payload. Each payload file is
+    hashed as it is written to the ZIP file, and the manifests and tag files
+    are added when the bag is closed.
+
+    The contents of the bag are put in a directory named `root_dirname` inside
+    the ZIP file. The `destination` may be a filename or a writable file object;
+    it does not need to be seekable.
+
+    The `compress_level` is passed to `ZipFile` (0-9 for the default DEFLATE
+    compression). A `compress_level` of 0 stores every file without compression.
+    Files with a MIME type in `STORE_ONLY_TYPES` are always stored without
+    compression.
+
+    A file is only added to the manifests once it has been completely written.
+    Since a partially written file cannot be removed from the ZIP file, a bag
+    with a failed file cannot be completed: `close()` then raises a
+    `BagWriteError`.
+    """
+    def __init__(
+            self,
+            destination: str | IO[bytes],
+            root_dirname: str = '',
+            algorithms: Iterable[str] = DEFAULT_ALGORITHMS,
+            compress_level: Optional[int] = None,
+            bag_info: Optional[dict[str, str]] = None,
+    ):
+        self.root = PurePosixPath(root_dirname)
+        self.algorithms = tuple(algorithms)
+        self.compress_level = compress_level
+        self.compression = ZIP_STORED if compress_level == 0 else ZIP_DEFLATED
+        self.bag_info = bag_info or {}
+        self.manifest: dict[str, dict[str, str]] = {}
+        self.tag_manifest: dict[str, dict[str, str]] = {}
+        self._sizes: dict[str, int] = {}
+        self.failed_files: list[str] = []
+        self._zip_file = ZipFile(destination, mode='w', compression=self.compression, compresslevel=compress_level)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def payload_files(self) -> int:
+        return len(self.manifest)
+
+    @property
+    def payload_bytes(self) -> int:
+        return sum(self._sizes[path] for path in self.manifest)
+
+    def _write(
+            self,
+            path: str,
+            chunks: Iterable[bytes],
+            manifest: dict[str, dict[str, str]],
+            modified: Optional[float] = None,
+            mime_type: Optional[str] = None,
+    ) -> dict[str, str]:
+        zip_info = ZipInfo(
+            filename=str(self.root / path),
+            date_time=time.localtime(modified if modified is not None else time.time())[:6],
+        )
+        zip_info.compress_type = ZIP_STORED if mime_type in STORE_ONLY_TYPES else self.compression
+        zip_info.external_attr = 0o644 << 16
+        hashes = [hashlib.new(alg) for alg in self.algorithms]
+        self._sizes[path] = 0
+        try:
+            with self._zip_file.open(zip_info, mode='w', force_zip64=True) as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    self._sizes[path] += len(chunk)
+                    for h in hashes:
+                        h.update(chunk)
+        except Exception as e:
+            # the partial ZIP entry cannot be removed, so it is left out of the manifest
+            self.failed_files.append(path)
+            raise BagWriteError(f'Unable to write {path} to the bag: {e}') from e
+        manifest[path] = {alg: h.hexdigest() for alg, h in zip(self.algorithms, hashes)}
+        return manifest[path]
+
+    def add_file(
+            self,
+            path: str,
+            chunks: Iterable[bytes],
+            modified: Optional[float] = None,
+            mime_type: Optional[str] = None,
+    ) -> dict[str, str]:
+        """Add a payload file to the bag at `path` (relative to the bag's "data"
+        directory), with the content given as an iterable of `chunks` of bytes.
+        The `modified` time (in seconds since the epoch) is recorded in the ZIP
+        file; it defaults to the current time. Returns the digests of the file,
+        keyed by algorithm.
+
+        If iterating over `chunks` raises an exception, a `BagWriteError` is
+        raised, and the bag can no longer be completed."""
+        payload_path = str(PurePosixPath('data', path))
+        if payload_path in self.manifest:
+            raise ValueError(f'File {payload_path} has already been added to the bag')
+        digests = self._write(payload_path, chunks, self.manifest, modified, mime_type)
+        logger.debug(f'Added {payload_path} to bag')
+        return digests
+
+    def add_tag_file(self, name: str, text: str):
+        """Add a tag file with the given `text` to the top level of the bag. It
+        is included in the tag manifests."""
+        if name in self.tag_manifest or name.startswith('data/'):
+            raise ValueError(f'Cannot add tag file {name} to the bag')
+        self._write(name, [text.encode('utf-8')], self.tag_manifest)
+
+    def abort(self):
+        """Close the ZIP file without writing the manifests and tag files."""
+        self._zip_file.close()
+
+    def close(self):
+        """Write the manifests and tag files, and close the ZIP file. Raises a
+        `BagWriteError` if any file could not be completely written, after
+        closing the ZIP file without the manifests."""
+        if self._zip_file.fp is None:
+            return
+        if self.failed_files:
+            self.abort()
+            raise BagWriteError(f'Bag is incomplete; unable to write {", ".join(self.failed_files)}')
+
+        self.add_tag_file('bagit.txt', 'BagIt-Version: 0.97\nTag-File-Character-Encoding: UTF-8\n')
+        for alg in self.algorithms:
+            self.add_tag_file(f'manifest-{alg}.txt', ''.join(
+                f'{digests[alg]}  {encode_filename(path)}\n' for path, digests in sorted(self.manifest.items())
+            ))
+        bag_info = {
+            'Bag-Software-Agent': f'plastron-jobs v{version("plastron-jobs")}',
+            'Bagging-Date': date.today().isoformat(),
+            **self.bag_info,
+            'Payload-Oxum': f'{self.payload_bytes}.{self.payload_files}',
+        }
+        self.add_tag_file('bag-info.txt', ''.join(f'{name}: {bag_info[name]}\n' for name in sorted(bag_info)))
+        for alg in self.algorithms:
+            self._write(f'tagmanifest-{alg}.txt', [''.join(
+                f'{digests[alg]}  {name}\n' for name, digests in sorted(self.tag_manifest.items())
+            ).encode('utf-8')], {})
+
+        self._zip_file.close()
+        logger.info(f'Wrote bag with {self.payload_files} payload files ({self.payload_bytes} bytes)')
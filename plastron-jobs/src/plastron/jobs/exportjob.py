@@ -1,33 +1,44 @@
+import hashlib
+import json
 import logging
 import os
 import re
-from collections import Counter
-from dataclasses import dataclass
+import shutil
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import datetime
 from email.utils import parsedate
 from os.path import basename, splitext
-from pathlib import Path
-from tempfile import TemporaryDirectory
+from pathlib import Path, PurePosixPath
+from tempfile import SpooledTemporaryFile, TemporaryDirectory
 from time import mktime
-from typing import Any, Generator, Iterator, Optional
+from typing import IO, Any, Callable, Generator, Iterable, Iterator, Optional
 from urllib.parse import urlsplit
 from zipfile import ZipFile
 
-from bagit import make_bag
-from paramiko import SFTPClient, SSHException
+import yaml
+from rdflib import Graph, URIRef
 from requests import ConnectionError
 
 from plastron.client import ClientError
 from plastron.context import PlastronContext
-from plastron.files import get_ssh_client, FileSpec, get_usage_tag
+from plastron.files import SPOOL_CHUNK_SIZE, BinaryResource, FileSpec, get_usage_tag
 from plastron.jobs import Job
+from plastron.jobs.bags import DEFAULT_ALGORITHMS, BagWriteError, ZipBagWriter
+from plastron.jobs.logs import ItemLog
+from plastron.jobs.sftp import SFTPWriter
+from plastron.jobs.timings import PhaseTimer
+from plastron.models import ContentModeledResource
 from plastron.models.pcdm import PCDMFile, PCDMObject
 from plastron.models.umd import Item
-from plastron.repo import DataReadError
+from plastron.repo import DataReadError, Repository
 from plastron.repo.aggregation import AggregationResource
 from plastron.repo.pcdm import PCDMFileBearingResource, PCDMObjectResource, PCDMPageResource
 from plastron.serializers import SERIALIZER_CLASSES, detect_resource_class
 from plastron.serializers.csv import EmptyItemListError
+from plastron.utils import datetimestamp
 
 UUID_REGEX = re.compile(r'([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})', re.IGNORECASE)
 
@@ -46,16 +57,6 @@ def format_size(size: int, decimal_places: Optional[int] = None):
         return size, unit
 
 
-def compress_bag(bag, dest, root_dirname=''):
-    bag_root = Path(root_dirname)
-    with ZipFile(dest, mode='w') as zip_file:
-        for dirpath, _, filenames in os.walk(bag.path):
-            for name in filenames:
-                src_filename = Path(dirpath, name)
-                archived_name = bag_root / src_filename.relative_to(bag.path)
-                zip_file.write(filename=src_filename, arcname=archived_name)
-
-
 def gather_page_files(
     resource: AggregationResource,
     mime_type: str = None,
@@ -112,6 +113,384 @@ class Stopwatch:
         }
 
 
+@dataclass
+class ExportItem:
+    """An object being exported, along with the files to export with it."""
+    uri: str
+    resource: PCDMObjectResource
+    obj: ContentModeledResource
+    item_dir: str
+    public_url: str
+    page_files: list[FileSpec] = field(default_factory=list)
+    item_files: list[FileSpec] = field(default_factory=list)
+
+    @property
+    def files(self) -> list[FileSpec]:
+        return [*self.page_files, *self.item_files]
+
+
+@dataclass
+class ExportFile:
+    """A binary to add to the export bag, at `path` in the bag's payload directory.
+    If `chunks` is `None`, the binary is unchanged since the previous export, and is
+    not included in this export."""
+    uri: str
+    path: str
+    modified: float
+    mime_type: str
+    chunks: Optional[Iterable[bytes]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    status: str = 'new'
+
+
+EXPORT_MANIFEST_FILENAME = 'export-manifest.json'
+"""Name of the tag file in an export bag that records the items and binaries in the export."""
+
+
+def get_change_status(previous: Optional[dict[str, Any]], etag: Optional[str], last_modified: Optional[str]) -> str:
+    """Compare the `etag` and `last_modified` headers of a resource to the `previous`
+    manifest entry for that resource. Returns "new", "changed", or "unchanged"."""
+    if previous is None:
+        return 'new'
+    if etag and previous.get('etag'):
+        return 'unchanged' if etag == previous['etag'] else 'changed'
+    if last_modified and last_modified == previous.get('last_modified'):
+        return 'unchanged'
+    return 'changed'
+
+
+@dataclass
+class ExportManifest:
+    """The items and binaries in an export, keyed by URI. Each entry records the
+    resource's `ETag` and `Last-Modified` headers and whether it is "new",
+    "changed", or "unchanged" since the previous export. File entries also
+    record the file's path in the bag and its digests. Items that were in the
+    previous export but not in this one are listed in `removed`."""
+    items: dict[str, dict[str, Any]] = field(default_factory=dict)
+    files: dict[str, dict[str, Any]] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+    previous: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, text: str) -> 'ExportManifest':
+        data = json.loads(text)
+        return cls(
+            items=data.get('items', {}),
+            files=data.get('files', {}),
+            removed=data.get('removed', []),
+            previous=data.get('previous'),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'previous': self.previous,
+            'items': self.items,
+            'files': self.files,
+            'removed': self.removed,
+        }, indent=2)
+
+    def add_item(self, item: ExportItem, status: str):
+        headers = item.resource.headers or {}
+        self.items[item.uri] = {
+            'item_dir': item.item_dir,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'status': status,
+        }
+
+    def add_file(self, export_file: ExportFile, digests: dict[str, str]):
+        self.files[export_file.uri] = {
+            'path': export_file.path,
+            'etag': export_file.etag,
+            'last_modified': export_file.last_modified,
+            'digests': digests,
+            'status': export_file.status,
+        }
+
+    @property
+    def counts(self) -> Counter:
+        return Counter(entry['status'] for entry in self.items.values())
+
+
+class PreviousExport:
+    """A previous export bag (a ZIP file written by `ExportJob`), used as the
+    baseline for an incremental export. Binaries of the previous export can be
+    read back out of the bag, so that unchanged binaries are copied from it
+    instead of downloaded from the repository again."""
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._zip_file = ZipFile(filename)
+        manifest_names = [
+            name for name in self._zip_file.namelist()
+            if PurePosixPath(name).name == EXPORT_MANIFEST_FILENAME and len(PurePosixPath(name).parts) <= 2
+        ]
+        if not manifest_names:
+            self._zip_file.close()
+            raise RuntimeError(f'{filename} does not contain an export manifest')
+        self.root = PurePosixPath(manifest_names[0]).parent
+        self.manifest = ExportManifest.from_json(self._zip_file.read(manifest_names[0]).decode())
+        self._names = set(self._zip_file.namelist())
+        logger.info(
+            f'Loaded manifest of previous export {filename} with '
+            f'{len(self.manifest.items)} items and {len(self.manifest.files)} files'
+        )
+
+    def close(self):
+        self._zip_file.close()
+
+    def item_status(self, item: ExportItem) -> str:
+        headers = item.resource.headers or {}
+        return get_change_status(self.manifest.items.get(item.uri), headers.get('ETag'), headers.get('Last-Modified'))
+
+    def has_file(self, path: str) -> bool:
+        return str(self.root / 'data' / path) in self._names
+
+    def read_file(self, path: str) -> Iterator[bytes]:
+        with self._zip_file.open(str(self.root / 'data' / path)) as fh:
+            while chunk := fh.read(SPOOL_CHUNK_SIZE):
+                yield chunk
+
+
+def read_binary(file_resource: BinaryResource) -> Iterator[bytes]:
+    """Iterate over the content of `file_resource` in chunks of `SPOOL_CHUNK_SIZE`
+    bytes, as they are downloaded from the repository."""
+    yield from file_resource.iter_content(SPOOL_CHUNK_SIZE)
+
+
+def read_spool(spool: IO[bytes]) -> Iterator[bytes]:
+    with spool:
+        spool.seek(0)
+        while chunk := spool.read(SPOOL_CHUNK_SIZE):
+            yield chunk
+
+
+def get_export_file(
+        file_spec: FileSpec,
+        item_dir: str,
+        spool: bool = False,
+        previous: Optional[PreviousExport] = None,
+        skip_unchanged: bool = False,
+) -> ExportFile:
+    """Returns an `ExportFile` for the binary of `file_spec`. By default, the binary is
+    downloaded from the repository in fixed-size chunks as the file's `chunks` are read. If `spool` is true,
+    the binary is downloaded to a temporary file (in memory if it is small) first.
+
+    If the binary has not changed since the `previous` export, it is not downloaded.
+    Instead, it is copied from the previous export bag, or, if `skip_unchanged` is
+    true, left out of this export. It is only downloaded again if the previous bag
+    does not contain it."""
+    file_resource = file_spec.source
+    file = file_resource.describe(PCDMFile)
+    etag = file_resource.headers.get('ETag')
+    last_modified = file_resource.headers.get('Last-Modified')
+    status = 'new'
+    chunks = None
+    download = True
+    if previous is not None:
+        previous_entry = previous.manifest.files.get(str(file_resource.url))
+        status = get_change_status(previous_entry, etag, last_modified)
+        if status == 'unchanged':
+            logger.debug(f'Unchanged since previous export: {file.uri}')
+            if skip_unchanged:
+                download = False
+            elif previous.has_file(previous_entry['path']):
+                chunks = previous.read_file(previous_entry['path'])
+                download = False
+
+    if download:
+        if spool:
+            spool_file = SpooledTemporaryFile(max_size=SPOOL_CHUNK_SIZE, prefix='plastron-')
+            for chunk in read_binary(file_resource):
+                spool_file.write(chunk)
+            chunks = read_spool(spool_file)
+            logger.debug(f'Downloaded {file.uri}')
+        else:
+            chunks = read_binary(file_resource)
+
+    return ExportFile(
+        uri=str(file_resource.url),
+        path=str(PurePosixPath(item_dir, str(file.filename))),
+        # use the resource's last-modified time in the repo as the file's time in the bag
+        modified=mktime(parsedate(last_modified)),
+        mime_type=str(file_resource.headers['Content-Type']),
+        chunks=chunks,
+        etag=etag,
+        last_modified=last_modified,
+        status=status,
+    )
+
+
+class ExportCheckpoint:
+    """Durable progress of an export, kept in a job directory so that an export
+    that fails partway through can be resumed without fetching anything from
+    the repository that was already exported. The directory contains:
+
+    * `config.yml`: the parameters of the export
+    * `metadata.nt`: the description of each exported item, appended in
+      N-Triples format as the item is exported
+    * `files.log.csv`: each binary saved for an exported item
+    * `completed.log.csv`: each exported item, with the position of its
+      description in `metadata.nt`; an item is only logged here after its
+      description and binaries have been saved
+    * `bag/`: staging area for the binaries
+    * `timings.json`: time spent reading, serializing, and downloading items
+      during the most recent run (see `PhaseTimer`)
+
+    The export bag is assembled from the checkpoint when all the items have
+    been exported, after which the staging area is removed.
+
+    The logs buffer up to `log_batch_size` rows before writing them, and are synced
+    to disk at most every `log_fsync_interval` seconds (see `ItemLog`). Items whose
+    rows are still in the buffer when the process is killed are exported again
+    when the export is resumed.
+    """
+    ITEM_FIELDNAMES = [
+        'uri', 'timestamp', 'item_dir', 'public_url', 'page_files', 'item_files', 'file_uris',
+        'offset', 'length', 'etag', 'last_modified', 'status',
+    ]
+    FILE_FIELDNAMES = [
+        'uri', 'timestamp', 'item_uri', 'path', 'modified', 'mime_type', 'etag', 'last_modified', 'status',
+        'staged', 'digests',
+    ]
+
+    def __init__(self, directory: str | Path, log_batch_size: int = 1, log_fsync_interval: Optional[float] = None):
+        self.dir = Path(directory)
+        log_options = {'batch_size': log_batch_size, 'fsync_interval': log_fsync_interval}
+        self.completed = ItemLog(self.dir / 'completed.log.csv', self.ITEM_FIELDNAMES, 'uri', **log_options)
+        self.files = ItemLog(self.dir / 'files.log.csv', self.FILE_FIELDNAMES, 'uri', **log_options)
+        self._metadata_fh = None
+
+    @property
+    def config_filename(self) -> Path:
+        return self.dir / 'config.yml'
+
+    @property
+    def metadata_filename(self) -> Path:
+        return self.dir / 'metadata.nt'
+
+    @property
+    def staging_dir(self) -> Path:
+        return self.dir / 'bag'
+
+    @property
+    def complete_marker(self) -> Path:
+        return self.dir / 'complete'
+
+    @property
+    def exists(self) -> bool:
+        return self.config_filename.is_file()
+
+    @property
+    def is_complete(self) -> bool:
+        return self.complete_marker.exists()
+
+    def create(self, params: dict[str, Any]):
+        """Create the job directory, and save the export `params` in it."""
+        if self.exists:
+            raise RuntimeError(f'Export job directory {self.dir} already exists; use resume to continue it')
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with self.config_filename.open(mode='w') as fh:
+            yaml.safe_dump(params, fh)
+
+    def load_params(self) -> dict[str, Any]:
+        """Returns the export parameters saved by `create()`."""
+        if not self.exists:
+            raise RuntimeError(f'Export job directory {self.dir} not found')
+        with self.config_filename.open() as fh:
+            return yaml.safe_load(fh)
+
+    def _open_metadata(self):
+        if self._metadata_fh is None:
+            # discard any descriptions past the last completed item
+            end = max((int(row['offset']) + int(row['length']) for row in self.completed), default=0)
+            self._metadata_fh = self.metadata_filename.open(mode='ab')
+            self._metadata_fh.truncate(end)
+            self._metadata_fh.seek(0, os.SEEK_END)
+        return self._metadata_fh
+
+    def stage_file(self, item_uri: str, export_file: ExportFile) -> Optional[dict[str, str]]:
+        """Save the binary of `export_file` to the staging area, and log it. Returns its
+        digests, or `None` if the file is not included in this export."""
+        digests = None
+        if export_file.chunks is not None:
+            staged_file = self.staging_dir / 'data' / export_file.path
+            staged_file.parent.mkdir(parents=True, exist_ok=True)
+            partial_file = staged_file.with_name(staged_file.name + '.part')
+            hashes = [hashlib.new(alg) for alg in DEFAULT_ALGORITHMS]
+            with partial_file.open(mode='wb') as fh:
+                for chunk in export_file.chunks:
+                    fh.write(chunk)
+                    for h in hashes:
+                        h.update(chunk)
+            os.replace(partial_file, staged_file)
+            digests = {alg: h.hexdigest() for alg, h in zip(DEFAULT_ALGORITHMS, hashes)}
+        self.files.append({
+            'uri': export_file.uri,
+            'timestamp': datetimestamp(digits_only=False),
+            'item_uri': item_uri,
+            'path': export_file.path,
+            'modified': export_file.modified,
+            'mime_type': export_file.mime_type,
+            'etag': export_file.etag or '',
+            'last_modified': export_file.last_modified or '',
+            'status': export_file.status,
+            'staged': digests is not None,
+            'digests': json.dumps(digests) if digests is not None else '',
+        })
+        return digests
+
+    def complete_item(self, item: ExportItem, status: str, file_uris: list[str]):
+        """Save the description of `item`, and log it as completed."""
+        metadata = item.obj.graph.serialize(format='nt', encoding='utf-8')
+        fh = self._open_metadata()
+        offset = fh.tell()
+        fh.write(metadata)
+        fh.flush()
+        headers = item.resource.headers or {}
+        self.completed.append({
+            'uri': item.uri,
+            'timestamp': datetimestamp(digits_only=False),
+            'item_dir': item.item_dir,
+            'public_url': item.public_url or '',
+            'page_files': json.dumps([str(f) for f in item.page_files]),
+            'item_files': json.dumps([str(f) for f in item.item_files]),
+            'file_uris': json.dumps(file_uris),
+            'offset': offset,
+            'length': len(metadata),
+            'etag': headers.get('ETag') or '',
+            'last_modified': headers.get('Last-Modified') or '',
+            'status': status,
+        })
+
+    def read_item(self, row: dict[str, str]) -> ContentModeledResource:
+        """Returns the saved description of the completed item in `row`."""
+        with self.metadata_filename.open(mode='rb') as fh:
+            fh.seek(int(row['offset']))
+            data = fh.read(int(row['length']))
+        graph = Graph().parse(data=data, format='nt')
+        model_class = detect_resource_class(graph, row['uri'], fallback=Item)
+        return model_class(uri=URIRef(row['uri']), graph=graph)
+
+    def read_staged_file(self, path: str) -> Iterator[bytes]:
+        with (self.staging_dir / 'data' / path).open(mode='rb') as fh:
+            while chunk := fh.read(SPOOL_CHUNK_SIZE):
+                yield chunk
+
+    def close(self):
+        self.completed.close()
+        self.files.close()
+        if self._metadata_fh is not None:
+            self._metadata_fh.close()
+            self._metadata_fh = None
+
+    def finish(self):
+        """Mark the export as complete, and remove the staging area."""
+        self.close()
+        self.complete_marker.touch()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
 class FileSize:
     def __init__(self, size: int) -> None:
         self._size = size
@@ -130,8 +509,33 @@ class ExportJob(Job):
     uri_template: str
     uris: list[str]
     key: str
+    workers: int = 1
+    download_workers: int = 1
+    compress_level: Optional[int] = None
+    previous_export: Optional[str] = None
+    skip_unchanged: bool = False
+    job_dir: Optional[str] = None
+    resume: bool = False
+    log_batch_size: int = 1
+    log_fsync_interval: Optional[float] = None
+
+    CHECKPOINT_PARAMS = (
+        'export_format', 'export_binaries', 'binary_types', 'output_dest', 'uri_template', 'uris',
+        'compress_level', 'previous_export', 'skip_unchanged',
+    )
+    """Parameters saved in the job directory of a checkpointed export, and restored
+    when it is resumed."""
+
+    @classmethod
+    def resume_from(cls, context: PlastronContext, job_dir: str, **kwargs) -> 'ExportJob':
+        """Returns an `ExportJob` that resumes the checkpointed export in `job_dir`,
+        with the parameters saved there. Other parameters (e.g., the SSH `key` or the
+        number of `workers`) are taken from `kwargs`."""
+        params = ExportCheckpoint(job_dir).load_params()
+        return cls(context=context, job_dir=job_dir, resume=True, **params, **kwargs)
 
     def __post_init__(self):
+        self.previous: Optional[PreviousExport] = None
         if self.binary_types:
             accepted_types = self.binary_types.split(',')
 
@@ -169,6 +573,208 @@ class ExportJob(Job):
 
         return files, total_size
 
+    def read_item(self, repo: Repository, uri: str) -> ExportItem:
+        """Read the object at `uri` and its metadata from the repository."""
+        resource = repo[uri:PCDMObjectResource].read()
+        # use a translated version of the repo path as the default item directory name
+        # e.g., "/dc/2023/1/de/84/37/0d/de84370d-f90a-444f-a87f-dd79e0438884" becomes
+        # "dc.2023.1.de.84.37.0d.de84370d-f90a-444f-a87f-dd79e0438884"
+        item_dir = resource.path.lstrip('/').replace('/', '.')
+
+        model_class = detect_resource_class(resource.graph, resource.url, fallback=Item)
+
+        obj = resource.describe(model=model_class)
+        # use the identifier field from the model as a better item directory name
+        if hasattr(obj, 'identifier'):
+            item_dir = str(obj.identifier.value or item_dir)
+
+        return ExportItem(
+            uri=uri,
+            resource=resource,
+            obj=obj,
+            item_dir=item_dir,
+            public_url=self.context.get_public_url(resource),
+        )
+
+    def gather_item_files(self, item: ExportItem) -> ExportItem:
+        """Find the page member and item-level files of `item` that should be exported."""
+        item.page_files, _ = self.get_page_files(item.resource, item_dir=item.item_dir)
+        item.item_files, _ = self.get_item_files(item.resource, item_dir=item.item_dir)
+        return item
+
+    def previous_digests(self, export_file: ExportFile) -> Optional[dict[str, str]]:
+        """Returns the digests of `export_file` from the previous export's manifest."""
+        if self.previous is None or export_file.uri not in self.previous.manifest.files:
+            return None
+        return self.previous.manifest.files[export_file.uri]['digests']
+
+    def get_export_file(self, file_spec: FileSpec, item_dir: str, spool: bool = False) -> ExportFile:
+        return get_export_file(
+            file_spec,
+            item_dir,
+            spool=spool,
+            previous=self.previous,
+            skip_unchanged=self.skip_unchanged,
+        )
+
+    def export_items(self, uris: list[str]) -> Iterator[tuple[str, Callable]]:
+        """Export the items one at a time. For each URI, yields the URI and a function
+        that returns the `ExportItem` and a function that returns its `ExportFile`s.
+        Both functions raise any error encountered reading from the repository. The
+        binaries are streamed from the repository as the files are read."""
+        for uri in uris:
+            def result(uri=uri):
+                item = self.gather_item_files(self.read_item(self.context.repo, uri))
+
+                def downloads():
+                    for file_spec in item.files:
+                        yield self.get_export_file(file_spec, item.item_dir)
+
+                return item, downloads
+
+            yield uri, result
+
+    def export_items_concurrently(
+            self,
+            uris: list[str],
+            phases: Optional[PhaseTimer] = None,
+    ) -> Iterator[tuple[str, Callable]]:
+        """Export the items in a pipeline of bounded thread pools: `workers` threads
+        read the metadata of the objects, `workers` threads find their page and
+        item-level files, and `download_workers` threads download those files to
+        temporary files. Yields the same values as `export_items`, in the same order
+        as the URIs, so that the serializer and the bag are only written to by the
+        caller. At most twice as many items as there are workers are read ahead of
+        the caller.
+
+        The time each download worker spends on a file is recorded in `phases` as
+        the "download" phase."""
+        local = threading.local()
+        if phases is None:
+            phases = PhaseTimer()
+
+        def get_repo() -> Repository:
+            # each thread gets its own context, and therefore its own client
+            if not hasattr(local, 'context'):
+                local.context = self.context.clone()
+            return local.context.repo
+
+        def download(file_spec: FileSpec, item_dir: str) -> ExportFile:
+            with phases.time('download', file_spec.source.url):
+                return self.get_export_file(file_spec, item_dir, spool=True)
+
+        def discover(read_future: Future) -> tuple[ExportItem, list[Future]]:
+            item = self.gather_item_files(read_future.result())
+            return item, [download_pool.submit(download, f, item.item_dir) for f in item.files]
+
+        def next_result(pending: deque) -> tuple[str, Callable]:
+            uri, future = pending.popleft()
+
+            def result():
+                item, download_futures = future.result()
+
+                def downloads():
+                    wait(download_futures)
+                    for download_future in download_futures:
+                        yield download_future.result()
+
+                return item, downloads
+
+            return uri, result
+
+        pending = deque()
+        with (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export-read') as read_pool,
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export-files') as files_pool,
+            ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix='export-bin') as download_pool,
+        ):
+            for uri in uris:
+                read_future = read_pool.submit(lambda u: self.read_item(get_repo(), u), uri)
+                pending.append((uri, files_pool.submit(discover, read_future)))
+                if len(pending) >= self.workers * 2:
+                    yield next_result(pending)
+            while pending:
+                yield next_result(pending)
+
+    def open_checkpoint(self) -> Optional[ExportCheckpoint]:
+        """Returns the checkpoint of this export in `job_dir`, or `None` if this
+        export is not checkpointed. Unless this export is resuming, a new
+        checkpoint is created."""
+        if self.job_dir is None:
+            return None
+        checkpoint = ExportCheckpoint(
+            self.job_dir,
+            log_batch_size=self.log_batch_size,
+            log_fsync_interval=self.log_fsync_interval,
+        )
+        if self.resume:
+            if not checkpoint.exists:
+                raise RuntimeError(f'Export job directory {self.job_dir} not found')
+            if checkpoint.is_complete:
+                raise RuntimeError(f'Export in {self.job_dir} is already complete')
+            logger.info(f'Resuming export from {self.job_dir} with {len(checkpoint.completed)} items completed')
+        else:
+            checkpoint.create({name: getattr(self, name) for name in self.CHECKPOINT_PARAMS})
+            logger.info(f'Saving export progress to {self.job_dir}')
+        return checkpoint
+
+    def open_bag(self) -> tuple[ZipBagWriter, str | IO[bytes]]:
+        """Open the output destination, and return a bag writer for it along
+        with the opened destination."""
+        # parse the output destination to determine where to send the export
+        if self.output_dest.startswith('sftp:'):
+            # stream over SFTP to a remote host
+            sftp_uri = urlsplit(self.output_dest)
+            root, ext = splitext(basename(sftp_uri.path))
+            destination = SFTPWriter(sftp_uri, ssh_options={'key_filename': self.key})
+        else:
+            # send to a local file
+            zip_filename = self.output_dest
+            root, ext = splitext(basename(zip_filename))
+            destination = zip_filename
+
+        return ZipBagWriter(destination, root_dirname=root, compress_level=self.compress_level), destination
+
+    def assemble_bag(
+            self,
+            checkpoint: ExportCheckpoint,
+            serializer,
+            manifest: ExportManifest,
+    ) -> Iterator[tuple[ExportFile, Optional[dict[str, str]]]]:
+        """Replay the completed items of `checkpoint` into the `serializer` and the
+        `manifest`. Yields each of their files along with its digests; the chunks
+        of each file are read from the staging area."""
+        for uri in self.uris:
+            row = checkpoint.completed.get(uri)
+            if row is None:
+                continue
+            serializer.write(
+                checkpoint.read_item(row),
+                files=[FileSpec.parse(f) for f in json.loads(row['page_files'])],
+                item_files=[FileSpec.parse(f) for f in json.loads(row['item_files'])],
+                public_url=row['public_url'] or None,
+            )
+            manifest.items[uri] = {
+                'item_dir': row['item_dir'],
+                'etag': row['etag'] or None,
+                'last_modified': row['last_modified'] or None,
+                'status': row['status'],
+            }
+            for file_uri in json.loads(row['file_uris']):
+                file_row = checkpoint.files.get(file_uri)
+                staged = file_row['staged'] == 'True'
+                export_file = ExportFile(
+                    uri=file_uri,
+                    path=file_row['path'],
+                    modified=float(file_row['modified']),
+                    mime_type=file_row['mime_type'],
+                    chunks=checkpoint.read_staged_file(file_row['path']) if staged else None,
+                    etag=file_row['etag'] or None,
+                    last_modified=file_row['last_modified'] or None,
+                    status=file_row['status'],
+                )
+                yield export_file, json.loads(file_row['digests']) if staged else None
+
     def run(self) -> Generator[dict[str, Any], None, dict[str, Any]]:
         logger.info(f'Requested export format is {self.export_format}')
         if self.export_binaries:
@@ -176,6 +782,7 @@ class ExportJob(Job):
             logger.info(f'Exporting binaries with types: {types}')
 
         timer = Stopwatch()
+        phases = PhaseTimer()
         count = Counter(
             total=len(self.uris),
             exported=0,
@@ -195,69 +802,83 @@ class ExportJob(Job):
 
         logger.info(f'Export destination: {self.output_dest}')
 
-        # create a bag in a temporary directory to hold exported items
-        temp_dir = TemporaryDirectory()
-        logger.debug(f'Assembling export bag in {temp_dir.name}')
-        bag = make_bag(temp_dir.name)
+        if self.previous_export:
+            if Path(self.previous_export).resolve() == Path(self.output_dest).resolve():
+                raise RuntimeError('Output destination must be different from the previous export')
+            logger.info(f'Exporting changes since previous export {self.previous_export}')
+            self.previous = PreviousExport(self.previous_export)
+        manifest = ExportManifest(previous=basename(self.previous_export) if self.previous_export else None)
+
+        checkpoint = self.open_checkpoint()
+        if checkpoint is None:
+            # write the bag directly to a single ZIP file, so that an SFTP upload happens
+            # while the bag is written
+            bag, destination = self.open_bag()
+            uris = self.uris
+        else:
+            # the bag is assembled from the checkpoint once all the items are exported
+            bag, destination = None, None
+            uris = [uri for uri in self.uris if uri not in checkpoint.completed]
+            count['exported'] = len(self.uris) - len(uris)
 
-        export_dir = os.path.join(temp_dir.name, 'data')
-        serializer = serializer_class(directory=export_dir)
+        # only the metadata files are assembled in a temporary directory
+        temp_dir = TemporaryDirectory()
+        logger.debug(f'Assembling export metadata in {temp_dir.name}')
+        serializer = serializer_class(directory=temp_dir.name)
         yield {
             'time': timer.now(),
             'count': count,
             'state': 'in_progress',
-            'progress': 0,
+            'progress': int(count['exported'] / count['total'] * 100) if count['total'] else 0,
         }
-        for n, uri in enumerate(self.uris, 1):
+        if self.workers > 1 or self.download_workers > 1:
+            logger.info(
+                f'Exporting with {self.workers} metadata workers and {self.download_workers} download workers'
+            )
+            results = self.export_items_concurrently(uris, phases)
+            # the files are already downloaded by the download workers
+            write_phase = 'write_bag'
+        else:
+            results = self.export_items(uris)
+            # the files are streamed from the repository as they are written
+            write_phase = 'download'
+
+        for n, (uri, result) in enumerate(results, count['exported'] + 1):
             try:
                 logger.info(f'Exporting item {count["exported"] + 1}/{count["total"]}: {uri}')
-
-                resource = self.context.repo[uri:PCDMObjectResource].read()
-                # use a translated version of the repo path as the default item directory name
-                # e.g., "/dc/2023/1/de/84/37/0d/de84370d-f90a-444f-a87f-dd79e0438884" becomes
-                # "dc.2023.1.de.84.37.0d.de84370d-f90a-444f-a87f-dd79e0438884"
-                item_dir = resource.path.lstrip('/').replace('/', '.')
-
-                model_class = detect_resource_class(resource.graph, resource.url, fallback=Item)
-
-                # write the metadata for this object
-                obj = resource.describe(model=model_class)
-                # use the identifier field from the model as a better item directory name
-                if hasattr(obj, 'identifier'):
-                    item_dir = str(obj.identifier.value or item_dir)
-
-                page_files, page_files_size = self.get_page_files(resource, item_dir=item_dir)
-                item_files, item_files_size = self.get_item_files(resource, item_dir=item_dir)
-                serializer.write(
-                    obj,
-                    files=page_files,
-                    item_files=item_files,
-                    public_url=self.context.get_public_url(resource),
-                )
-
-                # Write binary files for page member and item-level files
-                all_files = [*page_files, *item_files]
-
-                if all_files:
-                    binaries_dir = Path(export_dir, item_dir)
-                    binaries_dir.mkdir(parents=True, exist_ok=True)
-                    for file_spec in all_files:
-                        file_resource = file_spec.source
-                        accessed = parsedate(file_resource.headers['Date'])
-                        modified = parsedate(file_resource.headers['Last-Modified'])
-                        file = file_resource.describe(PCDMFile)
-
-                        binary_filename = binaries_dir / str(file.filename)
-                        with open(binary_filename, mode='wb') as binary:
-                            with file_resource.open() as stream:
-                                for chunk in stream:
-                                    binary.write(chunk)
-
-                        # update the atime and mtime of the file to reflect the time of the
-                        # HTTP request and the resource's last-modified time in the repo
-                        os.utime(binary_filename, times=(mktime(accessed), mktime(modified)))
-                        logger.debug(f'Copied {file.uri} to {binary.name}')
-
+                with phases.time('read_item', uri):
+                    item, downloads = result()
+                status = self.previous.item_status(item) if self.previous else 'new'
+                if checkpoint is None:
+                    with phases.time('serialize', uri):
+                        serializer.write(
+                            item.obj,
+                            files=item.page_files,
+                            item_files=item.item_files,
+                            public_url=item.public_url,
+                        )
+                # write the binary files for page member and item-level files
+                file_uris = []
+                for export_file in downloads():
+                    with phases.time(write_phase, export_file.uri):
+                        if checkpoint is not None:
+                            digests = checkpoint.stage_file(uri, export_file)
+                            file_uris.append(export_file.uri)
+                        elif export_file.chunks is not None:
+                            digests = bag.add_file(
+                                export_file.path,
+                                export_file.chunks,
+                                modified=export_file.modified,
+                                mime_type=export_file.mime_type,
+                            )
+                        else:
+                            digests = None
+                    if checkpoint is None:
+                        manifest.add_file(export_file, digests or self.previous_digests(export_file))
+                if checkpoint is None:
+                    manifest.add_item(item, status)
+                else:
+                    checkpoint.complete_item(item, status, file_uris)
                 count['exported'] += 1
 
             except DataReadError as e:
@@ -268,6 +889,14 @@ class ExportJob(Job):
                 # log the failure, but continue to attempt to export the rest of the URIs
                 logger.error(f'Unable to retrieve {uri}: {e}')
                 count['errors'] += 1
+            except BagWriteError as e:
+                # a partially written binary cannot be removed from the bag, so the
+                # export cannot continue
+                logger.error(f'Export of {uri} failed: {e}')
+                bag.abort()
+                if not isinstance(destination, str):
+                    destination.close()
+                raise
 
             # update the status
             yield {
@@ -277,37 +906,60 @@ class ExportJob(Job):
                 'progress': int(n / count['total'] * 100),
             }
 
+        if checkpoint is not None:
+            # write the bag from the items and binaries saved in the checkpoint
+            bag, destination = self.open_bag()
+            for export_file, digests in self.assemble_bag(checkpoint, serializer, manifest):
+                if export_file.chunks is not None:
+                    bag.add_file(
+                        export_file.path,
+                        export_file.chunks,
+                        modified=export_file.modified,
+                        mime_type=export_file.mime_type,
+                    )
+                manifest.add_file(export_file, digests or self.previous_digests(export_file))
+
         try:
-            serializer.finish()
+            with phases.time('serialize'):
+                serializer.finish()
         except EmptyItemListError:
             logger.error("No items could be exported; skipping writing file")
 
         logger.info(f'Exported {count["exported"]} of {count["total"]} items')
+        if self.previous is not None:
+            exported_uris = set(self.uris)
+            manifest.removed = [uri for uri in self.previous.manifest.items if uri not in exported_uris]
+            changes = manifest.counts
+            logger.info(
+                f'Since the previous export: {changes["new"]} new, {changes["changed"]} changed, '
+                f'{changes["unchanged"]} unchanged, and {len(manifest.removed)} removed items'
+            )
 
-        # save the BagIt bag to send to the output destination
-        bag.save(manifests=True)
-
-        # parse the output destination to determine where to send the export
-        if self.output_dest.startswith('sftp:'):
-            # send over SFTP to a remote host
-            sftp_uri = urlsplit(self.output_dest)
-            ssh_client = get_ssh_client(sftp_uri, key_filename=self.key)
-            try:
-                sftp_client = SFTPClient.from_transport(ssh_client.get_transport())
-                root, ext = splitext(basename(sftp_uri.path))
-                destination = sftp_client.open(sftp_uri.path, mode='w')
-            except SSHException as e:
-                raise RuntimeError(str(e)) from e
-        else:
-            # send to a local file
-            zip_filename = self.output_dest
-            root, ext = splitext(basename(zip_filename))
-            destination = zip_filename
-
-        # write out a single ZIP file of the whole bag
-        compress_bag(bag, destination, root)
+        # add the metadata files, then write the manifests and close the bag
+        with temp_dir:
+            for metadata_file in sorted(Path(temp_dir.name).rglob('*')):
+                if metadata_file.is_file():
+                    with metadata_file.open(mode='rb') as fh:
+                        bag.add_file(
+                            metadata_file.relative_to(temp_dir.name).as_posix(),
+                            iter(lambda: fh.read(SPOOL_CHUNK_SIZE), b''),
+                            modified=metadata_file.stat().st_mtime,
+                        )
+        bag.add_tag_file(EXPORT_MANIFEST_FILENAME, manifest.to_json())
+        bag.close()
+        if not isinstance(destination, str):
+            destination.close()
+        if self.previous is not None:
+            self.previous.close()
 
         state = 'export_complete' if count['exported'] == count['total'] else 'partial_export'
+        if checkpoint is not None:
+            phases.save(checkpoint.dir)
+            if state == 'export_complete':
+                checkpoint.finish()
+            else:
+                # keep the staging area, so the failed items can be exported by resuming
+                checkpoint.close()
         return {
             'type': state,
             'content_type': serializer.content_type,
@@ -315,4 +967,5 @@ class ExportJob(Job):
             'count': count,
             'state': state,
             'progress': 100,
+            'timings': phases.summary(),
         }
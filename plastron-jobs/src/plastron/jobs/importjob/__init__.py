@@ -1,27 +1,45 @@
 import logging
 import os
-from collections import Counter
-from dataclasses import dataclass
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from datetime import datetime
 from enum import Enum
+from http import HTTPStatus
+from itertools import chain, islice
+from multiprocessing.util import Finalize
 from pathlib import Path
 from shutil import copyfileobj
-from typing import Optional, Any, IO, Generator, Iterable
+from time import monotonic, perf_counter, sleep
+from typing import Optional, Any, Callable, IO, Generator, Iterable, Iterator, Mapping, Union
 
+import requests
 from bs4 import BeautifulSoup
 from rdflib import URIRef
 
 from plastron.client import ClientError
+from plastron.client.transactions import TransactionError
 from plastron.context import PlastronContext
-from plastron.files import BinarySource, ZipFileSource, RemoteFileSource, HTTPFileSource, LocalFileSource
+from plastron.files import (
+    BinarySource,
+    BinarySourceInfo,
+    HTTPFileSource,
+    LocalFileSource,
+    RemoteFileSource,
+    ZipFileRegistry,
+    ZipFileSource,
+    probe_sources,
+)
 from plastron.handles import HandleInfo
-from plastron.jobs import JobError, JobConfig, Job, ItemLog
-from plastron.jobs.importjob.spreadsheet import MetadataSpreadsheet, InvalidRow, Row, MetadataError
+from plastron.jobs import JobError, JobConfig, JobNotFoundError, Job, ItemLog
+from plastron.jobs.importjob.spreadsheet import MetadataSpreadsheet, InvalidRow, LineReference, Row, MetadataError
+from plastron.jobs.timings import PhaseTimer, load_timings
 from plastron.models import get_model_from_name, ModelClassNotFoundError
 from plastron.models.annotations import FullTextAnnotation, TextualBody
 from plastron.namespaces import sc
 from plastron.rdfmapping.validation import ValidationResultsDict, ValidationResult, ValidationSuccess, ValidationFailure
-from plastron.repo import RepositoryError, ContainerResource
+from plastron.repo import RepositoryError, ContainerResource, Repository
 from plastron.repo.pcdm import PCDMObjectResource
 from plastron.repo.publish import PublishableResource
 from plastron.utils import datetimestamp
@@ -30,6 +48,31 @@ from plastron.validation import ValidationError
 logger = logging.getLogger(__name__)
 DROPPED_INVALID_FIELDNAMES = ['id', 'timestamp', 'title', 'uri', 'reason']
 DROPPED_FAILED_FIELDNAMES = ['id', 'timestamp', 'title', 'uri', 'reason']
+VALIDATION_SHARD_SIZE = 100
+"""Number of rows sent to a validation process at a time."""
+SUMMARY_INTERVAL = 1.0
+"""Minimum number of seconds between updates to the job summary during a run."""
+TRANSIENT_STATUSES = frozenset({
+    HTTPStatus.REQUEST_TIMEOUT,
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+"""HTTP status codes of repository responses that indicate a transient failure."""
+SHARD_POLL_INTERVAL = 5.0
+"""Number of seconds between checks on the progress of the shards of a sharded import."""
+FINISHED_STATES = frozenset({
+    'validate_success',
+    'validate_failed',
+    'import_complete',
+    'import_incomplete',
+    'import_error',
+})
+"""Job summary states of a run that has stopped."""
+SHARD_STALE_AFTER = 600.0
+"""Number of seconds after which a shard whose summary is still in progress, but has
+not been updated, is considered to have stalled (e.g., because its process died)."""
 
 
 class ImportedItemStatus(Enum):
@@ -38,6 +81,76 @@ class ImportedItemStatus(Enum):
     UNCHANGED = 'unchanged'
 
 
+@dataclass
+class TransactionBatchPolicy:
+    """How many rows an import run loads into the repository in a single transaction.
+    A batch is committed once it has `size` rows, or once its transaction has been
+    open for `timeout` seconds, whichever comes first."""
+    size: int = 1
+    timeout: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 1
+
+    def is_full(self, rows: int, elapsed: float) -> bool:
+        return rows >= self.size or (self.timeout is not None and elapsed >= self.timeout)
+
+
+@dataclass
+class RetryPolicy:
+    """How many times an import run retries a row that failed with a transient error
+    (see `is_transient_error()`). Failed rows are re-queued to the end of the run;
+    before the `n`th round of retries, the run waits until `delay(n)` seconds have
+    passed since the last of those rows failed."""
+    retries: int = 2
+    backoff: float = 5.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.retries > 0
+
+    def delay(self, attempt: int) -> float:
+        return self.backoff * 2 ** (attempt - 1)
+
+
+def is_transient_error(error: Optional[BaseException]) -> bool:
+    """Whether `error`, or any exception that caused it, is one that may succeed
+    if tried again later: a connection failure or timeout, a failed transaction
+    (e.g., one that expired), or a repository response with one of the
+    `TRANSIENT_STATUSES`. Any other error is considered permanent."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, ClientError):
+            return error.status_code in TRANSIENT_STATUSES
+        if isinstance(error, (TransactionError, requests.ConnectionError, requests.Timeout, ConnectionError,
+                              TimeoutError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def is_stalled(summary: dict[str, Any], stale_after: float) -> bool:
+    """Whether the job `summary` is of a run that is still in progress, but has not
+    been updated for at least `stale_after` seconds."""
+    if summary.get('state') in FINISHED_STATES or 'updated' not in summary:
+        return False
+    return datetime.now().timestamp() - summary['updated'] >= stale_after
+
+
+class BatchFailure(Exception):
+    """Raised when a batch of rows could not be loaded in a single transaction.
+    The transaction has been rolled back."""
+    def __init__(self, error: Exception, rows: list[Union[Row, InvalidRow]], results: list['ImportRowResult']):
+        super().__init__(str(error))
+        self.error = error
+        self.rows = rows
+        """Rows taken into the batch, up to and including the failure."""
+        self.results = results
+        """Results of the rows that were processed before the batch failed."""
+
+
 @dataclass
 class ImportConfig(JobConfig):
     model: Optional[str] = None
@@ -58,6 +171,37 @@ def get_loggable_uri(item):
     return uri
 
 
+@dataclass
+class LoggedItem:
+    """The fields of an item that are written to the item logs. Used in place of the
+    item itself when the item was created in a different process."""
+    identifier: str
+    title: str
+    uri: str
+
+    @classmethod
+    def from_item(cls, item, line_reference: LineReference) -> 'LoggedItem':
+        return cls(
+            identifier=str(getattr(item, 'identifier', line_reference)),
+            title=str(getattr(item, 'title', '')),
+            uri=get_loggable_uri(item),
+        )
+
+
+@dataclass
+class ImportRowResult:
+    """Outcome of processing a single spreadsheet row during an import run."""
+    row: Union[Row, InvalidRow, None]
+    import_row: Optional['ImportRow'] = None
+    item: Any = None
+    """The item created from the row, or a `LoggedItem` summary of it."""
+    validation: Optional[ValidationResultsDict] = None
+    """Validation results, or `None` if the row could not be validated."""
+    status: Optional[ImportedItemStatus] = None
+    """Status of the item in the repository, or `None` if it was not imported."""
+    error: Optional[Exception] = None
+
+
 class ImportRun:
     """
     A single run of an import job. Records the logs of invalid and failed items (if any).
@@ -72,6 +216,15 @@ class ImportRun:
         self.start_time = None
         self.count = None
         self.state = None
+        self.last_row = None
+        self.processed = 0
+        self._summary_saved_at = None
+        self.timer = PhaseTimer()
+        """Time spent in each phase of importing the rows of this run."""
+        self.log_batch_size = 1
+        """Number of rows buffered before they are written to the logs of this run."""
+        self.log_fsync_interval = None
+        """Minimum number of seconds between syncing the logs of this run to disk."""
 
     def load(self, timestamp: str):
         """
@@ -92,7 +245,13 @@ class ImportRun:
         Log of items that failed metadata validation during this import run.
         """
         if self._invalid_items is None:
-            self._invalid_items = ItemLog(self.dir / 'dropped-invalid.log.csv', DROPPED_INVALID_FIELDNAMES, 'id')
+            self._invalid_items = ItemLog(
+                self.dir / 'dropped-invalid.log.csv',
+                DROPPED_INVALID_FIELDNAMES,
+                'id',
+                batch_size=self.log_batch_size,
+                fsync_interval=self.log_fsync_interval,
+            )
         return self._invalid_items
 
     @property
@@ -101,9 +260,21 @@ class ImportRun:
         Log of items that failed when loading into the repository during this import run.
         """
         if self._failed_items is None:
-            self._failed_items = ItemLog(self.dir / 'dropped-failed.log.csv', DROPPED_FAILED_FIELDNAMES, 'id')
+            self._failed_items = ItemLog(
+                self.dir / 'dropped-failed.log.csv',
+                DROPPED_FAILED_FIELDNAMES,
+                'id',
+                batch_size=self.log_batch_size,
+                fsync_interval=self.log_fsync_interval,
+            )
         return self._failed_items
 
+    @property
+    def timings(self) -> Optional[dict[str, dict[str, Any]]]:
+        """Summary of the time spent in each phase of this import run, as saved
+        in its `timings.json` file, or `None` if it has not been saved."""
+        return load_timings(self.dir)
+
     def progress_message(self, n: int, **kwargs) -> dict[str, Any]:
         now = datetime.now().timestamp()
         return {
@@ -118,6 +289,28 @@ class ImportRun:
             **kwargs,
         }
 
+    def save_summary(self, force: bool = False):
+        """Update the job's summary file with the current state and counts of this run.
+        Unless `force` is true, does nothing if the summary was saved less than
+        `SUMMARY_INTERVAL` seconds ago."""
+        if not force and self._summary_saved_at is not None:
+            if monotonic() - self._summary_saved_at < SUMMARY_INTERVAL:
+                return
+        self.job.save_summary({
+            'job_id': self.job.id,
+            'model': self.job.config.model,
+            'state': self.state,
+            'run': self.timestamp,
+            'started': self.start_time,
+            'updated': datetime.now().timestamp(),
+            'total': self.count['total_items'],
+            'completed': len(self.job.completed_log),
+            'last_row': self.last_row,
+            'processed': self.processed,
+            'count': dict(self.count),
+        })
+        self._summary_saved_at = monotonic()
+
     def __call__(self, *args, **kwargs):
         return self.run(*args, **kwargs)
 
@@ -129,6 +322,15 @@ class ImportRun:
             validate_only: bool = False,
             import_file: IO = None,
             publish: bool = False,
+            workers: int = 1,
+            processes: int = 1,
+            prefetch: int = 0,
+            batch_size: int = 1,
+            batch_timeout: float = None,
+            retries: int = RetryPolicy.retries,
+            retry_backoff: float = RetryPolicy.backoff,
+            log_batch_size: int = 1,
+            log_fsync_interval: float = None,
     ) -> Generator[dict[str, Any], None, dict[str, Any]]:
         """Execute this import run. Returns a generator that yields a dictionary of
         current status after each item. The generator also returns a final status
@@ -148,6 +350,32 @@ class ImportRun:
 
         print('job status', result['type'])
         ```
+
+        With `workers` greater than 1, rows are processed concurrently by that many
+        worker threads, each running its own transactions. The results are still
+        recorded (and yielded) in spreadsheet order.
+
+        In validation-only mode, `processes` greater than 1 instead spreads the
+        validation across that many worker processes (see `validate_rows_in_processes()`).
+
+        When importing with a single worker and without transaction batching, `prefetch`
+        greater than 0 reads the existing resources for that many upcoming rows in the
+        background (see `prefetch_resources()`).
+
+        When importing with a single worker, `batch_size` greater than 1 loads up to that
+        many rows in each transaction, committing early once a transaction has been open
+        for `batch_timeout` seconds (see `process_rows_in_batches()`).
+
+        Rows that fail to import because of a transient error are retried at the end
+        of the run, up to `retries` times, waiting `retry_backoff` seconds (doubling on
+        each round) before retrying (see `requeue_transient_failures()`). Rows that
+        fail for any other reason are dropped immediately.
+
+        The completed log of the job and the dropped item logs of this run buffer up
+        to `log_batch_size` rows before writing them, and sync them to disk at most
+        every `log_fsync_interval` seconds (see `ItemLog`). The logs are always written
+        when the run ends, but if the process is killed, any rows still in the buffer
+        are lost, and those rows are imported again when the job is resumed.
         """
         if self.dir is not None:
             raise RuntimeError('Run completed, cannot start again')
@@ -155,6 +383,12 @@ class ImportRun:
         self.dir = self.job.dir / self.timestamp
         self.dir.mkdir(parents=True, exist_ok=True)
         self.start_time = datetime.now().timestamp()
+        batch_policy = TransactionBatchPolicy(size=batch_size, timeout=batch_timeout)
+        retry_policy = RetryPolicy(retries=retries, backoff=retry_backoff)
+        self.log_batch_size = log_batch_size
+        self.log_fsync_interval = log_fsync_interval
+        self.job.completed_log.batch_size = log_batch_size
+        self.job.completed_log.fsync_interval = log_fsync_interval
 
         if percentage:
             logger.info(f'Loading {percentage}% of the total items')
@@ -167,12 +401,7 @@ class ImportRun:
         if import_file is not None:
             self.job.store_metadata_file(import_file)
 
-        try:
-            metadata = self.job.get_metadata()
-        except ModelClassNotFoundError as e:
-            raise RuntimeError(f'Model class {e.model_name} not found') from e
-        except JobError as e:
-            raise RuntimeError(str(e)) from e
+        metadata = self.get_metadata()
 
         self.count = Counter(
             total_items=metadata.total,
@@ -186,100 +415,603 @@ class ImportRun:
             updated_items=0,
             unchanged_items=0,
             skipped_items=0,
+            retried_items=0,
         )
         logger.info(f'Found {self.count["initially_completed_items"]} completed items')
         if self.count['initially_completed_items'] > 0:
             logger.debug(f'Completed item identifiers: {self.job.completed_log.item_keys}')
 
         self.state = 'validate_in_progress' if validate_only else 'import_in_progress'
+        self.save_summary(force=True)
         yield self.progress_message(0)
-        for n, row in enumerate(metadata.rows(limit=limit, percentage=percentage, completed=self.job.completed_log), 1):
-            if isinstance(row, InvalidRow):
-                self.drop_invalid(item=None, line_reference=row.line_reference, reason=row.reason)
-                self.count['invalid_items'] += 1
-                yield self.progress_message(n)
-                continue
-
-            logger.debug(f'Row data: {row.data}')
-            import_row = ImportRow(self.job, context, row, validate_only, publish)
+        rows = metadata.rows(limit=limit, percentage=percentage, completed=self.job.completed_log)
+        if validate_only and processes > 1:
+            logger.info(f'Validating rows with {processes} processes')
+            results = self.validate_rows_in_processes(context, rows, processes)
+        elif workers > 1:
+            logger.info(f'Processing rows with {workers} workers')
+            if batch_policy.enabled:
+                logger.warning('Transaction batching is not used with multiple workers')
+            results = self.process_rows_concurrently(context, rows, workers, validate_only, publish)
+        else:
+            if batch_policy.enabled and not validate_only:
+                if prefetch > 0:
+                    # a prefetched row could miss changes that an earlier row in the
+                    # same batch has made, but not yet committed
+                    logger.warning('Prefetching is not used with transaction batching')
+                logger.info(f'Importing up to {batch_policy.size} rows per transaction')
+                results = self.process_rows_in_batches(context, rows, batch_policy, publish)
+            else:
+                if prefetch > 0 and not validate_only:
+                    rows = self.prefetch_resources(context, rows, prefetch)
+                results = (self.process_row(context, row, validate_only, publish) for row in rows)
 
-            # count the number of files referenced in this row
-            self.count['files'] += len(row.filenames)
+        if retry_policy.enabled and not validate_only:
+            results = self.requeue_transient_failures(context, results, retry_policy, publish)
 
-            # validate metadata and files
-            try:
-                validation = import_row.validate_item()
-            except RuntimeError as e:
-                self.count['errors'] += 1
-                logger.warning(f'"{import_row}" caused an error, skipping')
-                self.drop_failed(
-                    item=import_row.item,
-                    line_reference=row.line_reference,
-                    reason=str(e),
-                )
+        try:
+            for n, result in enumerate(results, 1):
+                self.record(result, validate_only)
+                # re-queued rows are recorded out of order
+                self.last_row = max(self.last_row or 0, result.row.line_reference.line_number - 1)
+                self.processed = n
+                self.save_summary()
+                # update the status
                 yield self.progress_message(n)
-                continue
+        finally:
+            self.close()
 
-            if validation.ok:
-                self.count['valid_items'] += 1
-                logger.info(f'"{import_row}" is valid')
+        if validate_only:
+            # validate phase
+            if self.count['invalid_items'] == 0 and self.count['errors'] == 0:
+                self.state = 'validate_success'
             else:
-                # drop invalid items
-                self.count['invalid_items'] += 1
-                logger.warning(f'"{import_row}" is invalid, skipping')
-                reasons = [f'{name} {result}' for name, result in validation.failures()]
-                self.drop_invalid(
-                    item=import_row.item,
-                    line_reference=row.line_reference,
-                    reason=f'Validation failures: {"; ".join(reasons)}'
-                )
-                yield self.progress_message(n)
-                continue
+                self.state = 'validate_failed'
+        else:
+            # import phase
+            if len(self.job.completed_log) == self.count['total_items']:
+                self.state = 'import_complete'
+            else:
+                self.state = 'import_incomplete'
 
-            if validate_only:
-                # validation-only mode
-                yield self.progress_message(n)
-                continue
+        self.save_summary(force=True)
+        self.timer.save(self.dir)
+        return self.progress_message(
+            n=self.count['total_items'],
+            type=self.state,
+            validation=self.job.validation_reports,
+            timings=self.timer.summary(),
+        )
 
-            try:
-                status = import_row.update_repo()
-                self.complete(import_row, status)
-                if status == ImportedItemStatus.CREATED:
-                    self.count['created_items'] += 1
-                elif status == ImportedItemStatus.MODIFIED:
-                    self.count['updated_items'] += 1
-                elif status == ImportedItemStatus.UNCHANGED:
-                    self.count['unchanged_items'] += 1
-                    self.count['skipped_items'] += 1
-                else:
-                    raise RuntimeError(f'Unknown status "{status}" returned when importing "{import_row.item}"')
-            except JobError as e:
-                self.count['items_with_errors'] += 1
-                logger.error(f'{import_row} import failed: {e}')
-                self.drop_failed(import_row.item, row.line_reference, reason=str(e))
+    def close(self):
+        """Close the job, and the logs of items dropped during this run."""
+        self.job.close()
+        for item_log in (self._invalid_items, self._failed_items):
+            if item_log is not None:
+                item_log.close()
+
+    def get_metadata(self) -> MetadataSpreadsheet:
+        try:
+            return self.job.get_metadata()
+        except ModelClassNotFoundError as e:
+            raise RuntimeError(f'Model class {e.model_name} not found') from e
+        except JobError as e:
+            raise RuntimeError(str(e)) from e
+
+    def run_sharded(
+            self,
+            shards: int,
+            dispatch: Callable[[int, 'ImportJob'], None],
+            import_file: IO = None,
+            validate_only: bool = False,
+            poll_interval: float = SHARD_POLL_INTERVAL,
+            timeout: float = None,
+            stale_after: float = SHARD_STALE_AFTER,
+            wait: Callable[[float], None] = sleep,
+    ) -> Generator[dict[str, Any], None, dict[str, Any]]:
+        """Execute this import run as the coordinator of a sharded import. Returns a
+        generator of status updates and a final status, the same as `run()`.
+
+        The rows of the job that are not yet completed are split into `shards`
+        contiguous row ranges (see `ImportJob.create_shards()`), and `dispatch` is
+        called with the number and job of each shard, so that it can be run elsewhere
+        (typically by sending a message to another plastrond instance, which then runs
+        the shard with `ImportJob.run_shard()`). If the job has already been split
+        into shards, those shards are reused, and any that have already been completely
+        imported are not dispatched again. Shards that are still in progress (e.g., from
+        an earlier coordinator) are not dispatched again either, so that no two plastrond
+        instances import the same rows at the same time, unless their summary has not
+        been updated for `stale_after` seconds.
+
+        The coordinator then checks the summary of each shard it is waiting for every
+        `poll_interval` seconds, until all the shards have finished or stalled (i.e.,
+        their summary has not been updated for `stale_after` seconds), or `timeout`
+        seconds have passed. Finally, the completed items of the shards are added to
+        the completed log of the job, and the dropped items of the latest run of each
+        shard are added to the dropped item logs of this run.
+        """
+        if self.dir is not None:
+            raise RuntimeError('Run completed, cannot start again')
+        self.timestamp = datetimestamp()
+        self.dir = self.job.dir / self.timestamp
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.start_time = datetime.now().timestamp()
+
+        if import_file is not None:
+            self.job.store_metadata_file(import_file)
 
-            # update the status
-            yield self.progress_message(n)
+        metadata = self.get_metadata()
+        shard_jobs = self.job.shards
+        if shard_jobs:
+            logger.info(f'Reusing the {len(shard_jobs)} existing shards of job {self.job}')
+        else:
+            shard_jobs = self.job.create_shards(shards, metadata)
 
+        self.count = Counter(
+            total_items=metadata.total,
+            initially_completed_items=len(self.job.completed_log),
+            shards=len(shard_jobs),
+        )
+        self.state = 'validate_in_progress' if validate_only else 'import_in_progress'
+        self.save_summary(force=True)
+        yield self.progress_message(0)
+
+        summaries = {}
+        try:
+            # shards that this run waits for
+            waiting = {}
+            for number, shard in enumerate(shard_jobs, 1):
+                summary = shard.load_summary() or {}
+                state = summary.get('state')
+                if not validate_only and state == 'import_complete':
+                    logger.info(f'Shard {number} of job {self.job} is already complete')
+                    continue
+                if state is not None and state not in FINISHED_STATES:
+                    if not is_stalled(summary, stale_after):
+                        logger.warning(f'Shard {number} of job {self.job} is already in progress; waiting for it')
+                        waiting[number] = shard
+                        continue
+                    logger.warning(f'Shard {number} of job {self.job} has stalled; dispatching it again')
+                # a summary left over from a previous run of the shard is not its current state
+                shard.summary_file.unlink(missing_ok=True)
+                dispatch(number, shard)
+                logger.info(f'Dispatched shard {number} of job {self.job}')
+                waiting[number] = shard
+
+            deadline = None if timeout is None else monotonic() + timeout
+            while True:
+                summaries = {number: shard.load_summary() or {} for number, shard in waiting.items()}
+                processed = sum(summary.get('processed', 0) for summary in summaries.values())
+                if processed != self.processed:
+                    self.processed = processed
+                    self.save_summary()
+                    yield self.progress_message(processed)
+                if all(
+                    summary.get('state') in FINISHED_STATES or is_stalled(summary, stale_after)
+                    for summary in summaries.values()
+                ):
+                    break
+                if deadline is not None and monotonic() >= deadline:
+                    logger.warning(f'Stopped waiting for the shards of job {self.job} after {timeout} seconds')
+                    break
+                wait(poll_interval)
+
+            for number, summary in summaries.items():
+                if is_stalled(summary, stale_after):
+                    logger.warning(f'Shard {number} of job {self.job} has stalled; no longer waiting for it')
+                    summaries[number] = {**summary, 'state': 'import_stalled'}
+
+            for number, shard in enumerate(shard_jobs, 1):
+                self.merge_shard(shard, summaries.get(number))
+        finally:
+            self.close()
+
+        shard_states = [summary.get('state') for summary in summaries.values()]
         if validate_only:
-            # validate phase
-            if self.count['invalid_items'] == 0 and self.count['errors'] == 0:
+            if all(state == 'validate_success' for state in shard_states):
                 self.state = 'validate_success'
             else:
                 self.state = 'validate_failed'
         else:
-            # import phase
             if len(self.job.completed_log) == self.count['total_items']:
                 self.state = 'import_complete'
             else:
                 self.state = 'import_incomplete'
 
+        self.save_summary(force=True)
         return self.progress_message(
             n=self.count['total_items'],
             type=self.state,
-            validation=self.job.validation_reports,
+            shards=[
+                {'job_id': shard.id, 'state': summaries.get(number, {}).get('state', 'import_complete')}
+                for number, shard in enumerate(shard_jobs, 1)
+            ],
         )
 
+    def merge_shard(self, shard: 'ImportJob', summary: Optional[dict[str, Any]]):
+        """Add the completed items of `shard` to the completed log of the job. If the
+        shard was dispatched by this run and has started (i.e., there is a `summary` of its latest run),
+        also add its dropped items to the logs of this run, and its counts to the counts
+        of this run."""
+        for row in shard.completed_log:
+            if row['id'] not in self.job.completed_log:
+                self.job.completed_log.append(row)
+        shard.completed_log.close()
+        if not summary:
+            return
+
+        for key, value in summary.get('count', {}).items():
+            if key not in ('total_items', 'initially_completed_items'):
+                self.count[key] += value
+        shard_run = shard.latest_run()
+        if shard_run is None:
+            return
+        for row in shard_run.invalid_items:
+            self.invalid_items.append(row)
+        for row in shard_run.failed_items:
+            self.failed_items.append(row)
+
+    def process_row(
+            self,
+            context: PlastronContext,
+            row: Union[Row, InvalidRow],
+            validate_only: bool = False,
+            publish: bool = False,
+    ) -> ImportRowResult:
+        """Validate a single row and, unless `validate_only` is true, load it into
+        the repository. Does not update the counts or logs of this run; pass the
+        returned result to `record()` to do that."""
+        if isinstance(row, InvalidRow):
+            return ImportRowResult(row=row)
+
+        logger.debug(f'Row data: {row.data}')
+        try:
+            import_row = ImportRow(self.job, context, row, validate_only, publish, timer=self.timer)
+        except (ClientError, TransactionError, RuntimeError) as e:
+            if not is_transient_error(e):
+                raise
+            # e.g., unable to read the existing resource; report it so it can be retried
+            return ImportRowResult(row=row, error=e)
+        result = ImportRowResult(row=row, import_row=import_row, item=import_row.item)
+
+        # validate metadata and files
+        try:
+            result.validation = import_row.validate_item()
+        except RuntimeError as e:
+            result.error = e
+            return result
+
+        if not result.validation.ok or validate_only:
+            return result
+
+        try:
+            with self.timer.time('update_repo', import_row):
+                result.status = import_row.update_repo()
+        except JobError as e:
+            result.error = e
+        except (ClientError, TransactionError, RuntimeError) as e:
+            if not is_transient_error(e):
+                raise
+            result.error = e
+        return result
+
+    def requeue_transient_failures(
+            self,
+            context: PlastronContext,
+            results: Iterable[ImportRowResult],
+            policy: RetryPolicy,
+            publish: bool = False,
+    ) -> Iterator[ImportRowResult]:
+        """Yield each of `results`, except for rows that failed with a transient error
+        (see `is_transient_error()`). Those rows are re-queued, and retried one at a
+        time once all the other rows have been processed, in up to `policy.retries`
+        rounds. A row that still fails after its last retry, or that fails with a
+        permanent error when retried, is yielded with that error."""
+        def is_retryable(result: ImportRowResult) -> bool:
+            return result.error is not None and result.status is None and is_transient_error(result.error)
+
+        queue = []
+        failed_at = None
+        for result in results:
+            if is_retryable(result):
+                logger.warning(f'{result.row.line_reference} failed with a transient error, will retry: {result.error}')
+                self.count['retried_items'] += 1
+                queue.append(result.row)
+                failed_at = monotonic()
+            else:
+                yield result
+
+        for attempt in range(1, policy.retries + 1):
+            if not queue:
+                return
+            wait = failed_at + policy.delay(attempt) - monotonic()
+            logger.info(
+                f'Retrying {len(queue)} row(s) with transient failures (attempt {attempt}/{policy.retries})'
+                + (f' in {wait:.1f} seconds' if wait > 0 else '')
+            )
+            if wait > 0:
+                sleep(wait)
+            rows, queue = queue, []
+            for row in rows:
+                # read the existing resource again
+                row.prefetched = None
+                result = self.process_row(context, row, publish=publish)
+                if attempt < policy.retries and is_retryable(result):
+                    logger.warning(f'{row.line_reference} failed again with a transient error: {result.error}')
+                    queue.append(row)
+                    failed_at = monotonic()
+                else:
+                    yield result
+
+    def process_rows_concurrently(
+            self,
+            context: PlastronContext,
+            rows: Iterable[Union[Row, InvalidRow]],
+            workers: int,
+            validate_only: bool = False,
+            publish: bool = False,
+    ) -> Iterator[ImportRowResult]:
+        """Process `rows` using a pool of `workers` threads, and yield the results
+        in the same order as `rows`. At most twice as many rows as there are workers
+        are read ahead of the results. Rows with the same URI are processed one at
+        a time, in order.
+
+        The workers share the repository of `context`; each runs its own transactions,
+        which are bound to its thread."""
+        # create the shared repository before any of the workers need it
+        _ = context.repo
+        # most recently submitted row for each URI
+        last_for_uri: dict[URIRef, Future] = {}
+
+        def process(row, previous: Optional[Future]):
+            if previous is not None:
+                wait([previous])
+            return self.process_row(context, row, validate_only, publish)
+
+        def next_result(pending: deque) -> ImportRowResult:
+            uri, future = pending.popleft()
+            if last_for_uri.get(uri) is future:
+                del last_for_uri[uri]
+            return future.result()
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import') as executor:
+            for row in rows:
+                uri = getattr(row, 'uri', None)
+                future = executor.submit(process, row, last_for_uri.get(uri))
+                if uri is not None:
+                    last_for_uri[uri] = future
+                pending.append((uri, future))
+                if len(pending) >= workers * 2:
+                    yield next_result(pending)
+            while pending:
+                yield next_result(pending)
+
+    def process_rows_in_batches(
+            self,
+            context: PlastronContext,
+            rows: Iterable[Union[Row, InvalidRow]],
+            policy: TransactionBatchPolicy,
+            publish: bool = False,
+    ) -> Iterator[ImportRowResult]:
+        """Process `rows`, loading batches of them into the repository in a single
+        transaction each, as determined by `policy`. The results of a batch are
+        yielded, in the same order as `rows`, once its transaction is committed.
+
+        If any row in a batch fails to load, or the transaction cannot be committed,
+        the batch is rolled back and retried using `retry_rows()`, so that only the
+        rows that fail on their own are reported as failed."""
+        rows = iter(rows)
+        for row in rows:
+            try:
+                yield from self.import_rows(context, chain([row], rows), publish, policy)
+            except BatchFailure as e:
+                logger.warning(f'Batch of {len(e.rows)} rows failed and was rolled back: {e}')
+                yield from self.retry_rows(context, e.rows, publish)
+
+    def retry_rows(
+            self,
+            context: PlastronContext,
+            rows: list[Union[Row, InvalidRow]],
+            publish: bool = False,
+    ) -> Iterator[ImportRowResult]:
+        """Retry loading `rows` in a single transaction. If that fails, split `rows`
+        in half and retry each half in its own transaction, until the failing rows
+        are isolated."""
+        for row in rows:
+            if isinstance(row, Row):
+                # read the existing resources again, inside the new transaction
+                row.prefetched = None
+        try:
+            yield from self.import_rows(context, iter(rows), publish)
+        except BatchFailure as e:
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                logger.info(f'Retrying rows {rows[0].line_reference} to {rows[-1].line_reference} in two batches')
+                yield from self.retry_rows(context, rows[:middle], publish)
+                yield from self.retry_rows(context, rows[middle:], publish)
+            else:
+                # this row fails on its own
+                result = e.results[0] if e.results else ImportRowResult(row=rows[0])
+                result.status = None
+                if result.error is None:
+                    result.error = e.error
+                yield result
+
+    def import_rows(
+            self,
+            context: PlastronContext,
+            rows: Iterator[Union[Row, InvalidRow]],
+            publish: bool = False,
+            policy: Optional[TransactionBatchPolicy] = None,
+    ) -> list[ImportRowResult]:
+        """Process `rows` in a single transaction, and return their results once it is
+        committed. With a `policy`, stops taking rows from `rows` once the batch is full.
+        Raises a `BatchFailure` if any row fails to load or the transaction cannot be
+        committed."""
+        taken = []
+        results = []
+        started = monotonic()
+        try:
+            with context.repo.transaction():
+                for row in rows:
+                    taken.append(row)
+                    result = self.process_row(context, row, publish=publish)
+                    results.append(result)
+                    if result.validation is not None and result.error is not None:
+                        raise BatchFailure(result.error, taken, results)
+                    if policy is not None and policy.is_full(len(taken), monotonic() - started):
+                        break
+                commit_started = perf_counter()
+            if taken:
+                batch = f'{taken[0].line_reference} ({len(taken)} rows)'
+                self.timer.record('commit', perf_counter() - commit_started, batch)
+        except (TransactionError, ClientError) as e:
+            if not taken:
+                # unable to start the transaction
+                raise
+            raise BatchFailure(e, taken, results) from e
+        return results
+
+    def prefetch_resources(
+            self,
+            context: PlastronContext,
+            rows: Iterable[Union[Row, InvalidRow]],
+            lookahead: int,
+    ) -> Iterator[Union[Row, InvalidRow]]:
+        """Pass through `rows`, while reading the existing resources for up to `lookahead`
+        rows ahead in background threads. Each row is yielded with its `prefetched`
+        resource set, so that `Row.get_object()` does not have to wait for the read.
+
+        Reads are done outside any transaction. A row whose URI is the same as an
+        earlier row that has not been processed yet is not prefetched, so it will
+        see any changes made by that earlier row."""
+        repo = Repository(client=context.client)
+        window = deque()
+        uris_in_window = Counter()
+
+        def release() -> Union[Row, InvalidRow]:
+            row, uri, future = window.popleft()
+            if uri is not None:
+                uris_in_window[uri] -= 1
+            if future is not None:
+                try:
+                    row.prefetched = future.result()
+                except RepositoryError as e:
+                    # leave it to get_object() to read it again and report the error
+                    logger.warning(f'Unable to prefetch {uri}: {e}')
+            return row
+
+        with ThreadPoolExecutor(max_workers=lookahead, thread_name_prefix='prefetch') as executor:
+            for row in rows:
+                uri = getattr(row, 'uri', None)
+                future = None
+                if uri is not None:
+                    if uris_in_window[uri] == 0:
+                        future = executor.submit(lambda u: repo[u].read(), uri)
+                    uris_in_window[uri] += 1
+                window.append((row, uri, future))
+                if len(window) > lookahead:
+                    yield release()
+            while window:
+                yield release()
+
+    def validate_rows_in_processes(
+            self,
+            context: PlastronContext,
+            rows: Iterable[Union[Row, InvalidRow]],
+            processes: int,
+            shard_size: int = VALIDATION_SHARD_SIZE,
+    ) -> Iterator[ImportRowResult]:
+        """Validate `rows` using a pool of `processes` worker processes, and yield
+        the results in the same order as `rows`. Rows are sent to the workers in
+        shards of `shard_size` rows. Each worker builds its own copy of the job and
+        a context from the configuration of `context`, so the configuration must be
+        picklable."""
+        pending = deque()
+        job = self.job
+        initargs = (type(job), job.id, job.dir, job.ssh_private_key, job.config, context.config)
+
+        def merged_results(shard: list, future: Future) -> Iterator[ImportRowResult]:
+            results = iter(future.result())
+            for row in shard:
+                if isinstance(row, InvalidRow):
+                    yield ImportRowResult(row=row)
+                else:
+                    result = next(results)
+                    result.row = row
+                    yield result
+
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_validation_worker, initargs=initargs)
+        with executor:
+            rows = iter(rows)
+            while shard := list(islice(rows, shard_size)):
+                shard_data = [(row.line_reference, row.number, row.data) for row in shard if isinstance(row, Row)]
+                pending.append((shard, executor.submit(_validate_shard, shard_data)))
+                if len(pending) >= processes * 2:
+                    yield from merged_results(*pending.popleft())
+            while pending:
+                yield from merged_results(*pending.popleft())
+
+    def record(self, result: ImportRowResult, validate_only: bool = False):
+        """Update the counts and logs of this run with the result of processing a row."""
+        row = result.row
+        if isinstance(row, InvalidRow):
+            self.drop_invalid(item=None, line_reference=row.line_reference, reason=row.reason)
+            self.count['invalid_items'] += 1
+            return
+
+        item = result.item
+        # count the number of files referenced in this row
+        self.count['files'] += len(row.filenames)
+
+        if result.validation is None:
+            self.count['errors'] += 1
+            logger.warning(f'"{row.line_reference}" caused an error, skipping')
+            self.drop_failed(
+                item=item,
+                line_reference=row.line_reference,
+                reason=str(result.error),
+            )
+            return
+
+        if result.validation.ok:
+            self.count['valid_items'] += 1
+            logger.info(f'"{row.line_reference}" is valid')
+        else:
+            # drop invalid items
+            self.count['invalid_items'] += 1
+            logger.warning(f'"{row.line_reference}" is invalid, skipping')
+            reasons = [f'{name} {failure}' for name, failure in result.validation.failures()]
+            self.drop_invalid(
+                item=item,
+                line_reference=row.line_reference,
+                reason=f'Validation failures: {"; ".join(reasons)}'
+            )
+            return
+
+        if validate_only:
+            # validation-only mode
+            return
+
+        if result.error is not None:
+            self.count['items_with_errors'] += 1
+            logger.error(f'{row.line_reference} import failed: {result.error}')
+            self.drop_failed(item, row.line_reference, reason=str(result.error))
+            return
+
+        status = result.status
+        self.complete(result.import_row, status)
+        if status == ImportedItemStatus.CREATED:
+            self.count['created_items'] += 1
+        elif status == ImportedItemStatus.MODIFIED:
+            self.count['updated_items'] += 1
+        elif status == ImportedItemStatus.UNCHANGED:
+            self.count['unchanged_items'] += 1
+            self.count['skipped_items'] += 1
+        else:
+            raise RuntimeError(f'Unknown status "{status}" returned when importing "{item}"')
+
     def drop_failed(self, item, line_reference, reason=''):
         """
         Add the item to the log of failed items for this run.
@@ -327,6 +1059,43 @@ class ImportRun:
         self.job.complete(row, status)
 
 
+_validation_worker: Optional[tuple[ImportRun, PlastronContext, MetadataSpreadsheet]] = None
+
+
+def _init_validation_worker(job_class, job_id, job_dir, ssh_private_key, job_config, config):
+    """Set up the job, context, and spreadsheet used by a validation worker process."""
+    global _validation_worker
+    job = job_class(job_id=job_id, job_dir=job_dir, ssh_private_key=ssh_private_key)
+    job.config = job_config
+    # close any ZIP files or spooled archives when the worker process exits
+    Finalize(job, job.close, exitpriority=10)
+    _validation_worker = (job.new_run(), PlastronContext(config=config), job.get_metadata())
+
+
+def _validate_shard(shard_data: list[tuple[LineReference, int, Mapping[str, str]]]) -> list[ImportRowResult]:
+    """Validate a shard of rows in a validation worker process. Returns results that
+    can be sent back to the parent process."""
+    run, context, metadata = _validation_worker
+    results = []
+    for line_reference, row_number, data in shard_data:
+        row = Row(metadata, line_reference, row_number, data, metadata.identifier_column)
+        result = run.process_row(context, row, validate_only=True)
+        results.append(ImportRowResult(
+            row=None,
+            item=LoggedItem.from_item(result.item, line_reference),
+            validation=_strip_validation_results(result.validation),
+            error=RuntimeError(str(result.error)) if result.error is not None else None,
+        ))
+    return results
+
+
+def _strip_validation_results(results: Optional[ValidationResultsDict]) -> Optional[ValidationResultsDict]:
+    """Copy of the validation results without their (unpicklable) property references."""
+    if results is None:
+        return None
+    return ValidationResultsDict({name: type(result)(message=result.message) for name, result in results.items()})
+
+
 class ImportJob(Job):
     run_class = ImportRun
     config_class = ImportConfig
@@ -337,11 +1106,44 @@ class ImportJob(Job):
         self._model_class = None
         self.ssh_private_key = ssh_private_key
         self.validation_reports = []
+        self._zip_registry = None
+        self._zip_registry_lock = threading.Lock()
+        # spreadsheets opened by get_metadata(), to be closed along with this job
+        self._metadata: list[MetadataSpreadsheet] = []
+
+    @property
+    def zip_registry(self) -> ZipFileRegistry:
+        """Shared registry of the ZIP files used as binaries locations by this job,
+        so each archive is opened (and, if remote, downloaded) only once."""
+        with self._zip_registry_lock:
+            if self._zip_registry is None:
+                self._zip_registry = ZipFileRegistry()
+            return self._zip_registry
+
+    def close(self):
+        """Release any resources held by this job, such as open ZIP files, metadata
+        files, and logs."""
+        self.completed_log.close()
+        while self._metadata:
+            self._metadata.pop().close()
+        if self._zip_registry is not None:
+            self._zip_registry.close()
+            self._zip_registry = None
 
     @property
     def metadata_file(self) -> Path:
         return self.dir / 'source.csv'
 
+    @property
+    def binaries_file(self) -> Path:
+        """ZIP file of binaries uploaded to the job directory, if any."""
+        return self.dir / 'binaries.zip'
+
+    @property
+    def metadata_index_file(self) -> Path:
+        """Saved `RowIndex` of the `metadata_file`."""
+        return self.dir / 'source.index.json'
+
     @property
     def model_class(self):
         if self._model_class is None:
@@ -365,13 +1167,16 @@ class ImportJob(Job):
 
     def get_metadata(self) -> MetadataSpreadsheet:
         try:
-            return MetadataSpreadsheet(
+            metadata = MetadataSpreadsheet(
                 metadata_filename=self.metadata_file,
                 model_class=self.model_class,
-                file_grouping_strategy=self.config.file_grouping_strategy
+                file_grouping_strategy=self.config.file_grouping_strategy,
+                index_filename=self.metadata_index_file,
             )
         except MetadataError as e:
             raise JobError(job=self) from e
+        self._metadata.append(metadata)
+        return metadata
 
     def run(
             self,
@@ -381,6 +1186,15 @@ class ImportJob(Job):
             validate_only: bool = False,
             import_file: IO = None,
             publish: bool = False,
+            workers: int = 1,
+            processes: int = 1,
+            prefetch: int = 0,
+            batch_size: int = 1,
+            batch_timeout: float = None,
+            retries: int = RetryPolicy.retries,
+            retry_backoff: float = RetryPolicy.backoff,
+            log_batch_size: int = 1,
+            log_fsync_interval: float = None,
     ) -> Generator[dict[str, Any], None, dict[str, Any]]:
         run = self.new_run()
         return run(
@@ -390,8 +1204,116 @@ class ImportJob(Job):
             validate_only=validate_only,
             import_file=import_file,
             publish=publish,
+            workers=workers,
+            processes=processes,
+            prefetch=prefetch,
+            batch_size=batch_size,
+            batch_timeout=batch_timeout,
+            retries=retries,
+            retry_backoff=retry_backoff,
+            log_batch_size=log_batch_size,
+            log_fsync_interval=log_fsync_interval,
         )
 
+    def run_sharded(
+            self,
+            shards: int,
+            dispatch: Callable[[int, 'ImportJob'], None],
+            import_file: IO = None,
+            validate_only: bool = False,
+            poll_interval: float = SHARD_POLL_INTERVAL,
+            timeout: float = None,
+            stale_after: float = SHARD_STALE_AFTER,
+    ) -> Generator[dict[str, Any], None, dict[str, Any]]:
+        run = self.new_run()
+        return run.run_sharded(
+            shards=shards,
+            dispatch=dispatch,
+            import_file=import_file,
+            validate_only=validate_only,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            stale_after=stale_after,
+        )
+
+    def run_shard(self, **kwargs) -> Generator[dict[str, Any], None, dict[str, Any]]:
+        """Run this job as one shard of a sharded import, with the same arguments as
+        `run()`. If the run fails with an exception, the summary of this job is set to
+        the `import_error` state, so that the coordinator stops waiting for it."""
+        try:
+            return (yield from self.run(**kwargs))
+        except Exception as e:
+            summary = self.load_summary() or {}
+            self.save_summary({**summary, 'job_id': self.id, 'state': 'import_error', 'error': str(e)})
+            raise
+
+    @property
+    def shards_dir(self) -> Path:
+        return self.dir / 'shards'
+
+    @property
+    def shards(self) -> list['ImportJob']:
+        """The shards of this job, in order, or an empty list if it has not been split
+        into shards."""
+        if not self.shards_dir.is_dir():
+            return []
+        numbers = sorted(int(d.name) for d in self.shards_dir.iterdir() if d.is_dir() and d.name.isdigit())
+        return [self.get_shard(number) for number in numbers]
+
+    def get_shard(self, number: int) -> 'ImportJob':
+        """Get shard `number` (counting from 1) of this job. Raises a `JobNotFoundError`
+        if there is no such shard."""
+        shard_dir = self.shards_dir / str(number)
+        if not shard_dir.is_dir():
+            raise JobNotFoundError(self, f'Shard {number} of job {self.id} does not exist')
+        shard = ImportJob(job_id=f'{self.id}/shards/{number}', job_dir=shard_dir, ssh_private_key=self.ssh_private_key)
+        return shard.load_config()
+
+    def create_shards(self, count: int, metadata: MetadataSpreadsheet = None) -> list['ImportJob']:
+        """Split the rows of the metadata file that are not in the completed log into
+        (at most) `count` contiguous row ranges of nearly equal size, and create an
+        import job for each range in the `shards` directory of this job. Each shard
+        has a copy of the config of this job, and a metadata file containing the
+        header and the rows in its range."""
+        if count < 1:
+            raise RuntimeError(f'Number of shards must be 1 or greater, got {count}')
+        if self.shards:
+            raise RuntimeError(f'Job {self.id} has already been split into shards')
+        if metadata is None:
+            metadata = self.get_metadata()
+        if metadata.index is None:
+            raise RuntimeError('Cannot split a metadata file into shards without a row index')
+
+        index = list(metadata.index)
+        # each row extends to the start of the next row, or the end of the file
+        ends = [entry.offset for entry in index[1:]] + [self.metadata_file.stat().st_size]
+        rows = [(entry, end) for entry, end in zip(index, ends) if entry.identifier not in self.completed_log]
+        count = max(min(count, len(rows)), 1)
+        size, remainder = divmod(len(rows), count)
+
+        shards = []
+        with self.metadata_file.open(mode='rb') as fh:
+            header = fh.read(index[0].offset if index else self.metadata_file.stat().st_size)
+            start = 0
+            for number in range(1, count + 1):
+                end = start + size + (1 if number <= remainder else 0)
+                shard_dir = self.shards_dir / str(number)
+                shard_dir.mkdir(parents=True)
+                replace(self.config, job_id=f'{self.id}/shards/{number}').save(shard_dir / 'config.yml')
+                with (shard_dir / 'source.csv').open(mode='wb') as shard_file:
+                    shard_file.write(header)
+                    for entry, row_end in rows[start:end]:
+                        fh.seek(entry.offset)
+                        shard_file.write(fh.read(row_end - entry.offset))
+                if start < end:
+                    logger.info(
+                        f'Created shard {number} of job {self.id} with rows {rows[start][0].number} '
+                        f'to {rows[end - 1][0].number}'
+                    )
+                shards.append(self.get_shard(number))
+                start = end
+        return shards
+
     @property
     def access(self) -> Optional[URIRef]:
         if self.config.access is not None:
@@ -422,14 +1344,17 @@ class ImportJob(Job):
         * ``sftp:<user>@<host>/<path to dir>``
         * ``http://<host>/<path to dir>``
         * ``zip+sftp:<user>@<host>/<path to zipfile>``
+        * ``zip+http://<host>/<path to zipfile>``
         * ``<local dir path>``
 
+        ZIP file sources share the job's `zip_registry`.
+
         :param base_location:
         :param path:
         :return:
         """
         if base_location.startswith('zip:'):
-            return ZipFileSource(base_location[4:], path)
+            return ZipFileSource(base_location[4:], path, registry=self.zip_registry)
         elif base_location.startswith('sftp:'):
             return RemoteFileSource(
                 location=os.path.join(base_location, path),
@@ -437,17 +1362,29 @@ class ImportJob(Job):
             )
         elif base_location.startswith('http:') or base_location.startswith('https:'):
             base_uri = base_location if base_location.endswith('/') else base_location + '/'
-            return HTTPFileSource(base_uri + path)
+            return HTTPFileSource(base_uri + path, spool=True)
         elif base_location.startswith('zip+sftp:'):
             return ZipFileSource(
                 zip_file=base_location[4:],
                 path=path,
-                ssh_options={'key_filename': self.ssh_private_key}
+                ssh_options={'key_filename': self.ssh_private_key},
+                registry=self.zip_registry,
             )
+        elif base_location.startswith('zip+http:') or base_location.startswith('zip+https:'):
+            return ZipFileSource(zip_file=base_location[4:], path=path, registry=self.zip_registry)
         else:
             # with no URI prefix, assume a local file path
             return LocalFileSource(localpath=os.path.join(base_location, path))
 
+    def probe_files(self, filenames: Iterable[str]) -> dict[str, BinarySourceInfo]:
+        """Check all the given file names in the job's binaries location together,
+        using `plastron.files.probe_sources()`. This may be called with the files of
+        a single row or of a whole job. Returns a dictionary mapping each file name
+        to its `BinarySourceInfo`."""
+        names = list(dict.fromkeys(filenames))
+        sources = [self.get_source(self.config.binaries_location, name) for name in names]
+        return dict(zip(names, probe_sources(sources)))
+
 
 class PublishableObjectResource(PCDMObjectResource, PublishableResource):
     pass
@@ -461,11 +1398,14 @@ class ImportRow:
             row: Row,
             validate_only: bool = False,
             publish: bool = None,
+            timer: PhaseTimer = None,
     ):
         self.job = job
         self.row = row
         self.context = context
-        self.item = row.get_object(context.repo, read_from_repo=not validate_only)
+        self.timer = timer if timer is not None else PhaseTimer()
+        with self.timer.time('get_object', self):
+            self.item = row.get_object(context.repo, read_from_repo=not validate_only)
         if publish is not None:
             self._publish = publish
 
@@ -480,7 +1420,8 @@ class ImportRow:
         """Validate the item for this import row, and check that all files
         listed are present."""
         try:
-            results: ValidationResultsDict = self.item.validate()
+            with self.timer.time('validate', self):
+                results: ValidationResultsDict = self.item.validate()
         except ValidationError as e:
             raise RuntimeError(f'Unable to run validation: {e}') from e
 
@@ -491,18 +1432,31 @@ class ImportRow:
         if (self.row.has_files or self.row.has_item_files) and not self.job.config.binaries_location:
             raise RuntimeError('Must specify --binaries-location if the metadata has a FILES and/or ITEM_FILES column')
 
-        results['FILES'] = self.validate_files(self.row.filenames)
-        results['ITEM_FILES'] = self.validate_files(f.name for f in self.row.item_files)
+        filenames = list(self.row.filenames)
+        item_filenames = [f.name for f in self.row.item_files]
+        with self.timer.time('validate_files', self):
+            # check the files and item files together in a single batch
+            file_info = self.job.probe_files([*filenames, *item_filenames]) if filenames or item_filenames else {}
+
+            results['FILES'] = self.validate_files(filenames, file_info)
+            results['ITEM_FILES'] = self.validate_files(item_filenames, file_info)
 
         return results
 
-    def validate_files(self, filenames: Iterable[str]) -> ValidationResult:
+    def validate_files(
+            self,
+            filenames: Iterable[str],
+            file_info: Mapping[str, BinarySourceInfo] = None,
+    ) -> ValidationResult:
         """Check that a file exists in the job's binaries location for each
-        file name given."""
-        missing_files = [
-            name for name in filenames
-            if not self.job.get_source(self.job.config.binaries_location, name).exists()
-        ]
+        file name given. Any file names not already present in `file_info`
+        are checked together using `ImportJob.probe_files()`."""
+        filenames = list(filenames)
+        file_info = dict(file_info or {})
+        unchecked = [name for name in filenames if name not in file_info]
+        if unchecked:
+            file_info.update(self.job.probe_files(unchecked))
+        missing_files = [name for name in filenames if not file_info[name].exists]
         if len(missing_files) == 0:
             return ValidationSuccess(
                 prop=None,
@@ -518,7 +1472,8 @@ class ImportRow:
         """Either creates a new item, updates an existing item, or does nothing
         to an existing item (if there are no changes)."""
         if self.item.uri.startswith('urn:uuid:'):
-            resource = self.create_resource()
+            with self.timer.time('create_resource', self):
+                resource = self.create_resource()
             logger.info(f'Created {resource.url}')
             return ImportedItemStatus.CREATED
 
@@ -543,10 +1498,11 @@ class ImportRow:
             return ImportedItemStatus.UNCHANGED
 
     def publish(self, resource: PublishableObjectResource) -> HandleInfo:
-        return resource.publish(
-            handle_client=self.context.handle_client,
-            public_url=self.context.get_public_url(resource),
-        )
+        with self.timer.time('publish', self):
+            return resource.publish(
+                handle_client=self.context.handle_client,
+                public_url=self.context.get_public_url(resource),
+            )
 
     def create_resource(self) -> PublishableObjectResource:
         """Create a new item in the repository."""
@@ -570,6 +1526,8 @@ class ImportRow:
         logger.debug(f'Repo: {self.context.repo}')
         container: ContainerResource = self.context.repo[self.job.config.container:ContainerResource]
 
+        # when joining a batch transaction, the commit happens (and is timed) later
+        joined = self.context.repo.in_transaction
         try:
             with self.context.repo.transaction():
                 # create the main resource
@@ -584,21 +1542,27 @@ class ImportRow:
                     for file_group in self.row.file_groups.values():
                         for file in file_group.files:
                             file.source = self.job.get_source(self.job.config.binaries_location, file.name)
-                    resource.create_page_sequence(self.row.file_groups)
+                    with self.timer.time('create_page_sequence', self):
+                        resource.create_page_sequence(self.row.file_groups)
 
                 # item-level files
                 if self.row.has_item_files:
                     for file in self.row.item_files:
                         source = self.job.get_source(self.job.config.binaries_location, file.name)
-                        resource.create_file(source=source, rdf_types=file.rdf_types)
+                        with self.timer.time('create_file', f'{self}: {file.name}'):
+                            resource.create_file(source=source, rdf_types=file.rdf_types)
 
                 # publish this resource, if requested
                 if self._publish:
                     self.publish(resource)
 
+                commit_started = perf_counter()
+
         except ClientError as e:
             raise JobError(self.job, f'Creating item failed: {e}', e.response.text) from e
         else:
+            if not joined:
+                self.timer.record('commit', perf_counter() - commit_started, self)
             return resource
 
 
@@ -1,5 +1,8 @@
 import csv
+import hashlib
+import json
 import logging
+import os
 import re
 from collections import defaultdict
 from collections.abc import Container, Sized
@@ -64,6 +67,149 @@ class LineReference(NamedTuple):
         return f'{self.filename}:{self.line_number}'
 
 
+class RowIndexEntry(NamedTuple):
+    """Location and key values of a single row of a metadata CSV file."""
+    number: int
+    """Row number, counting from 1 for the first row after the header."""
+    offset: int
+    """Byte offset of the start of the row in the file."""
+    identifier: str
+    uri: str
+    sha1: str
+    """Hex-encoded SHA-1 digest of the raw bytes of the row."""
+
+
+class RowIndex:
+    """Index of the rows of a metadata CSV file. Allows counting, sampling, and
+    skipping rows, and reading any single row by seeking to its offset, without
+    parsing the whole file again. The index records the size and modification
+    time of the file it was built from, so a stale index can be detected."""
+    VERSION = 1
+
+    def __init__(self, entries: list[RowIndexEntry], identifier_column: str, source_size: int, source_mtime: int):
+        self.entries = entries
+        self.identifier_column = identifier_column
+        self.source_size = source_size
+        self.source_mtime = source_mtime
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[RowIndexEntry]:
+        return iter(self.entries)
+
+    def __getitem__(self, row_number: int) -> RowIndexEntry:
+        """Get the entry for the given row number (counting from 1)."""
+        if row_number < 1:
+            raise IndexError(f'Row number must be 1 or greater, got {row_number}')
+        return self.entries[row_number - 1]
+
+    @property
+    def identifiers(self) -> list[str]:
+        return [entry.identifier for entry in self.entries]
+
+    def is_current(self, filename: Path | str, identifier_column: str) -> bool:
+        """Returns `True` if the file has the same size and modification time as
+        when this index was built, and the index uses the same identifier column."""
+        stat = os.stat(filename)
+        return (
+            stat.st_size == self.source_size
+            and stat.st_mtime_ns == self.source_mtime
+            and identifier_column == self.identifier_column
+        )
+
+    @classmethod
+    def build(cls, filename: Path | str, identifier_column: str, encoding: str = None) -> 'RowIndex':
+        """Read the CSV file once, and record the offset, identifier, URI, and hash
+        of each row."""
+        stat = os.stat(filename)
+        entries = []
+        with open(filename, 'rb') as fh:
+            position = 0
+            # raw bytes of the lines read since the start of the current row
+            raw_lines = []
+
+            def lines():
+                nonlocal position
+                for line in fh:
+                    position += len(line)
+                    raw_lines.append(line)
+                    yield line.decode(encoding or 'utf-8')
+
+            reader = csv.reader(lines())
+            fieldnames = next(reader, [])
+            raw_lines.clear()
+            identifier_index = fieldnames.index(identifier_column) if identifier_column in fieldnames else None
+            uri_index = fieldnames.index('URI') if 'URI' in fieldnames else None
+            offset = position
+            for values in reader:
+                raw = b''.join(raw_lines)
+                raw_lines.clear()
+                if values:
+                    # blank rows are skipped, the same as csv.DictReader does
+                    entries.append(RowIndexEntry(
+                        number=len(entries) + 1,
+                        offset=offset,
+                        identifier=_get_value(values, identifier_index),
+                        uri=_get_value(values, uri_index).strip(),
+                        sha1=hashlib.sha1(raw).hexdigest(),
+                    ))
+                offset = position
+        return cls(entries, identifier_column, source_size=stat.st_size, source_mtime=stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, index_filename: Path | str) -> Optional['RowIndex']:
+        """Load a saved index. Returns `None` if the file does not exist or is not a
+        valid index of the current version."""
+        try:
+            with open(index_filename, 'r') as fh:
+                data = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            return None
+        return cls(
+            entries=[RowIndexEntry(*entry) for entry in data['rows']],
+            identifier_column=data['identifier_column'],
+            source_size=data['source']['size'],
+            source_mtime=data['source']['mtime'],
+        )
+
+    def save(self, index_filename: Path | str):
+        """Write this index to a file. The file is replaced atomically, so readers
+        never see a partially written index."""
+        tmp_filename = f'{index_filename}.tmp'
+        with open(tmp_filename, 'w') as fh:
+            json.dump({
+                'version': self.VERSION,
+                'source': {'size': self.source_size, 'mtime': self.source_mtime},
+                'identifier_column': self.identifier_column,
+                'rows': [list(entry) for entry in self.entries],
+            }, fh)
+        os.replace(tmp_filename, index_filename)
+
+    @classmethod
+    def for_file(
+            cls,
+            filename: Path | str,
+            index_filename: Path | str,
+            identifier_column: str,
+            encoding: str = None,
+    ) -> 'RowIndex':
+        """Load the saved index for `filename`, or build and save a new one if there
+        is no saved index or it is out of date."""
+        index = cls.load(index_filename)
+        if index is None or not index.is_current(filename, identifier_column):
+            logger.debug(f'Building row index for {filename}')
+            index = cls.build(filename, identifier_column, encoding)
+            index.save(index_filename)
+        return index
+
+
+def _get_value(values: list[str], index: Optional[int]) -> str:
+    return values[index] if index is not None and index < len(values) else ''
+
+
 def build_fields(fieldnames, model_class) -> dict[str, list[ColumnSpec]]:
     property_attrs = flatten_headers(model_class.HEADER_MAP)
     fields = defaultdict(list)
@@ -279,6 +425,8 @@ class Row(Generic[ModelType]):
             grouping_strategy=spreadsheet.file_grouping_strategy
         )
         self._filenames = list(chain(*[group.filenames for group in self._file_groups.values()]))
+        self.prefetched: Optional[RepositoryResource] = None
+        """Resource for this row's URI that has already been read from the repository, if any."""
 
     def __getitem__(self, item):
         return self.data[item]
@@ -293,7 +441,10 @@ class Row(Generic[ModelType]):
         :param read_from_repo: If true, will fetch existing object from the
                     repository.
         """
-        if self.uri is not None:
+        if self.uri is not None and read_from_repo and self.prefetched is not None:
+            # resource that was already read in the background
+            resource = self.prefetched
+        elif self.uri is not None:
             # resource with the URI from the spreadsheet
             resource = repo[self.uri]
             if read_from_repo:
@@ -367,7 +518,15 @@ class MetadataSpreadsheet(Generic[ModelType]):
     Iterable sequence of rows from the metadata CSV file of an import job.
     """
 
-    def __init__(self, metadata_filename: Path | str, model_class: Type[ModelType], file_grouping_strategy: str = 'rootname'):
+    def __init__(
+            self,
+            metadata_filename: Path | str,
+            model_class: Type[ModelType],
+            file_grouping_strategy: str = 'rootname',
+            index_filename: Path | str = None,
+    ):
+        """If an `index_filename` is given, a `RowIndex` for the metadata file is loaded
+        from (or saved to) that file, and used to count, select, and read rows."""
         self.metadata_filename = metadata_filename
         self.metadata_file = None
         self.model_class = model_class
@@ -392,8 +551,18 @@ class MetadataSpreadsheet(Generic[ModelType]):
         self.total = None
         self.row_count = 0
         self.errors = 0
-
-        if self.metadata_file.seekable():
+        self.index: Optional[RowIndex] = None
+        self._binary_file = None
+
+        if index_filename is not None:
+            self.index = RowIndex.for_file(
+                filename=metadata_filename,
+                index_filename=index_filename,
+                identifier_column=self.identifier_column,
+                encoding=self.metadata_file.encoding,
+            )
+            self.total = len(self.index)
+        elif self.metadata_file.seekable():
             # get the row count of the file, then rewind the CSV file
             self.total = sum(1 for _ in self.csv_file)
             self._rewind_csv_file()
@@ -401,6 +570,61 @@ class MetadataSpreadsheet(Generic[ModelType]):
             # file is not seekable, so we can't get a row count in advance
             self.total = None
 
+    def _read_line(self, offset: int) -> Optional[dict[str, str]]:
+        # read a single CSV record starting at the given byte offset
+        if self._binary_file is None:
+            self._binary_file = open(self.metadata_filename, 'rb')
+        self._binary_file.seek(offset)
+        encoding = self.metadata_file.encoding
+        lines = (line.decode(encoding) for line in self._binary_file)
+        return next(csv.DictReader(lines, fieldnames=self.fieldnames), None)
+
+    def close(self):
+        """Close the metadata file, and the binary handle used to read rows by
+        their offsets."""
+        self.metadata_file.close()
+        if self._binary_file is not None:
+            self._binary_file.close()
+            self._binary_file = None
+
+    def get_row(self, row_number: int) -> Row[ModelType] | InvalidRow:
+        """Read the row with the given number (counting from 1) directly, using the
+        row index. Raises a `MetadataError` if there is no row index."""
+        if self.index is None:
+            raise MetadataError('Cannot read a row by number without a row index')
+        entry = self.index[row_number]
+        return self._build_row(entry.number, self._read_line(entry.offset))
+
+    def _build_row(self, row_number: int, line: Mapping[str, str]) -> Row[ModelType] | InvalidRow:
+        line_reference = LineReference(filename=str(self.metadata_filename), line_number=row_number + 1)
+        if any(v is None for v in line.values()):
+            return self._handle_invalid_row(line_reference=line_reference, reason='Wrong number of columns')
+        try:
+            return Row(self, line_reference, row_number, line, self.identifier_column)
+        except MetadataError as e:
+            return self._handle_invalid_row(line_reference=line_reference, reason=str(e))
+
+    def _indexed_rows(self, limit: Optional[int], completed: Bucket) -> Iterator[Row[ModelType] | InvalidRow]:
+        # iterate using the row index; rows that are not selected or are already
+        # completed are skipped without reading them from the metadata file
+        for entry in self.index:
+            if limit is not None and entry.number > limit:
+                logger.info(f'Stopping after {limit} rows')
+                break
+
+            if self.subset_to_load is not None and entry.identifier not in self.subset_to_load:
+                continue
+
+            logger.debug(f'Processing {self.metadata_filename}:{entry.number + 1}')
+            self.row_count += 1
+
+            if entry.identifier in completed:
+                logger.info(f'Already loaded "{entry.identifier}" from row {entry.number}, skipping')
+                self.skipped += 1
+                continue
+
+            yield self._build_row(entry.number, self._read_line(entry.offset))
+
     def _rewind_csv_file(self):
         # rewind the file and re-create the CSV reader
         self.metadata_file.seek(0)
@@ -449,13 +673,16 @@ class MetadataSpreadsheet(Generic[ModelType]):
             completed = []
 
         if percentage is not None:
-            if not self.metadata_file.seekable():
+            if self.index is not None:
+                identifiers = [i for i in self.index.identifiers if i not in completed]
+            elif not self.metadata_file.seekable():
                 raise RuntimeError('Cannot execute a percentage load using a non-seekable file')
-            identifier_column = self.model_class.HEADER_MAP['identifier']
-            identifiers = [
-                row[identifier_column] for row in self.csv_file if row[identifier_column] not in completed
-            ]
-            self._rewind_csv_file()
+            else:
+                identifier_column = self.model_class.HEADER_MAP['identifier']
+                identifiers = [
+                    row[identifier_column] for row in self.csv_file if row[identifier_column] not in completed
+                ]
+                self._rewind_csv_file()
 
             if len(identifiers) == 0:
                 logger.info('No items remaining to load')
@@ -469,7 +696,11 @@ class MetadataSpreadsheet(Generic[ModelType]):
                 else:
                     # load all remaining items
                     step_size = 1
-                self.subset_to_load = identifiers[::step_size]
+                self.subset_to_load = set(identifiers[::step_size])
+
+        if self.index is not None:
+            yield from self._indexed_rows(limit, completed)
+            return
 
         for row_number, line in enumerate(self.csv_file, 1):
             if limit is not None and row_number > limit:
@@ -479,22 +710,16 @@ class MetadataSpreadsheet(Generic[ModelType]):
             if not self.should_load(line):
                 continue
 
-            line_reference = LineReference(filename=str(self.metadata_filename), line_number=row_number + 1)
-            logger.debug(f'Processing {line_reference}')
+            logger.debug(f'Processing {self.metadata_filename}:{row_number + 1}')
             self.row_count += 1
 
-            if any(v is None for v in line.values()):
-                yield self._handle_invalid_row(line_reference=line_reference, reason='Wrong number of columns')
-                continue
-
-            try:
-                row = Row(self, line_reference, row_number, line, self.identifier_column)
-            except MetadataError as e:
-                yield self._handle_invalid_row(line_reference=line_reference, reason=str(e))
+            row = self._build_row(row_number, line)
+            if isinstance(row, InvalidRow):
+                yield row
                 continue
 
             if row.identifier in completed:
-                logger.info(f'Already loaded "{row.identifier}" from {line_reference}, skipping')
+                logger.info(f'Already loaded "{row.identifier}" from {row.line_reference}, skipping')
                 self.skipped += 1
                 continue
 
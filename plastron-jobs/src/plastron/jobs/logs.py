@@ -1,12 +1,17 @@
 import collections.abc
 import csv
+import io
 import logging
+import os
 from abc import ABC
 from pathlib import Path
-from typing import Sequence
+from time import monotonic
+from typing import Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
+ENCODING = 'utf-8'
+
 
 class AppendableSequence(collections.abc.Sequence, ABC):
     """Abstract base class for appendable sequences"""
@@ -37,21 +42,60 @@ class ItemLog(AppendableSequence):
     given key exists in the log already.
 
     `ItemLog` objects are iterable, and support direct indexing to a row
-    by key.
+    by position, or lookup of a row by key with `get()`. Both use an
+    in-memory index of the byte offset of each row, so they only read
+    the one row from the file. The index is built the first time it is
+    needed, so opening a log and iterating over it (e.g., to show a page
+    of its rows) does not read the whole file.
+
+    By default, each row is written to disk as soon as it is appended.
+    With a `batch_size` greater than 1, rows are buffered and written in
+    batches of that size; call `flush()` or `close()` to write any remaining
+    rows. If `fsync_interval` is set, the file is also synced to disk after
+    a write if at least that many seconds have passed since the last sync.
+
+    When an existing log is opened, a partially written last row (e.g., from
+    a crash in the middle of a write) is ignored, and it is removed from the
+    file before the next row is written.
     """
-    def __init__(self, filename: str | Path, fieldnames: Sequence[str], keyfield: str, header: bool = True):
+    def __init__(
+            self,
+            filename: str | Path,
+            fieldnames: Sequence[str],
+            keyfield: str,
+            header: bool = True,
+            batch_size: int = 1,
+            fsync_interval: Optional[float] = None,
+    ):
         self.filename: Path = Path(filename)
         self.fieldnames: Sequence[str] = fieldnames
         self.keyfield: str = keyfield
         self.write_header: bool = header
+        self.batch_size: int = batch_size
+        self.fsync_interval: Optional[float] = fsync_interval
         self._item_keys = set()
+        # byte offset of each row, and the position of the latest row for each key
+        self._offsets: list[int] = []
+        self._key_positions: dict[str, int] = {}
+        self._file_fieldnames: Optional[list[str]] = None
+        self._end_offset = 0
+        self._buffer: list[bytes] = []
+        self._truncate_at: Optional[int] = None
+        self._needs_line_ending = False
+        self._last_sync = monotonic()
         self._fh = None
-        self._writer = None
-        if self.exists():
-            self._load_keys()
+        self._read_fh = None
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            if self.exists():
+                self._load_keys()
 
     @property
     def item_keys(self) -> set:
+        self._ensure_loaded()
         return self._item_keys
 
     def exists(self) -> bool:
@@ -61,65 +105,170 @@ class ItemLog(AppendableSequence):
     def create(self):
         """Create the CSV log file. This will overwrite an existing file. If
         `write_header` is `True`, it will also write a header row to the file."""
-        with self.filename.open(mode='w', buffering=1) as fh:
-            writer = csv.DictWriter(fh, fieldnames=self.fieldnames)
+        self.close()
+        with self.filename.open(mode='wb') as fh:
             if self.write_header:
-                writer.writeheader()
+                fh.write(self._format_row(dict(zip(self.fieldnames, self.fieldnames))))
+            self._end_offset = fh.tell()
+        self._truncate_at = None
+        self._needs_line_ending = False
+        self._item_keys.clear()
+        self._offsets.clear()
+        self._key_positions.clear()
+        self._file_fieldnames = list(self.fieldnames) if self.write_header else None
+        self._loaded = True
 
     def _load_keys(self):
-        for n, row in enumerate(iter(self), 1):
+        # replay the log file to build the key and offset indexes
+        with self.filename.open(mode='rb') as fh:
+            position = 0
+            last_line = b''
+
+            def lines():
+                nonlocal position, last_line
+                for line in fh:
+                    position += len(line)
+                    last_line = line
+                    yield line.decode(ENCODING)
+
+            reader = csv.reader(lines(), strict=True)
+            offset = 0
             try:
-                self._item_keys.add(row[self.keyfield])
-            except KeyError as e:
-                raise ItemLogError(f'Key {e} not found in row {n}')
+                for values in reader:
+                    if self._file_fieldnames is None:
+                        self._file_fieldnames = values
+                        self._check_fieldnames(values)
+                    elif values:
+                        if not last_line.endswith(b'\n') and len(values) < len(self._file_fieldnames):
+                            # the last row in the file is incomplete
+                            break
+                        self._index_row(dict(zip(self._file_fieldnames, values)), offset)
+                    offset = position
+            except csv.Error:
+                # the file ends in the middle of a quoted value
+                pass
+
+        self._end_offset = offset
+        # an incomplete last row is ignored when reading, and removed before the next write
+        self._truncate_at = offset if offset < position else None
+        # a complete last row without a line ending needs one before the next write
+        self._needs_line_ending = self._truncate_at is None and last_line != b'' and not last_line.endswith(b'\n')
+
+    def _check_fieldnames(self, fieldnames: Sequence[str]):
+        # check the validity of the map file data
+        if not fieldnames == self.fieldnames:
+            logger.warning(
+                f'Fieldnames in {self.filename} do not match expected fieldnames; '
+                f'expected: {self.fieldnames}; found: {fieldnames}'
+            )
+
+    def _index_row(self, row: dict[str, str], offset: int):
+        try:
+            key = row[self.keyfield]
+        except KeyError as e:
+            raise ItemLogError(f'Key {e} not found in row {len(self._offsets) + 1}')
+        self._key_positions[key] = len(self._offsets)
+        self._offsets.append(offset)
+        self._item_keys.add(key)
 
     def __iter__(self):
+        self.flush()
         try:
-            with self.filename.open(mode='r', buffering=1) as fh:
+            with self.filename.open(mode='r', buffering=1, encoding=ENCODING, newline='') as fh:
                 reader = csv.DictReader(fh)
-                # check the validity of the map file data
-                if not reader.fieldnames == self.fieldnames:
-                    logger.warning(
-                        f'Fieldnames in {self.filename} do not match expected fieldnames; '
-                        f'expected: {self.fieldnames}; found: {reader.fieldnames}'
-                    )
+                self._check_fieldnames(reader.fieldnames)
                 # read the data from the existing file
                 yield from reader
         except FileNotFoundError:
             # log file not found, so stop the iteration
             return
 
-    @property
-    def writer(self) -> csv.DictWriter:
-        """CSV dictionary writer"""
-        if not self.exists():
-            self.create()
-        if self._fh is None:
-            self._fh = self.filename.open(mode='a', buffering=1)
-        if self._writer is None:
-            self._writer = csv.DictWriter(self._fh, fieldnames=self.fieldnames)
-        return self._writer
+    def _format_row(self, row) -> bytes:
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=self.fieldnames).writerow(row)
+        return buffer.getvalue().encode(ENCODING)
 
     def append(self, row):
         """Write this `row` to the log."""
-        self.writer.writerow(row)
-        self._item_keys.add(row[self.keyfield])
+        self._ensure_loaded()
+        if not self.exists():
+            self.create()
+        data = self._format_row(row)
+        if self._needs_line_ending:
+            self._buffer.append(b'\r\n')
+            self._end_offset += 2
+            self._needs_line_ending = False
+        self._index_row({k: str(v) for k, v in row.items()}, self._end_offset)
+        self._end_offset += len(data)
+        self._buffer.append(data)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
 
     def writerow(self, row):
         """Alias for `append`"""
         self.append(row)
 
+    def flush(self):
+        """Write any buffered rows to the log file."""
+        if not self._buffer:
+            return
+        if self._fh is None:
+            if self._truncate_at is not None:
+                logger.warning(f'Removing incomplete last row from {self.filename} (at byte {self._truncate_at})')
+                os.truncate(self.filename, self._truncate_at)
+                self._truncate_at = None
+            self._fh = self.filename.open(mode='ab')
+        self._fh.write(b''.join(self._buffer))
+        self._fh.flush()
+        self._buffer.clear()
+        if self.fsync_interval is not None and monotonic() - self._last_sync >= self.fsync_interval:
+            os.fsync(self._fh.fileno())
+            self._last_sync = monotonic()
+
+    def close(self):
+        """Write any buffered rows, sync the file to disk if `fsync_interval` is set,
+        and close the open file handles."""
+        self.flush()
+        if self._fh is not None:
+            if self.fsync_interval is not None:
+                os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+        if self._read_fh is not None:
+            self._read_fh.close()
+            self._read_fh = None
+
     def __contains__(self, other):
-        return other in self._item_keys
+        return other in self.item_keys
 
     def __len__(self):
-        return len(self._item_keys)
+        return len(self.item_keys)
 
     def __getitem__(self, item):
-        for n, row in enumerate(self):
-            if n == item:
-                return row
-        raise IndexError(item)
+        if not isinstance(item, int):
+            raise TypeError(f'{type(self).__name__} indices must be integers')
+        self._ensure_loaded()
+        if item < 0:
+            item += len(self._offsets)
+        if not 0 <= item < len(self._offsets):
+            raise IndexError(item)
+        return self._read_row(self._offsets[item])
+
+    def get(self, key: str, default=None) -> Optional[dict[str, str]]:
+        """Returns the most recent row logged with the given `key`, or `default` if
+        there is no such row."""
+        self._ensure_loaded()
+        if key not in self._key_positions:
+            return default
+        return self[self._key_positions[key]]
+
+    def _read_row(self, offset: int) -> dict[str, str]:
+        self.flush()
+        if self._read_fh is None:
+            self._read_fh = self.filename.open(mode='rb')
+        self._read_fh.seek(offset)
+        lines = (line.decode(ENCODING) for line in self._read_fh)
+        return next(csv.DictReader(lines, fieldnames=self._file_fieldnames or self.fieldnames))
 
 
 class ItemLogError(Exception):
@@ -0,0 +1,101 @@
+from time import monotonic
+from typing import Any, Callable, Generator, Optional
+
+PROGRESS_INTERVAL = 5
+"""Minimum number of seconds between progress updates."""
+
+PROGRESS_STEP = 5
+"""Increase in percent complete that triggers a progress update before the interval has passed."""
+
+
+class ProgressAggregator:
+    """Coalesces the status updates yielded by a job, so that consumers that send
+    each update somewhere (e.g., a message broker) are not flooded by fast jobs.
+
+    Calling the aggregator with a job generator returns a generator that yields
+    an update only when at least `interval` seconds have passed since the last
+    update it yielded, or when the `progress` value has increased by at least
+    `step` percent. Updates whose `state` differs from the last yielded update
+    are always yielded, along with the last update in the previous state, as is
+    the last update before the job completes. The
+    return value of the job generator is passed through unchanged. An `interval`
+    of 0 yields every update.
+
+    Each yielded update is a copy of the job's update, with an added `rate` entry
+    containing the number of `items` processed so far, the average `items_per_second`,
+    and the estimated number of seconds remaining (`eta`; `None` until there is
+    some progress). This assumes that the job yields an initial update, then one
+    update for each item it processes.
+    """
+    def __init__(
+            self,
+            interval: float = PROGRESS_INTERVAL,
+            step: Optional[int] = PROGRESS_STEP,
+            clock: Callable[[], float] = monotonic,
+    ):
+        self.interval = interval
+        self.step = step
+        self.clock = clock
+
+    def __call__(
+            self,
+            statuses: Generator[dict[str, Any], None, dict[str, Any]],
+    ) -> Generator[dict[str, Any], None, dict[str, Any]]:
+        started = self.clock()
+        last_sent_at = None
+        last_sent = None
+        pending = None
+        items = -1
+        try:
+            while True:
+                try:
+                    status = next(statuses)
+                except StopIteration as e:
+                    if pending is not None:
+                        yield self.with_rate(pending, items, self.clock() - started)
+                    return e.value
+
+                items += 1
+                now = self.clock()
+                if pending is not None and status.get('state') != pending.get('state'):
+                    # report the final progress of the previous state first
+                    yield self.with_rate(pending, items - 1, now - started)
+                if last_sent is None or self.is_due(status, last_sent, now - last_sent_at):
+                    yield self.with_rate(status, items, now - started)
+                    last_sent_at = now
+                    last_sent = status
+                    pending = None
+                else:
+                    pending = status
+        finally:
+            statuses.close()
+
+    def is_due(self, status: dict[str, Any], last_sent: dict[str, Any], elapsed: float) -> bool:
+        """Whether `status` should be yielded, given the previously yielded update
+        `last_sent` and the number of seconds `elapsed` since it was yielded."""
+        if status.get('state') != last_sent.get('state'):
+            return True
+        if elapsed >= self.interval:
+            return True
+        if self.step and 'progress' in status and 'progress' in last_sent:
+            return status['progress'] - last_sent['progress'] >= self.step
+        return False
+
+    @staticmethod
+    def with_rate(status: dict[str, Any], items: int, elapsed: float) -> dict[str, Any]:
+        items = max(items, 0)
+        progress = status.get('progress')
+        if progress is not None and 0 < progress < 100:
+            eta = elapsed * (100 - progress) / progress
+        elif progress == 100:
+            eta = 0
+        else:
+            eta = None
+        return {
+            **status,
+            'rate': {
+                'items': items,
+                'items_per_second': items / elapsed if elapsed > 0 else None,
+                'eta': eta,
+            },
+        }
@@ -1,13 +1,16 @@
 import logging
 from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from typing import Generator, Any, Mapping
+from typing import Generator, Any, Iterator, Mapping, Optional
 
 from plastron.context import PlastronContext
+from plastron.handles import HandleError
 from plastron.jobs import Job
 from plastron.repo import RepositoryError
 from plastron.repo.publish import PublishableResource
+from plastron.utils import batched, ordered_map
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +28,74 @@ class PublicationAction(Enum):
             return 'error'
 
 
+PUBLICATION_BATCH_SIZE = 100
+"""Number of URIs whose handles are looked up together before publishing them."""
+
+
 @dataclass
 class PublicationJob(Job):
+    """Publishes or unpublishes each of the `uris`. Up to `workers` resources are
+    processed at once; results are reported in the same order as the `uris`.
+
+    When publishing, the handles for each batch of `PUBLICATION_BATCH_SIZE` URIs
+    are looked up together (see `HandleServiceClient.find_handles()`) before the
+    resources in that batch are published."""
     context: PlastronContext
     uris: list[str]
     action: PublicationAction
     force_hidden: bool = False
     force_visible: bool = False
+    workers: int = 1
+
+    def process(self, uri: str) -> dict[str, Any]:
+        resource: PublishableResource = self.context.repo[uri:PublishableResource].read()
+
+        if self.action == PublicationAction.PUBLISH:
+            handle = resource.publish(
+                handle_client=self.context.handle_client,
+                public_url=self.context.get_public_url(resource),
+                force_hidden=self.force_hidden,
+                force_visible=self.force_visible,
+            )
+            return {
+                'uri': uri,
+                'handle': str(handle),
+                'status': resource.publication_status,
+            }
+        elif self.action == PublicationAction.UNPUBLISH:
+            resource.unpublish(
+                force_hidden=self.force_hidden,
+                force_visible=self.force_visible,
+            )
+            return {
+                'uri': uri,
+                'status': resource.publication_status,
+            }
+        else:
+            raise ValueError(f'Unknown action: {self.action}')
+
+    def prefetch_handles(self, uris: list[str]):
+        """Warm the handle client's cache with the handles of `uris`. Lookup failures
+        are only logged, since each resource looks up its own handle again when it
+        is published."""
+        try:
+            self.context.handle_client.find_handles(uris)
+        except HandleError as e:
+            logger.warning(f'Unable to look up handles for a batch of {len(uris)} resource(s): {e}')
+
+    def results(self, executor: Optional[Executor] = None) -> Iterator[dict[str, Any]]:
+        """Process each URI, yielding either its result or an `{'error': ...}` dictionary."""
+        def _process(uri: str) -> dict[str, Any]:
+            try:
+                return self.process(uri)
+            except (RepositoryError, ValueError) as e:
+                logger.error(str(e))
+                return {'error': str(e)}
+
+        for batch in batched(self.uris, PUBLICATION_BATCH_SIZE):
+            if self.action == PublicationAction.PUBLISH:
+                self.prefetch_handles(batch)
+            yield from ordered_map(executor, _process, batch, limit=self.workers)
 
     def run(self) -> Generator[dict[str, Any], None, dict[str, Any]]:
         count = Counter(
@@ -44,49 +108,27 @@ class PublicationJob(Job):
             'state': 'publish_in_progress',
             'progress': 0,
         }
-        for n, uri in enumerate(self.uris, 1):
-            try:
-                resource: PublishableResource = self.context.repo[uri:PublishableResource].read()
-
-                if self.action == PublicationAction.PUBLISH:
-                    handle = resource.publish(
-                        handle_client=self.context.handle_client,
-                        public_url=self.context.get_public_url(resource),
-                        force_hidden=self.force_hidden,
-                        force_visible=self.force_visible,
-                    )
-                    count['done'] += 1
-                    result = {
-                        'uri': uri,
-                        'handle': str(handle),
-                        'status': resource.publication_status,
-                    }
-                elif self.action == PublicationAction.UNPUBLISH:
-                    resource.unpublish(
-                        force_hidden=self.force_hidden,
-                        force_visible=self.force_visible,
-                    )
-                    count['done'] += 1
-                    result = {
-                        'uri': uri,
-                        'status': resource.publication_status,
-                    }
-                else:
-                    logger.error(f'Unknown action: {self.action}')
+        # create the shared connections before starting any worker threads
+        _ = self.context.repo
+        if self.action == PublicationAction.PUBLISH:
+            _ = self.context.handle_client
+        executor = ThreadPoolExecutor(self.workers, thread_name_prefix='publish') if self.workers > 1 else None
+        try:
+            for n, result in enumerate(self.results(executor), 1):
+                if 'error' in result:
                     count['errors'] += 1
-                    result = {'error': f'Unknown action: {self.action}'}
+                else:
+                    count['done'] += 1
 
-            except RepositoryError as e:
-                logger.error(str(e))
-                result = {'error': str(e)}
-                count['errors'] += 1
-
-            yield {
-                'count': count,
-                'result': result,
-                'state': 'publish_in_progress',
-                'progress': int(n / count['total'] * 100)
-            }
+                yield {
+                    'count': count,
+                    'result': result,
+                    'state': 'publish_in_progress',
+                    'progress': int(n / count['total'] * 100)
+                }
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
         state = PublicationAction.get_final_state(self.action, count)
         return {
@@ -0,0 +1,164 @@
+import logging
+from io import RawIOBase
+from typing import Any, Mapping, Optional
+from urllib.parse import SplitResult, urlsplit
+
+from paramiko import SFTPClient, SFTPFile, SSHClient, SSHException
+
+from plastron.files import get_ssh_client
+
+logger = logging.getLogger(__name__)
+
+SFTP_WINDOW_SIZE = 64 * 1024 * 1024
+"""SSH channel window size (in bytes) for uploads; a large window lets many writes
+be in flight at once on high-latency connections."""
+
+SFTP_MAX_PACKET_SIZE = 256 * 1024
+"""Maximum SSH packet size (in bytes) for uploads."""
+
+SFTP_CHECKPOINT_SIZE = 8 * 1024 * 1024
+"""Number of bytes written between checks that the server has stored the upload.
+Up to this many bytes are kept in memory, to be written again after a reconnect."""
+
+SFTP_MAX_RETRIES = 3
+"""Number of times to reconnect after losing the connection during an upload."""
+
+
+class SFTPUploadError(Exception):
+    """Raised when an upload over SFTP cannot be completed."""
+    pass
+
+
+class SFTPWriter(RawIOBase):
+    """Write-only, non-seekable file object that streams its contents to the file at
+    `sftp_uri` on a remote server as it is written.
+
+    Writes are pipelined, i.e., they are sent without waiting for the server to
+    acknowledge each one. Every `checkpoint_size` bytes, the writer waits until the
+    server has stored everything sent so far. The bytes since the last checkpoint are
+    kept in memory, so if the connection drops, the writer reconnects (up to
+    `max_retries` times in a row), truncates the remote file to the last checkpoint,
+    and resumes the upload from that offset.
+
+    Additional keyword arguments in `ssh_options` are passed to `get_ssh_client()`.
+    """
+    def __init__(
+            self,
+            sftp_uri: str | SplitResult,
+            ssh_options: Optional[Mapping[str, Any]] = None,
+            window_size: int = SFTP_WINDOW_SIZE,
+            max_packet_size: int = SFTP_MAX_PACKET_SIZE,
+            checkpoint_size: int = SFTP_CHECKPOINT_SIZE,
+            max_retries: int = SFTP_MAX_RETRIES,
+    ):
+        super().__init__()
+        self.sftp_uri = urlsplit(sftp_uri) if isinstance(sftp_uri, str) else sftp_uri
+        self.path = self.sftp_uri.path
+        self.ssh_options = ssh_options or {}
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.checkpoint_size = checkpoint_size
+        self.max_retries = max_retries
+        self.checkpoint = 0
+        """Offset up to which the server has confirmed storing the upload."""
+        self._pending = bytearray()
+        self._ssh_client: Optional[SSHClient] = None
+        self._sftp_client: Optional[SFTPClient] = None
+        self._file: Optional[SFTPFile] = None
+        self._open(mode='w')
+
+    def _connect(self):
+        try:
+            self._ssh_client = get_ssh_client(self.sftp_uri, **self.ssh_options)
+            self._sftp_client = SFTPClient.from_transport(
+                self._ssh_client.get_transport(),
+                window_size=self.window_size,
+                max_packet_size=self.max_packet_size,
+            )
+        except SSHException as e:
+            raise RuntimeError(str(e)) from e
+
+    def _disconnect(self):
+        for handle in (self._file, self._sftp_client, self._ssh_client):
+            if handle is not None:
+                try:
+                    handle.close()
+                except (OSError, EOFError, SSHException):
+                    pass
+        self._file = self._sftp_client = self._ssh_client = None
+
+    def _open(self, mode: str):
+        self._connect()
+        self._file = self._sftp_client.open(self.path, mode=mode, bufsize=self.max_packet_size)
+        self._file.set_pipelined(True)
+
+    def _resume(self, error: Exception):
+        """Reconnect, truncate the remote file to the last checkpoint, and resend
+        the bytes written since then."""
+        for attempt in range(1, self.max_retries + 1):
+            logger.warning(
+                f'Connection lost while uploading to {self.path} ({error}); '
+                f'resuming from offset {self.checkpoint} (attempt {attempt}/{self.max_retries})'
+            )
+            self._disconnect()
+            try:
+                self._open(mode='r+')
+                self._file.truncate(self.checkpoint)
+                self._file.seek(self.checkpoint)
+                self._file.write(bytes(self._pending))
+                return
+            except (OSError, EOFError, SSHException, RuntimeError) as e:
+                error = e
+        raise SFTPUploadError(f'Upload to {self.path} failed after {self.max_retries} retries: {error}') from error
+
+    def _checkpoint(self):
+        """Wait until the server has stored all the bytes written so far."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._file.flush()
+                size = self._file.stat().st_size
+                expected = self.checkpoint + len(self._pending)
+                if size != expected:
+                    raise OSError(f'Remote file size is {size} bytes, expected {expected} bytes')
+                self.checkpoint = expected
+                self._pending.clear()
+                return
+            except (OSError, EOFError, SSHException) as e:
+                if attempt == self.max_retries:
+                    raise SFTPUploadError(f'Upload to {self.path} could not be confirmed: {e}') from e
+                self._resume(e)
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.checkpoint + len(self._pending)
+
+    def write(self, data) -> int:
+        self._check_closed()
+        self._pending.extend(data)
+        try:
+            self._file.write(data)
+        except (OSError, EOFError, SSHException) as e:
+            # the resumed upload includes this data
+            self._resume(e)
+        if len(self._pending) >= self.checkpoint_size:
+            self._checkpoint()
+        return len(data)
+
+    def close(self):
+        """Wait for the server to store the rest of the upload, then close the
+        remote file and the connection."""
+        if self.closed:
+            return
+        try:
+            if self._file is not None:
+                self._checkpoint()
+                logger.info(f'Uploaded {self.checkpoint} bytes to {self.path}')
+        finally:
+            self._disconnect()
+            super().close()
+
+    def _check_closed(self):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
@@ -0,0 +1,157 @@
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+TIMINGS_FILENAME = 'timings.json'
+SLOWEST_ITEMS = 5
+"""Number of slowest items to report for each phase."""
+PERCENTILES = (50, 90, 99)
+RESERVOIR_SIZE = 1000
+"""Number of sampled durations kept for each phase to estimate its percentiles."""
+
+
+def percentile(sorted_values: list[float], p: int) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list of values."""
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class PhaseStats:
+    """Running statistics of the durations recorded for one phase. Only a uniform
+    random sample of up to `reservoir_size` durations is kept (reservoir sampling),
+    so the percentiles are exact until there are more durations than that, and
+    estimates after."""
+    reservoir_size: int = RESERVOIR_SIZE
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    reservoir: list[float] = field(default_factory=list)
+    # min-heap of the slowest items; the sequence number breaks ties
+    slowest: list[tuple[float, int, str]] = field(default_factory=list)
+
+    def add(self, seconds: float, rng: random.Random):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(seconds)
+        else:
+            index = rng.randrange(self.count)
+            if index < self.reservoir_size:
+                self.reservoir[index] = seconds
+
+
+class PhaseTimer:
+    """Records how long each phase of a job (e.g., validation, file uploads, or
+    committing transactions) takes for each item, so that the time spent in each
+    phase can be compared. Safe to use from multiple worker threads. Memory use
+    does not grow with the number of items (see `PhaseStats`).
+
+    Phases may be nested, so the totals of different phases may overlap.
+
+    ```python
+    timer = PhaseTimer()
+    with timer.time('validate', item='row 3'):
+        ...
+    print(timer.summary())
+    ```
+    """
+    def __init__(self, slowest_items: int = SLOWEST_ITEMS, reservoir_size: int = RESERVOIR_SIZE):
+        self.slowest_items = slowest_items
+        self.reservoir_size = reservoir_size
+        self._phases: dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._random = random.Random()
+
+    @contextmanager
+    def time(self, phase: str, item: Any = None) -> Iterator[None]:
+        """Context manager that records the time spent in its body as one instance
+        of `phase`, for `item`. The time is recorded even if the body raises an exception."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, perf_counter() - started, item)
+
+    def record(self, phase: str, seconds: float, item: Any = None):
+        with self._lock:
+            stats = self._phases.get(phase)
+            if stats is None:
+                stats = self._phases[phase] = PhaseStats(reservoir_size=self.reservoir_size)
+            stats.add(seconds, self._random)
+            if item is not None:
+                self._sequence += 1
+                entry = (seconds, self._sequence, str(item))
+                if len(stats.slowest) < self.slowest_items:
+                    heapq.heappush(stats.slowest, entry)
+                else:
+                    heapq.heappushpop(stats.slowest, entry)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Returns the count, total, mean, maximum, and percentiles of the time
+        spent in each phase, along with its slowest items. Phases are listed in
+        descending order of total time."""
+        with self._lock:
+            # sorted copies, so that the summary can be built outside the lock
+            phases = {
+                phase: replace(stats, reservoir=sorted(stats.reservoir), slowest=sorted(stats.slowest, reverse=True))
+                for phase, stats in self._phases.items()
+            }
+        summary = {}
+        for phase, stats in sorted(phases.items(), key=lambda entry: entry[1].total, reverse=True):
+            summary[phase] = {
+                'count': stats.count,
+                'total': stats.total,
+                'mean': stats.total / stats.count,
+                **{f'p{p}': percentile(stats.reservoir, p) for p in PERCENTILES},
+                'max': stats.max,
+                'slowest': [{'item': item, 'seconds': seconds} for seconds, _, item in stats.slowest],
+            }
+        return summary
+
+    def save(self, directory: str | Path) -> Path:
+        """Write the summary to `TIMINGS_FILENAME` in `directory`, replacing it atomically."""
+        directory = Path(directory)
+        filename = directory / TIMINGS_FILENAME
+        tmp_file = directory / f'.{TIMINGS_FILENAME}.tmp'
+        with tmp_file.open(mode='w') as fh:
+            json.dump(self.summary(), fh, indent=2)
+        os.replace(tmp_file, filename)
+        return filename
+
+
+def load_timings(directory: str | Path) -> Optional[dict[str, dict[str, Any]]]:
+    """Read the timings file in `directory`. Returns `None` if there is no timings
+    file, or it cannot be read."""
+    try:
+        with (Path(directory) / TIMINGS_FILENAME).open() as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f'Unable to read timings in directory {directory}: {e}')
+        return None
+
+
+def format_timings(timings: dict[str, dict[str, Any]]) -> list[str]:
+    """Returns one line of text for each phase in `timings`, for logging."""
+    return [
+        f"{phase}: {stats['total']:.2f}s total over {stats['count']}, "
+        f"mean {stats['mean']:.3f}s, p50 {stats['p50']:.3f}s, p90 {stats['p90']:.3f}s, "
+        f"p99 {stats['p99']:.3f}s, max {stats['max']:.3f}s"
+        + (f" ({stats['slowest'][0]['item']})" if stats['slowest'] else '')
+        for phase, stats in timings.items()
+    ]
@@ -1,19 +1,23 @@
 import logging
 from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from email.utils import parsedate_to_datetime
-from typing import Mapping, ItemsView, Type, Iterable, Any, Generator
+from typing import Mapping, ItemsView, Type, Iterable, Any, Generator, Optional, Iterator
 
 from pyparsing import ParseException
 from rdflib import URIRef
+from rdflib.plugins.sparql import prepareUpdate
+from rdflib.plugins.sparql.sparql import Update
 
-from plastron.client import ClientError
+from plastron.client import Client, ClientError
 from plastron.jobs.logs import AppendableSequence, NullLog
 from plastron.namespaces import dcterms
 from plastron.rdfmapping.resources import RDFResourceBase
 from plastron.rdfmapping.validation import ValidationFailure
 from plastron.repo import RepositoryResource, Repository
 from plastron.repo.utils import context
+from plastron.utils import batched, ordered_map
 
 logger = logging.getLogger(__name__)
 
@@ -34,15 +38,20 @@ class ValidationFailed(Exception):
 
 def update(
         resource: RepositoryResource,
-        sparql_update: str,
+        sparql_update: str | bytes,
         model_class: Type[RDFResourceBase] = None,
         dry_run: bool = False,
+        prepared_update: Optional[Update] = None,
+        client: Optional[Client] = None,
 ) -> dict[str, str]:
-    """Update a single resource using a SPARQL Update Query."""
+    """Update a single resource using a SPARQL Update Query. If a `prepared_update`
+    (the result of `prepareUpdate(sparql_update)`) is given, it is applied to the
+    in-memory graph for validation, instead of parsing `sparql_update` again. The
+    PATCH request is sent using `client`, which defaults to the resource's client."""
     if model_class is not None:
         try:
             # Apply the update in-memory to the resource graph
-            resource.graph.update(sparql_update)
+            resource.graph.update(prepared_update if prepared_update is not None else sparql_update)
         except ParseException as e:
             raise UpdateError(str(e)) from e
 
@@ -63,7 +72,7 @@ def update(
     headers = {'Content-Type': 'application/sparql-update'}
     request_url = resource.description_url or resource.url
     try:
-        response = resource.client.patch(request_url, data=sparql_update, headers=headers)
+        response = (client or resource.client).patch(request_url, data=sparql_update, headers=headers)
         if not response.ok:
             raise UpdateError(str(response))
     except ClientError as e:
@@ -79,6 +88,15 @@ def update(
     }
 
 
+@dataclass
+class UpdateResult:
+    """The outcome of updating a single resource."""
+    url: str
+    log_entry: Optional[dict[str, str]] = None
+    invalid: Optional[list[str]] = None
+    error: Optional[str] = None
+
+
 @dataclass
 class UpdateJob:
     repo: Repository
@@ -89,6 +107,103 @@ class UpdateJob:
     completed: AppendableSequence = None
     dry_run: bool = False
     use_transactions: bool = True
+    workers: int = 1
+    """Number of root URIs (or batches, if `batch_size` is set) to update concurrently.
+    Each runs in its own thread, with its own transaction."""
+    resource_workers: int = 1
+    """Number of resources within a tree (or batch) to update concurrently."""
+    batch_size: Optional[int] = None
+    """If set, the resources found by walking all the root URIs are updated in
+    transactions of this many resources each, instead of one transaction per
+    root URI."""
+
+    def __post_init__(self):
+        self.prepared_update: Optional[Update] = None
+
+    def update_resource(self, resource: RepositoryResource, client: Optional[Client] = None) -> UpdateResult:
+        """Apply the update to `resource`. Returns an `UpdateResult`; errors are not
+        raised, but recorded in the result."""
+        try:
+            return UpdateResult(
+                url=resource.url,
+                log_entry=update(
+                    resource=resource,
+                    sparql_update=self.sparql_update,
+                    model_class=self.model_class,
+                    dry_run=self.dry_run,
+                    prepared_update=self.prepared_update,
+                    client=client,
+                ),
+            )
+        except DryRun:
+            # TODO: dry run should be implemented in the client
+            return UpdateResult(url=resource.url)
+        except ValidationFailed as e:
+            return UpdateResult(url=resource.url, invalid=[f'{key}: {value}' for key, value in e.failures])
+        except UpdateError as e:
+            return UpdateResult(url=resource.url, error=str(e))
+
+    def resources(self, repo: Repository, uri: str) -> Iterator[RepositoryResource]:
+        """Walk the tree of resources starting at `uri`, skipping resources that have
+        already been updated."""
+        for resource in repo[uri].walk(traverse=self.traverse):
+            if resource.url in self.completed:
+                logger.info(f'Resource {resource.url} has already been updated; skipping')
+                continue
+            yield resource
+
+    def update_tree(self, uri: str, resource_executor: Optional[Executor] = None) -> Iterator[UpdateResult]:
+        """Update each resource in the tree starting at `uri`, in a single transaction."""
+        with context(repo=self.repo, use_transactions=self.use_transactions, dry_run=self.dry_run):
+            yield from ordered_map(
+                resource_executor,
+                self.update_resource,
+                self.resources(self.repo, uri),
+                limit=self.resource_workers * 2,
+            )
+
+    def update_batch(
+            self,
+            batch: list[RepositoryResource],
+            resource_executor: Optional[Executor] = None,
+    ) -> list[UpdateResult]:
+        """Update the resources in `batch`, in a single transaction."""
+        with context(repo=self.repo, use_transactions=self.use_transactions, dry_run=self.dry_run) as txn_client:
+            return list(ordered_map(
+                resource_executor,
+                lambda resource: self.update_resource(resource, client=txn_client),
+                batch,
+                limit=self.resource_workers * 2,
+            ))
+
+    def results(
+            self,
+            root_executor: Optional[Executor],
+            resource_executor: Optional[Executor],
+    ) -> Iterator[UpdateResult]:
+        if self.batch_size is not None:
+            # find the resources outside any transaction, then update them in batches
+            resources = (resource for uri in self.uris for resource in self.resources(self.repo, uri))
+            batches = ordered_map(
+                root_executor,
+                lambda batch: self.update_batch(batch, resource_executor),
+                batched(resources, self.batch_size),
+                limit=self.workers * 2,
+            )
+            for batch_results in batches:
+                yield from batch_results
+        elif root_executor is None:
+            for uri in self.uris:
+                yield from self.update_tree(uri, resource_executor)
+        else:
+            trees = ordered_map(
+                root_executor,
+                lambda uri: list(self.update_tree(uri, resource_executor)),
+                self.uris,
+                limit=self.workers * 2,
+            )
+            for tree_results in trees:
+                yield from tree_results
 
     def run(self) -> Generator[dict[str, Any], None, dict[str, Any]]:
         if self.completed is None:
@@ -103,34 +218,38 @@ class UpdateJob:
         if self.dry_run:
             logger.info('Dry run enabled, no actual updates will take place')
 
+        # parse the update once, so that a malformed update fails the job before any
+        # resource is touched; with a model class, it is also applied in-memory to
+        # every resource for validation
+        try:
+            self.prepared_update = prepareUpdate(self.sparql_update)
+        except ParseException as e:
+            raise UpdateError(f'Unable to parse SPARQL Update: {e}') from e
+
         stats = {
             'updated': [],
             'invalid': defaultdict(list),
             'errors': defaultdict(list)
         }
-        for uri in self.uris:
-            with context(repo=self.repo, use_transactions=self.use_transactions, dry_run=self.dry_run):
-                for resource in self.repo[uri].walk(traverse=self.traverse):
-                    if resource.url in self.completed:
-                        logger.info(f'Resource {resource.url} has already been updated; skipping')
-                        continue
-                    try:
-                        log_entry = update(
-                            resource=resource,
-                            sparql_update=self.sparql_update,
-                            model_class=self.model_class,
-                            dry_run=self.dry_run,
-                        )
-                        self.completed.append(log_entry)
-                        stats['updated'].append(resource.url)
-                    except DryRun:
-                        # TODO: dry run should be implemented in the client
-                        pass
-                    except ValidationFailed as e:
-                        stats['invalid'][resource.url].extend(f'{key}: {value}' for key, value in e.failures)
-                    except UpdateError as e:
-                        stats['errors'][resource.url].append(str(e))
-                    yield stats
+        root_executor = ThreadPoolExecutor(self.workers, thread_name_prefix='update') if self.workers > 1 else None
+        resource_executor = (
+            ThreadPoolExecutor(self.resource_workers, thread_name_prefix='update-resource')
+            if self.resource_workers > 1 else None
+        )
+        try:
+            for result in self.results(root_executor, resource_executor):
+                if result.log_entry is not None:
+                    self.completed.append(result.log_entry)
+                    stats['updated'].append(result.url)
+                elif result.invalid is not None:
+                    stats['invalid'][result.url].extend(result.invalid)
+                elif result.error is not None:
+                    stats['errors'][result.url].append(result.error)
+                yield stats
+        finally:
+            for executor in (root_executor, resource_executor):
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
 
         if len(stats['errors']) == 0 and len(stats['invalid']) == 0:
             state = 'update_complete'
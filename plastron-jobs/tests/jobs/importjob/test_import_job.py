@@ -1,13 +1,23 @@
-from contextlib import nullcontext
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
 from pathlib import Path
 from typing import Generator
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
+from plastron.client import ClientError
+from plastron.client.transactions import TransactionError
 from plastron.context import PlastronContext
-from plastron.jobs import JobConfigError, Jobs
-from plastron.jobs.importjob import ImportConfig, ImportJob, PublishableObjectResource
+from plastron.jobs import JobConfigError, JobError, Jobs
+from plastron.jobs.importjob import (
+    ImportConfig,
+    ImportJob,
+    MetadataSpreadsheet,
+    PublishableObjectResource,
+    is_transient_error,
+)
 from plastron.namespaces import umdaccess
 from plastron.repo import Repository
 from plastron.repo.publish import get_publication_status
@@ -109,6 +119,141 @@ def test_import_job_create_resource_publish_all(import_file, jobs):
         assert get_publication_status(mock_container.obj) == 'Published'
 
 
+def test_import_job_closes_logs_when_stopped(import_file, jobs):
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = MockContainer()
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    run_iterator = import_job.run(context=mock_context, import_file=import_file.open())
+    next(run_iterator)
+    next(run_iterator)
+    with patch.object(import_job, 'close', wraps=import_job.close) as mock_close:
+        # e.g., the consumer of the status updates stops early
+        run_iterator.close()
+    mock_close.assert_called_once()
+    assert len(import_job.completed_log) == 1
+
+
+def test_import_job_closes_metadata(import_file, jobs):
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = MockContainer()
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    with patch.object(MetadataSpreadsheet, 'close', autospec=True, side_effect=MetadataSpreadsheet.close) as mock_close:
+        for _ in import_job.run(context=mock_context, import_file=import_file.open()):
+            pass
+    assert mock_close.call_count > 0
+    for call in mock_close.call_args_list:
+        metadata = call.args[0]
+        assert metadata.metadata_file.closed
+        assert metadata._binary_file is None
+
+
+def rows_on_disk(log_file: Path) -> int:
+    with log_file.open() as fh:
+        return len(fh.readlines()) - 1
+
+
+def test_import_job_batched_log_writes(import_file, jobs):
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = MockContainer()
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    log_file = import_job.dir / 'completed.log.csv'
+    run_iterator = import_job.run(
+        context=mock_context,
+        import_file=import_file.open(),
+        log_batch_size=4,
+        log_fsync_interval=0,
+    )
+    with patch('plastron.jobs.logs.os.fsync') as mock_fsync:
+        for n, _ in enumerate(run_iterator):
+            if n == 3:
+                # three rows are done, but still buffered
+                assert rows_on_disk(log_file) == 0
+            elif n == 4:
+                assert rows_on_disk(log_file) == 4
+
+    assert rows_on_disk(log_file) == 9
+    # synced after each batch of 4 rows, and when the log is closed
+    assert mock_fsync.call_count == 4
+
+
+def test_import_job_with_workers_logs_in_row_order(import_file, jobs):
+    mock_container = MockContainer()
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = mock_container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    runner = JobRunner()
+    result = runner.run(import_job.run(context=mock_context, import_file=import_file.open(), workers=3))
+    assert result['type'] == 'import_complete'
+    assert result['count']['created_items'] == 9
+    assert [row['id'] for row in import_job.completed_log] == [
+        'test-unmarked',
+        'test-publish',
+        'test-hidden',
+        'test-publish-hidden',
+        'test-not-publish',
+        'test-not-hidden',
+        'test-not-publish-not-hidden',
+        'test-not-publish-hidden',
+        'test-publish-not-hidden',
+    ]
+    # the worker threads share the context
+    mock_context.clone.assert_not_called()
+
+
+def test_import_job_saves_summary(import_file, jobs):
+    mock_container = MockContainer()
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = mock_container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    assert import_job.load_summary() is None
+    runner = JobRunner()
+    runner.run(import_job.run(context=mock_context, import_file=import_file.open()))
+
+    summary = import_job.load_summary()
+    assert summary['job_id'] == '123'
+    assert summary['model'] == 'Item'
+    assert summary['state'] == 'import_complete'
+    assert summary['run'] == import_job.latest_run().timestamp
+    assert summary['total'] == 9
+    assert summary['completed'] == 9
+    assert summary['last_row'] == 9
+    assert summary['count']['created_items'] == 9
+    assert summary in jobs.summaries()
+
+
+def test_import_job_saves_timings(import_file, jobs):
+    mock_container = MockContainer()
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = mock_container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='123', model='Item'))
+    result = JobRunner().run(import_job.run(context=mock_context, import_file=import_file.open()))
+
+    timings = import_job.latest_run().timings
+    assert timings == result['timings']
+    for phase in ('get_object', 'validate', 'validate_files', 'update_repo', 'create_resource'):
+        assert timings[phase]['count'] == 9
+        assert timings[phase]['p50'] <= timings[phase]['p90'] <= timings[phase]['max']
+    assert len(timings['update_repo']['slowest']) == 5
+
+
 def test_config_read_none_string_as_none(jobs):
     # ensure that when reading improperly serialized config files,
     # the string "None" gets treated as the value None
@@ -248,3 +393,381 @@ def test_import_job_validation_passes_for_job_with_files_column_and_no_files_spe
         import_file=(datadir / 'item_with_empty_item_files_column.csv').open(),
     ))
     assert result['type'] == 'validate_success'
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_import_job_validation_with_processes(jobs, datadir, processes):
+    context = PlastronContext(config={'REPOSITORY': {'REST_ENDPOINT': 'http://localhost:8080/fcrepo/rest'}})
+    import_job = jobs.create_job(
+        ImportJob,
+        config=ImportConfig(job_id='789', model='Item', binaries_location=str(datadir)),
+    )
+    runner = JobRunner()
+    result = runner.run(import_job.run(
+        context=context,
+        validate_only=True,
+        import_file=(datadir / 'item_with_file_in_item_files_column.csv').open(),
+        processes=processes,
+    ))
+    assert result['type'] == 'validate_failed'
+    assert result['count']['invalid_items'] == 1
+    run = import_job.latest_run()
+    invalid = list(run.invalid_items)
+    assert len(invalid) == 1
+    assert invalid[0]['reason'].startswith('Validation failures: ITEM_FILES')
+
+
+@pytest.mark.parametrize(
+    ('lookahead', 'expected_prefetched'),
+    [
+        # the third row has the same URI as the first, and is still waiting behind it
+        (3, [True, True, False]),
+        # the first row is processed before the third row is read ahead
+        (1, [True, True, True]),
+    ]
+)
+def test_prefetch_resources(jobs, datadir, lookahead, expected_prefetched):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='prefetch', model='Item'))
+    import_job.store_metadata_file((datadir / 'item_with_uris.csv').open())
+    run = import_job.new_run()
+    with patch('plastron.jobs.importjob.Repository') as mock_repository:
+        rows = list(run.prefetch_resources(MagicMock(), import_job.get_metadata().rows(), lookahead))
+
+    assert [row.prefetched is not None for row in rows] == expected_prefetched
+    assert mock_repository.return_value.__getitem__.call_count == sum(expected_prefetched)
+
+
+class MockTransactions:
+    """Stand-in for `Repository.transaction()` that records whether each outermost
+    transaction was committed or rolled back. Nested transactions join the outer one."""
+    def __init__(self):
+        self.depth = 0
+        self.outcomes = []
+
+    @contextmanager
+    def __call__(self, *_args, **_kwargs):
+        if self.depth > 0:
+            yield
+            return
+        self.depth += 1
+        try:
+            yield
+        except Exception:
+            self.outcomes.append('rollback')
+            raise
+        else:
+            self.outcomes.append('commit')
+        finally:
+            self.depth -= 1
+
+
+class FailingContainer(MockContainer):
+    def __init__(self, fail_on: str):
+        self.fail_on = fail_on
+
+    def create_child(self, resource_class, description):
+        if str(description.identifier) == self.fail_on:
+            raise ClientError(MagicMock(status_code=500, reason='Internal Server Error', text=''))
+        return super().create_child(resource_class, description)
+
+
+def run_batched_import(jobs, import_file, container, **kwargs):
+    transactions = MockTransactions()
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.side_effect = transactions
+    mock_repo.__getitem__.return_value = container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='batch', model='Item'))
+    result = JobRunner().run(import_job.run(context=mock_context, import_file=import_file.open(), **kwargs))
+    return import_job, result, transactions.outcomes
+
+
+def test_import_job_batches_without_prefetch(jobs, datadir):
+    # the first and third rows share a URI, and are further apart than the lookahead;
+    # reading the third row ahead would miss the uncommitted changes from the first
+    with patch('plastron.jobs.importjob.Repository') as mock_repository:
+        _, result, outcomes = run_batched_import(
+            jobs, datadir / 'item_with_uris.csv', MagicMock(), batch_size=10, prefetch=1,
+        )
+    assert result['type'] == 'import_complete'
+    assert outcomes == ['commit']
+    mock_repository.return_value.__getitem__.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ('batch_size', 'batch_timeout', 'expected_commits'),
+    [
+        (4, None, 3),
+        (20, None, 1),
+        # every batch times out after its first row
+        (4, 0, 9),
+    ]
+)
+def test_import_job_batches(import_file, jobs, batch_size, batch_timeout, expected_commits):
+    import_job, result, outcomes = run_batched_import(
+        jobs, import_file, MockContainer(), batch_size=batch_size, batch_timeout=batch_timeout,
+    )
+    assert result['type'] == 'import_complete'
+    assert result['count']['created_items'] == 9
+    assert outcomes == ['commit'] * expected_commits
+    assert result['timings']['commit']['count'] == expected_commits
+
+
+def test_import_job_batch_isolates_failed_row(import_file, jobs):
+    import_job, result, outcomes = run_batched_import(
+        jobs, import_file, FailingContainer(fail_on='test-hidden'), batch_size=4,
+    )
+    assert result['type'] == 'import_incomplete'
+    assert result['count']['created_items'] == 8
+    assert result['count']['items_with_errors'] == 1
+    # the first batch fails on its third row, and is retried in smaller batches
+    # until the failed row is isolated; then the import continues in full batches
+    assert outcomes == ['rollback', 'rollback', 'commit', 'rollback', 'commit', 'rollback', 'commit', 'commit']
+    assert [row['id'] for row in import_job.completed_log] == [
+        'test-unmarked',
+        'test-publish',
+        'test-publish-hidden',
+        'test-not-publish',
+        'test-not-hidden',
+        'test-not-publish-not-hidden',
+        'test-not-publish-hidden',
+        'test-publish-not-hidden',
+    ]
+    failed = list(import_job.latest_run().failed_items)
+    assert [row['id'] for row in failed] == ['test-hidden']
+
+
+class FlakyContainer(MockContainer):
+    """Fails to create each of the items in `failures` the given number of times,
+    with the given HTTP status, before it succeeds."""
+    def __init__(self, failures: dict[str, int], status_code: int):
+        self.failures = dict(failures)
+        self.status_code = status_code
+
+    def create_child(self, resource_class, description):
+        identifier = str(description.identifier)
+        if self.failures.get(identifier, 0) > 0:
+            self.failures[identifier] -= 1
+            raise ClientError(MagicMock(status_code=self.status_code, reason='Error', text=''))
+        return super().create_child(resource_class, description)
+
+
+def run_flaky_import(jobs, import_file, container, **kwargs):
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='flaky', model='Item'))
+    result = JobRunner().run(import_job.run(
+        context=mock_context, import_file=import_file.open(), retry_backoff=0, **kwargs
+    ))
+    return import_job, result
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_import_job_requeues_transient_failures(import_file, jobs, workers):
+    container = FlakyContainer({'test-publish': 1, 'test-hidden': 2}, status_code=503)
+    import_job, result = run_flaky_import(jobs, import_file, container, workers=workers)
+    assert result['type'] == 'import_complete'
+    assert result['count']['created_items'] == 9
+    assert result['count']['retried_items'] == 2
+    # the re-queued rows are completed at the end of the run
+    assert [row['id'] for row in import_job.completed_log][-2:] == ['test-publish', 'test-hidden']
+    assert list(import_job.latest_run().failed_items) == []
+
+
+def test_import_job_transient_failure_exhausts_retries(import_file, jobs):
+    container = FlakyContainer({'test-hidden': 3}, status_code=503)
+    import_job, result = run_flaky_import(jobs, import_file, container, retries=2)
+    assert result['type'] == 'import_incomplete'
+    assert result['count']['created_items'] == 8
+    assert result['count']['items_with_errors'] == 1
+    assert [row['id'] for row in import_job.latest_run().failed_items] == ['test-hidden']
+
+
+def test_import_job_does_not_requeue_permanent_failures(import_file, jobs):
+    container = FlakyContainer({'test-hidden': 1}, status_code=400)
+    import_job, result = run_flaky_import(jobs, import_file, container)
+    assert result['type'] == 'import_incomplete'
+    assert result['count']['retried_items'] == 0
+    assert [row['id'] for row in import_job.latest_run().failed_items] == ['test-hidden']
+
+
+@pytest.mark.parametrize(
+    ('error', 'expected'),
+    [
+        (ClientError(MagicMock(status_code=503, reason='Service Unavailable')), True),
+        (ClientError(MagicMock(status_code=504, reason='Gateway Timeout')), True),
+        (ClientError(MagicMock(status_code=500, reason='Internal Server Error')), False),
+        (ClientError(MagicMock(status_code=404, reason='Not Found')), False),
+        (TransactionError('Failed to commit transaction'), True),
+        (requests.ConnectionError('connection refused'), True),
+        (requests.ReadTimeout('read timed out'), True),
+        (ValueError('bad value'), False),
+        (None, False),
+    ]
+)
+def test_is_transient_error(error, expected):
+    assert is_transient_error(error) is expected
+
+
+def test_is_transient_error_follows_cause():
+    error = JobError(None, 'Updating item failed')
+    assert not is_transient_error(error)
+    error.__cause__ = RuntimeError('Connection error: connection refused')
+    error.__cause__.__cause__ = requests.ConnectionError('connection refused')
+    assert is_transient_error(error)
+
+
+def run_sharded_import(import_job, container, shards=3, **kwargs):
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = container
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+    dispatched = []
+
+    def dispatch(number, shard):
+        # run each shard as soon as it is dispatched, as another plastrond instance would
+        dispatched.append(number)
+        try:
+            JobRunner().run(shard.run_shard(context=mock_context, retries=0))
+        except RuntimeError:
+            pass
+
+    result = JobRunner().run(import_job.run_sharded(shards=shards, dispatch=dispatch, poll_interval=0, **kwargs))
+    return result, dispatched
+
+
+def test_import_job_create_shards(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    import_job.store_metadata_file(import_file.open())
+    import_job.completed_log.append({'id': 'test-unmarked'})
+
+    shards = import_job.create_shards(4)
+    assert [shard.id for shard in shards] == [f'sharded/shards/{n}' for n in range(1, 5)]
+    assert [shard.config.model for shard in shards] == ['Item'] * 4
+    # completed rows are not included in any shard
+    assert [[row.identifier for row in shard.get_metadata().rows()] for shard in shards] == [
+        ['test-publish', 'test-hidden'],
+        ['test-publish-hidden', 'test-not-publish'],
+        ['test-not-hidden', 'test-not-publish-not-hidden'],
+        ['test-not-publish-hidden', 'test-publish-not-hidden'],
+    ]
+    assert [shard.id for shard in import_job.shards] == [shard.id for shard in shards]
+    with pytest.raises(RuntimeError):
+        import_job.create_shards(2)
+
+
+def test_import_job_sharded(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    result, dispatched = run_sharded_import(import_job, MockContainer(), import_file=import_file.open())
+    assert dispatched == [1, 2, 3]
+    assert result['type'] == 'import_complete'
+    assert result['count']['created_items'] == 9
+    assert [shard['state'] for shard in result['shards']] == ['import_complete'] * 3
+    # the completed logs of the shards are merged into the job's completed log
+    assert len(import_job.completed_log) == 9
+    summary = import_job.load_summary()
+    assert summary['state'] == 'import_complete'
+    assert summary['completed'] == 9
+    assert summary['processed'] == 9
+
+
+def test_import_job_sharded_resume(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    container = FlakyContainer({'test-hidden': 1}, status_code=400)
+    result, _ = run_sharded_import(import_job, container, import_file=import_file.open())
+    assert result['type'] == 'import_incomplete'
+    assert result['count']['created_items'] == 8
+    # the dropped items of the shards are merged into the logs of the coordinator's run
+    assert [row['id'] for row in import_job.latest_run().failed_items] == ['test-hidden']
+
+    # only the incomplete shard is run again
+    result, dispatched = run_sharded_import(import_job, container)
+    assert dispatched == [1]
+    assert result['type'] == 'import_complete'
+    assert result['count']['created_items'] == 1
+    assert len(import_job.completed_log) == 9
+
+
+def test_import_job_sharded_shard_error(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    import_job.store_metadata_file(import_file.open())
+    shards = import_job.create_shards(3)
+    # shard 2 cannot be run
+    shards[1].metadata_file.unlink()
+
+    result, _ = run_sharded_import(import_job, MockContainer())
+    assert result['type'] == 'import_incomplete'
+    assert [shard['state'] for shard in result['shards']] == ['import_complete', 'import_error', 'import_complete']
+    assert len(import_job.completed_log) == 6
+
+
+def test_import_job_sharded_timeout(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    result = JobRunner().run(import_job.run_sharded(
+        shards=2,
+        dispatch=lambda number, shard: None,
+        import_file=import_file.open(),
+        poll_interval=0,
+        timeout=0,
+    ))
+    assert result['type'] == 'import_incomplete'
+    assert len(import_job.completed_log) == 0
+
+
+def test_import_job_sharded_resume_waits_for_shard_in_progress(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    import_job.store_metadata_file(import_file.open())
+    shards = import_job.create_shards(3)
+    # shard 1 is being run by another plastrond instance
+    shards[0].save_summary({'state': 'import_in_progress', 'updated': datetime.now().timestamp()})
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = MockContainer()
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+    dispatched = []
+
+    def dispatch(number, shard):
+        dispatched.append(number)
+        JobRunner().run(shard.run_shard(context=mock_context))
+
+    def wait(_seconds):
+        # the other instance finishes shard 1
+        JobRunner().run(shards[0].run_shard(context=mock_context))
+
+    result = JobRunner().run(import_job.new_run().run_sharded(shards=3, dispatch=dispatch, poll_interval=0, wait=wait))
+    assert dispatched == [2, 3]
+    assert result['type'] == 'import_complete'
+    assert len(import_job.completed_log) == 9
+
+
+def test_import_job_sharded_stalled_shard(import_file, jobs):
+    import_job = jobs.create_job(ImportJob, config=ImportConfig(job_id='sharded', model='Item'))
+    import_job.store_metadata_file(import_file.open())
+    shards = import_job.create_shards(3)
+    # shard 1 was left in progress by an instance that died an hour ago
+    an_hour_ago = datetime.now().timestamp() - 3600
+    shards[0].save_summary({'state': 'import_in_progress', 'updated': an_hour_ago})
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.transaction.return_value = nullcontext()
+    mock_repo.__getitem__.return_value = MockContainer()
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo)
+    dispatched = []
+
+    def dispatch(number, shard):
+        dispatched.append(number)
+        if number == 3:
+            # the instance running shard 3 dies after it starts
+            shard.save_summary({'state': 'import_in_progress', 'updated': an_hour_ago})
+        else:
+            JobRunner().run(shard.run_shard(context=mock_context))
+
+    result = JobRunner().run(import_job.run_sharded(shards=3, dispatch=dispatch, poll_interval=0))
+    # the stalled shard 1 is dispatched again
+    assert dispatched == [1, 2, 3]
+    assert result['type'] == 'import_incomplete'
+    assert [shard['state'] for shard in result['shards']] == ['import_complete', 'import_complete', 'import_stalled']
+    assert len(import_job.completed_log) == 6
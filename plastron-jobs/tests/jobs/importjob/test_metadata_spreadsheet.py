@@ -1,13 +1,13 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
-from plastron.jobs.importjob.spreadsheet import InvalidRow
-from rdflib import Literal
+from plastron.jobs.importjob.spreadsheet import InvalidRow, MetadataError, RowIndex
+from rdflib import Graph, Literal
 
 from plastron.jobs.importjob import MetadataSpreadsheet
 from plastron.models.umd import Item
 from plastron.namespaces import umdtype
-from plastron.repo import Repository
+from plastron.repo import Repository, RepositoryResource
 
 
 def test_no_binaries(datadir):
@@ -57,3 +57,75 @@ def test_file_group_errors(filename, expected_reason, datadir):
     assert isinstance(row, InvalidRow)
     assert row.reason == expected_reason
     assert metadata.errors == 1
+
+
+def test_get_object_uses_prefetched_resource(datadir):
+    metadata = MetadataSpreadsheet(datadir / 'postcard.csv', Item)
+    repo = MagicMock(spec=Repository)
+    row = next(metadata.rows())
+    row.data['URI'] = 'http://localhost:8080/fcrepo/rest/foo'
+    row.prefetched = MagicMock(spec=RepositoryResource, graph=Graph())
+    row.get_object(repo, read_from_repo=True)
+    repo.__getitem__.assert_not_called()
+
+
+def test_row_index(datadir):
+    index = RowIndex.build(datadir / 'multiline.csv', 'Identifier')
+    assert len(index) == 4
+    assert index.identifiers == ['item-1', 'item-2', 'item-3', 'item-4']
+    assert index[2].uri == 'http://localhost:8080/fcrepo/rest/foo'
+    assert index.is_current(datadir / 'multiline.csv', 'Identifier')
+    assert not index.is_current(datadir / 'multiline.csv', 'Title')
+
+
+def test_row_index_saved_and_reused(datadir, tmp_path):
+    index_file = tmp_path / 'index.json'
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=index_file)
+    assert metadata.total == 4
+    assert index_file.exists()
+    with patch.object(RowIndex, 'build') as mock_build:
+        metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=index_file)
+        mock_build.assert_not_called()
+    assert metadata.total == 4
+
+
+def test_row_index_rebuilt_when_stale(datadir, tmp_path):
+    index_file = tmp_path / 'index.json'
+    MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=index_file)
+    with (datadir / 'multiline.csv').open('a') as fh:
+        fh.write('http://purl.org/dc/dcmitype/Text,item-5,http://vocab.lib.umd.edu/rightsStatement#InC-NC,Fifth,\n')
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=index_file)
+    assert metadata.total == 5
+
+
+def test_get_row_by_number(datadir, tmp_path):
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=tmp_path / 'index.json')
+    row = metadata.get_row(2)
+    assert row.identifier == 'item-2'
+    assert row['Title'] == 'Second Item,\non two lines'
+    assert isinstance(metadata.get_row(4), InvalidRow)
+
+
+def test_close(datadir, tmp_path):
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=tmp_path / 'index.json')
+    metadata.get_row(2)
+    binary_file = metadata._binary_file
+    metadata.close()
+    assert metadata.metadata_file.closed
+    assert binary_file.closed
+
+
+def test_get_row_requires_index(datadir):
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item)
+    with pytest.raises(MetadataError):
+        metadata.get_row(1)
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_indexed_rows_match_unindexed_rows(datadir, tmp_path, indexed):
+    index_file = tmp_path / 'index.json' if indexed else None
+    metadata = MetadataSpreadsheet(datadir / 'multiline.csv', Item, index_filename=index_file)
+    rows = list(metadata.rows(completed={'item-1'}))
+    assert [getattr(row, 'identifier', None) for row in rows] == ['item-2', 'item-3', None]
+    assert metadata.skipped == 1
+    assert metadata.row_count == 4
@@ -0,0 +1,89 @@
+import hashlib
+from io import BytesIO
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import bagit
+import pytest
+
+from plastron.jobs.bags import BagWriteError, ZipBagWriter
+
+
+def write_bag(destination, **kwargs):
+    with ZipBagWriter(destination, root_dirname='test-bag', **kwargs) as bag:
+        bag.add_file('foo/text.txt', [b'Hello, ', b'world!'], mime_type='text/plain')
+        bag.add_file('foo/image.jpg', [b'\xff\xd8\xff\xe0'], mime_type='image/jpeg')
+        bag.add_file('metadata.csv', [b'Title\nFoo\n'])
+    return bag
+
+
+def test_zip_bag_writer(tmp_path):
+    bag = write_bag(tmp_path / 'bag.zip')
+    assert bag.payload_files == 3
+    assert bag.payload_bytes == 27
+
+    with ZipFile(tmp_path / 'bag.zip') as zip_file:
+        assert zip_file.read('test-bag/data/foo/text.txt') == b'Hello, world!'
+        manifest = zip_file.read('test-bag/manifest-sha256.txt').decode()
+        assert f'{hashlib.sha256(b"Hello, world!").hexdigest()}  data/foo/text.txt\n' in manifest
+        bag_info = zip_file.read('test-bag/bag-info.txt').decode()
+        assert 'Payload-Oxum: 27.3\n' in bag_info
+        zip_file.extractall(tmp_path)
+
+    # the bagit library agrees that this is a valid, complete bag
+    bagit.Bag(str(tmp_path / 'test-bag')).validate()
+
+
+@pytest.mark.parametrize(
+    ('compress_level', 'text_compression'),
+    [
+        (None, ZIP_DEFLATED),
+        (9, ZIP_DEFLATED),
+        (0, ZIP_STORED),
+    ]
+)
+def test_zip_bag_writer_compression(compress_level, text_compression):
+    buffer = BytesIO()
+    write_bag(buffer, compress_level=compress_level)
+
+    with ZipFile(buffer) as zip_file:
+        assert zip_file.getinfo('test-bag/data/foo/text.txt').compress_type == text_compression
+        # already-compressed files are never compressed again
+        assert zip_file.getinfo('test-bag/data/foo/image.jpg').compress_type == ZIP_STORED
+
+
+def test_zip_bag_writer_duplicate_file():
+    with ZipBagWriter(BytesIO()) as bag:
+        bag.add_file('foo.txt', [b'foo'])
+        with pytest.raises(ValueError):
+            bag.add_file('foo.txt', [b'bar'])
+
+
+def test_zip_bag_writer_failed_file(tmp_path):
+    def chunks():
+        yield b'partial'
+        raise OSError('connection lost')
+
+    bag = ZipBagWriter(tmp_path / 'bag.zip', root_dirname='test-bag')
+    bag.add_file('foo.txt', [b'foo'])
+    with pytest.raises(BagWriteError):
+        bag.add_file('bar.txt', chunks())
+
+    # the partial file is never added to the manifests
+    assert set(bag.manifest) == {'data/foo.txt'}
+    assert bag.payload_bytes == 3
+    with pytest.raises(BagWriteError):
+        bag.close()
+
+    # the bag is left without its manifests, so it cannot pass as complete
+    with ZipFile(tmp_path / 'bag.zip') as zip_file:
+        assert 'test-bag/bagit.txt' not in zip_file.namelist()
+
+
+def test_zip_bag_writer_aborted_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ZipBagWriter(tmp_path / 'bag.zip', root_dirname='test-bag') as bag:
+            bag.add_file('foo.txt', [b'foo'])
+            raise RuntimeError
+
+    with ZipFile(tmp_path / 'bag.zip') as zip_file:
+        assert zip_file.namelist() == ['test-bag/data/foo.txt']
@@ -1,5 +1,21 @@
+import hashlib
+import json
+from unittest.mock import MagicMock, patch
+from zipfile import ZipFile
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+
 from plastron.context import PlastronContext
-from plastron.jobs.exportjob import ExportJob
+from plastron.files import SPOOL_CHUNK_SIZE, BinaryResource, FileSpec
+from plastron.jobs import ItemLog
+from plastron.jobs.bags import BagWriteError, ZipBagWriter
+from plastron.jobs.exportjob import ExportCheckpoint, ExportJob, get_export_file
+from plastron.jobs.timings import load_timings
+from plastron.models.pcdm import PCDMFile
+from plastron.models.umd import Item
+from plastron.repo import DataReadError
+from plastron.repo.pcdm import PCDMObjectResource
 
 
 def test_exportjob_without_binaries():
@@ -28,3 +44,287 @@ def test_exportjob_with_binaries():
         key='',
     )
     assert callable(job.mime_type_filter)
+
+
+def mock_file_resource(filename: str, content: bytes):
+    file_resource = MagicMock(spec=BinaryResource, url=f'http://localhost:8080/fcrepo/rest/files/{filename}')
+    file_resource.headers = {
+        'Date': 'Mon, 01 Jan 2024 12:00:00 GMT',
+        'Last-Modified': 'Mon, 01 Jan 2024 10:00:00 GMT',
+        'ETag': f'W/"{filename}-1"',
+        'Content-Type': 'text/plain',
+    }
+    file_resource.size = len(content)
+    file_resource.describe.return_value = PCDMFile(filename=Literal(filename))
+    file_resource.iter_content.side_effect = lambda *args, **kwargs: iter([content])
+    return file_resource
+
+
+def mock_object_resource(n: int):
+    uri = f'http://localhost:8080/fcrepo/rest/foo/{n}'
+    resource = MagicMock(spec=PCDMObjectResource, url=uri, path=f'/foo/{n}', graph=Graph())
+    resource.headers = {'ETag': f'W/"item-{n}-1"', 'Last-Modified': 'Mon, 01 Jan 2024 10:00:00 GMT'}
+    resource.read.return_value = resource
+    resource.describe.return_value = Item(uri=URIRef(uri), identifier=Literal(f'item-{n}'), title=Literal(f'Item {n}'))
+    resource.get_sequence.return_value = []
+    resource.get_files.return_value = [mock_file_resource(f'file-{n}.txt', f'content {n}'.encode())]
+    return resource
+
+
+def mock_context(resources: dict) -> PlastronContext:
+    context = MagicMock(spec=PlastronContext)
+    context.clone.return_value = context
+    context.get_public_url.return_value = 'http://example.com/public'
+    context.repo.__getitem__.side_effect = lambda key: resources[key.start]
+    return context
+
+
+def run_job(job: ExportJob) -> tuple[list[int], dict]:
+    progress = []
+    run = job.run()
+    while True:
+        try:
+            progress.append(next(run)['progress'])
+        except StopIteration as e:
+            return progress, e.value
+
+
+@pytest.mark.parametrize(('workers', 'download_workers'), [(1, 1), (3, 2)])
+def test_exportjob_run(tmp_path, workers, download_workers):
+    resources = {r.url: r for r in (mock_object_resource(n) for n in range(1, 6))}
+    # the third object cannot be read
+    resources['http://localhost:8080/fcrepo/rest/foo/3'].read.side_effect = DataReadError('bad data')
+
+    job = ExportJob(
+        context=mock_context(resources),
+        export_format='turtle',
+        export_binaries=True,
+        binary_types='',
+        output_dest=str(tmp_path / 'export.zip'),
+        uri_template='http://example.com/{id}',
+        uris=list(resources.keys()),
+        key='',
+        workers=workers,
+        download_workers=download_workers,
+    )
+    progress, result = run_job(job)
+
+    assert progress == [0, 20, 40, 60, 80, 100]
+    assert result['type'] == 'partial_export'
+    assert result['count']['exported'] == 4
+    assert result['count']['errors'] == 1
+
+    with ZipFile(tmp_path / 'export.zip') as zip_file:
+        names = set(zip_file.namelist())
+        for n in (1, 2, 4, 5):
+            assert zip_file.read(f'export/data/item-{n}/file-{n}.txt') == f'content {n}'.encode()
+        assert 'export/data/item-3/file-3.txt' not in names
+        metadata = zip_file.read('export/data/metadata.ttl').decode()
+        assert 'item-5' in metadata
+        assert 'item-3' not in metadata
+
+
+def test_exportjob_failed_download_fails_export(tmp_path):
+    resources = {r.url: r for r in (mock_object_resource(n) for n in range(1, 4))}
+
+    def iter_content(*args, **kwargs):
+        yield b'partial'
+        raise ConnectionError('connection lost')
+
+    resources['http://localhost:8080/fcrepo/rest/foo/2'].get_files.return_value[0].iter_content.side_effect = (
+        iter_content
+    )
+    job = ExportJob(
+        context=mock_context(resources),
+        export_format='turtle',
+        export_binaries=True,
+        binary_types='',
+        output_dest=str(tmp_path / 'export.zip'),
+        uri_template='http://example.com/{id}',
+        uris=list(resources.keys()),
+        key='',
+    )
+    with pytest.raises(BagWriteError):
+        run_job(job)
+
+    # the bag is closed without manifests for the partial file
+    with ZipFile(tmp_path / 'export.zip') as zip_file:
+        names = set(zip_file.namelist())
+    assert 'export/data/item-2/file-2.txt' in names
+    assert not any(name.startswith('export/manifest-') for name in names)
+
+
+@pytest.mark.parametrize(('workers', 'skip_unchanged'), [(1, False), (3, False), (1, True)])
+def test_exportjob_incremental(tmp_path, workers, skip_unchanged):
+    resources = {r.url: r for r in (mock_object_resource(n) for n in range(1, 4))}
+
+    def export(output_dest: str, uris: list[str], previous_export: str = None):
+        job = ExportJob(
+            context=mock_context(resources),
+            export_format='turtle',
+            export_binaries=True,
+            binary_types='',
+            output_dest=str(tmp_path / output_dest),
+            uri_template='http://example.com/{id}',
+            uris=uris,
+            key='',
+            workers=workers,
+            download_workers=workers,
+            previous_export=previous_export,
+            skip_unchanged=skip_unchanged,
+        )
+        return run_job(job)[1]
+
+    export('first.zip', list(resources.keys()))
+
+    # change the second item and its file, and stop exporting the third item
+    item_2 = resources['http://localhost:8080/fcrepo/rest/foo/2']
+    item_2.headers = {**item_2.headers, 'ETag': 'W/"item-2-2"'}
+    file_2 = item_2.get_files.return_value[0]
+    file_2.headers = {**file_2.headers, 'ETag': 'W/"file-2.txt-2"'}
+    file_2.iter_content.side_effect = lambda *args, **kwargs: iter([b'new content 2'])
+    file_1 = resources['http://localhost:8080/fcrepo/rest/foo/1'].get_files.return_value[0]
+    file_1.iter_content.reset_mock()
+
+    result = export('second.zip', list(resources.keys())[:2], previous_export=str(tmp_path / 'first.zip'))
+    assert result['type'] == 'export_complete'
+    # the unchanged file is not downloaded again
+    file_1.iter_content.assert_not_called()
+
+    with ZipFile(tmp_path / 'second.zip') as zip_file:
+        names = set(zip_file.namelist())
+        if skip_unchanged:
+            assert 'second/data/item-1/file-1.txt' not in names
+        else:
+            assert zip_file.read('second/data/item-1/file-1.txt') == b'content 1'
+        assert zip_file.read('second/data/item-2/file-2.txt') == b'new content 2'
+        manifest = json.loads(zip_file.read('second/export-manifest.json'))
+
+    assert manifest['previous'] == 'first.zip'
+    assert manifest['items']['http://localhost:8080/fcrepo/rest/foo/1']['status'] == 'unchanged'
+    assert manifest['items']['http://localhost:8080/fcrepo/rest/foo/2']['status'] == 'changed'
+    assert manifest['files'][file_1.url]['status'] == 'unchanged'
+    assert manifest['files'][file_1.url]['digests']['sha256'] == hashlib.sha256(b'content 1').hexdigest()
+    assert manifest['files'][file_2.url]['status'] == 'changed'
+    assert manifest['removed'] == ['http://localhost:8080/fcrepo/rest/foo/3']
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_exportjob_resume(tmp_path, workers):
+    resources = {r.url: r for r in (mock_object_resource(n) for n in range(1, 6))}
+    uris = list(resources.keys())
+    job = ExportJob(
+        context=mock_context(resources),
+        export_format='csv',
+        export_binaries=True,
+        binary_types='',
+        output_dest=str(tmp_path / 'export.zip'),
+        uri_template='http://example.com/{id}',
+        uris=uris,
+        key='',
+        workers=workers,
+        download_workers=workers,
+        job_dir=str(tmp_path / 'jobs' / 'export-1'),
+    )
+    # stop the export after the first two items
+    run = job.run()
+    for _ in range(3):
+        next(run)
+    run.close()
+    assert not (tmp_path / 'export.zip').exists()
+
+    for resource in resources.values():
+        resource.get_files.return_value[0].iter_content.reset_mock()
+
+    resumed_job = ExportJob.resume_from(
+        context=mock_context(resources),
+        job_dir=str(tmp_path / 'jobs' / 'export-1'),
+        key='',
+        workers=workers,
+        download_workers=workers,
+    )
+    assert resumed_job.uris == uris
+    progress, result = run_job(resumed_job)
+    assert progress[0] == 40
+    assert progress[-1] == 100
+    assert result['type'] == 'export_complete'
+    assert result['count']['exported'] == 5
+
+    # nothing that was already exported is fetched again
+    for n, resource in enumerate(resources.values(), 1):
+        if n <= 2:
+            resource.get_files.return_value[0].iter_content.assert_not_called()
+        else:
+            resource.get_files.return_value[0].iter_content.assert_called()
+
+    with ZipFile(tmp_path / 'export.zip') as zip_file:
+        for n in range(1, 6):
+            assert zip_file.read(f'export/data/item-{n}/file-{n}.txt') == f'content {n}'.encode()
+        metadata = zip_file.read('export/data/Item_metadata.csv').decode()
+        for n in range(1, 6):
+            assert f'item-{n}' in metadata
+
+    # the staging area is removed once the export is complete
+    assert not (tmp_path / 'jobs' / 'export-1' / 'bag').exists()
+    # the resumed run only reads and downloads the remaining items
+    assert load_timings(tmp_path / 'jobs' / 'export-1') == result['timings']
+    assert result['timings']['read_item']['count'] == 3
+    assert result['timings']['download']['count'] == 3
+    if workers > 1:
+        # the download workers time the downloads, and the bag writes are timed separately
+        assert result['timings']['write_bag']['count'] == 3
+    else:
+        assert 'write_bag' not in result['timings']
+    completed_job = ExportJob.resume_from(context=mock_context(resources), job_dir=resumed_job.job_dir, key='')
+    with pytest.raises(RuntimeError):
+        next(completed_job.run())
+
+
+def test_exportjob_batched_log_writes(tmp_path):
+    resources = {r.url: r for r in (mock_object_resource(n) for n in range(1, 6))}
+    job = ExportJob(
+        context=mock_context(resources),
+        export_format='csv',
+        export_binaries=True,
+        binary_types='',
+        output_dest=str(tmp_path / 'export.zip'),
+        uri_template='http://example.com/{id}',
+        uris=list(resources.keys()),
+        key='',
+        job_dir=str(tmp_path / 'jobs' / 'export-1'),
+        log_batch_size=3,
+        log_fsync_interval=1.0,
+    )
+    with patch('plastron.jobs.exportjob.ItemLog', wraps=ItemLog) as mock_item_log:
+        _, result = run_job(job)
+
+    assert result['type'] == 'export_complete'
+    assert mock_item_log.call_count == 2
+    for call in mock_item_log.call_args_list:
+        assert call.kwargs == {'batch_size': 3, 'fsync_interval': 1.0}
+    # the buffered rows are all written when the export finishes
+    checkpoint = ExportCheckpoint(tmp_path / 'jobs' / 'export-1')
+    assert set(checkpoint.completed.item_keys) == set(resources.keys())
+
+
+def test_large_binary_written_in_chunks(tmp_path):
+    bag_file = tmp_path / 'bag.zip'
+    file_resource = mock_file_resource('large.jpg', b'')
+    file_resource.headers['Content-Type'] = 'image/jpeg'
+    # size of the bag when each chunk is requested
+    bag_sizes = []
+
+    def iter_content(chunk_size):
+        for n in range(8):
+            bag_sizes.append(bag_file.stat().st_size)
+            yield bytes([n]) * chunk_size
+
+    file_resource.iter_content.side_effect = iter_content
+    export_file = get_export_file(FileSpec(name='large.jpg', source=file_resource), 'item-1')
+    with ZipBagWriter(bag_file, root_dirname='bag') as bag:
+        bag.add_file(export_file.path, export_file.chunks, mime_type=export_file.mime_type)
+
+    file_resource.iter_content.assert_called_once_with(SPOOL_CHUNK_SIZE)
+    # each chunk is written to the bag before the next one is downloaded
+    assert all(size >= n * SPOOL_CHUNK_SIZE for n, size in enumerate(bag_sizes))
+    assert bag.payload_bytes == 8 * SPOOL_CHUNK_SIZE
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from plastron.jobs import ItemLog
@@ -70,14 +72,82 @@ def test_item_log_mismatched_fieldnames(datadir, caplog):
         fieldnames=['not', 'real'],
         keyfield='id',
     )
-    iter(log)
+    # the log file is read the first time its index is needed
+    len(log)
     assert 'do not match expected fieldnames' in caplog.text
 
 
 def test_item_log_bad_keyfield(datadir):
+    log = ItemLog(
+        filename=(datadir / 'item_log.csv'),
+        fieldnames=['id', 'title'],
+        keyfield='nope',
+    )
     with pytest.raises(ItemLogError):
-        ItemLog(
-            filename=(datadir / 'item_log.csv'),
-            fieldnames=['id', 'title'],
-            keyfield='nope',
-        )
+        'foo' in log
+
+
+def test_item_log_get_by_key(item_log):
+    item_log.append({'id': 'bar', 'title': 'The Bar Strikes Back'})
+    assert item_log.get('bar') == {'id': 'bar', 'title': 'The Bar Strikes Back'}
+    assert item_log.get('foo') == {'id': 'foo', 'title': 'The Adventures of Foo'}
+    assert item_log.get('baz') is None
+    assert item_log[-1] == {'id': 'bar', 'title': 'The Bar Strikes Back'}
+
+
+def test_item_log_batched_writes(tmp_path):
+    log = ItemLog(filename=(tmp_path / 'log.csv'), fieldnames=['id', 'title'], keyfield='id', batch_size=2)
+    log.append({'id': 'foo', 'title': 'Foo'})
+    assert 'foo' in log
+    assert (tmp_path / 'log.csv').read_bytes() == b'id,title\r\n'
+    log.append({'id': 'bar', 'title': 'Bar'})
+    log.append({'id': 'baz', 'title': 'Baz'})
+    assert (tmp_path / 'log.csv').read_bytes() == b'id,title\r\nfoo,Foo\r\nbar,Bar\r\n'
+    log.close()
+    assert (tmp_path / 'log.csv').read_bytes() == b'id,title\r\nfoo,Foo\r\nbar,Bar\r\nbaz,Baz\r\n'
+
+
+def test_item_log_fsync_interval(tmp_path):
+    log = ItemLog(filename=(tmp_path / 'log.csv'), fieldnames=['id', 'title'], keyfield='id', fsync_interval=0)
+    with patch('os.fsync') as mock_fsync:
+        log.append({'id': 'foo', 'title': 'Foo'})
+        assert mock_fsync.call_count == 1
+
+
+@pytest.mark.parametrize(
+    ('contents',),
+    [
+        # no newline at the end, and missing columns
+        ('id,title\r\nfoo,Foo\r\nbar',),
+        # ends in the middle of a quoted multi-line value
+        ('id,title\r\nfoo,Foo\r\nbar,"Bar\r\n',),
+    ]
+)
+def test_item_log_removes_incomplete_last_row(tmp_path, contents):
+    (tmp_path / 'log.csv').write_bytes(contents.encode())
+    log = ItemLog(filename=(tmp_path / 'log.csv'), fieldnames=['id', 'title'], keyfield='id')
+    assert len(log) == 1
+    assert 'bar' not in log
+    # not removed until the next write
+    assert (tmp_path / 'log.csv').read_bytes() == contents.encode()
+    log.append({'id': 'bar', 'title': 'Bar\nwith two lines'})
+    assert log.get('bar') == {'id': 'bar', 'title': 'Bar\nwith two lines'}
+    assert list(ItemLog(filename=(tmp_path / 'log.csv'), fieldnames=['id', 'title'], keyfield='id')) == [
+        {'id': 'foo', 'title': 'Foo'},
+        {'id': 'bar', 'title': 'Bar\nwith two lines'},
+    ]
+
+
+def test_item_log_complete_last_row_without_line_ending(tmp_path):
+    (tmp_path / 'log.csv').write_bytes(b'id,title\r\nfoo,Foo')
+    log = ItemLog(filename=(tmp_path / 'log.csv'), fieldnames=['id', 'title'], keyfield='id')
+    assert 'foo' in log
+    log.append({'id': 'bar', 'title': 'Bar'})
+    assert (tmp_path / 'log.csv').read_bytes() == b'id,title\r\nfoo,Foo\r\nbar,Bar\r\n'
+    assert log[1] == {'id': 'bar', 'title': 'Bar'}
+
+
+def test_item_log_iterate_without_index(datadir):
+    log = ItemLog(filename=(datadir / 'item_log.csv'), fieldnames=['id', 'title'], keyfield='id')
+    with patch.object(ItemLog, '_load_keys', side_effect=AssertionError('index was built')):
+        assert next(iter(log)) == {'id': 'foo', 'title': 'The Adventures of Foo'}
@@ -0,0 +1,99 @@
+from itertools import count
+
+import pytest
+
+from plastron.jobs.progress import ProgressAggregator
+
+
+def job(total: int = 100, state: str = 'in_progress'):
+    yield {'state': state, 'progress': 0}
+    for n in range(1, total + 1):
+        yield {'state': state, 'progress': int(n / total * 100)}
+    return {'type': 'complete'}
+
+
+def run(statuses) -> tuple[list[dict], dict]:
+    updates = []
+    while True:
+        try:
+            updates.append(next(statuses))
+        except StopIteration as e:
+            return updates, e.value
+
+
+@pytest.fixture
+def clock():
+    # advances one second every time it is read
+    ticks = count()
+    return lambda: float(next(ticks))
+
+
+def test_progress_step(clock):
+    aggregator = ProgressAggregator(interval=1000, step=10, clock=clock)
+    updates, result = run(aggregator(job()))
+    assert result == {'type': 'complete'}
+    assert [u['progress'] for u in updates] == list(range(0, 101, 10))
+
+
+def test_progress_interval(clock):
+    aggregator = ProgressAggregator(interval=30, step=None, clock=clock)
+    updates, _ = run(aggregator(job()))
+    # the last update is always flushed
+    assert [u['progress'] for u in updates] == [0, 30, 60, 90, 100]
+
+
+def test_progress_interval_zero_yields_everything(clock):
+    aggregator = ProgressAggregator(interval=0, clock=clock)
+    updates, _ = run(aggregator(job(total=20)))
+    assert len(updates) == 21
+
+
+def test_progress_state_change(clock):
+    def two_phase_job():
+        yield from job(total=10, state='validate_in_progress')
+        yield from job(total=10, state='import_in_progress')
+        return {'type': 'import_complete'}
+
+    aggregator = ProgressAggregator(interval=1000, step=None, clock=clock)
+    updates, result = run(aggregator(two_phase_job()))
+    assert result == {'type': 'import_complete'}
+    assert [(u['state'], u['progress']) for u in updates] == [
+        ('validate_in_progress', 0),
+        ('validate_in_progress', 100),
+        ('import_in_progress', 0),
+        ('import_in_progress', 100),
+    ]
+
+
+def test_progress_rate():
+    now = [0.0]
+
+    def timed_job():
+        yield {'state': 'in_progress', 'progress': 0}
+        for n in range(1, 5):
+            # each item takes two seconds
+            now[0] += 2
+            yield {'state': 'in_progress', 'progress': n * 25}
+        return {'type': 'complete'}
+
+    aggregator = ProgressAggregator(interval=1000, step=25, clock=lambda: now[0])
+    updates, _ = run(aggregator(timed_job()))
+    assert updates[0]['rate'] == {'items': 0, 'items_per_second': None, 'eta': None}
+    assert updates[1]['rate'] == {'items': 1, 'items_per_second': 0.5, 'eta': 6.0}
+    assert updates[-1]['rate'] == {'items': 4, 'items_per_second': 0.5, 'eta': 0}
+
+
+def test_progress_closes_job(clock):
+    closed = []
+
+    def closeable_job():
+        try:
+            yield from job()
+        finally:
+            closed.append(True)
+
+    aggregator = ProgressAggregator(clock=clock)
+    statuses = aggregator(closeable_job())
+    next(statuses)
+    statuses.close()
+    assert closed == [True]
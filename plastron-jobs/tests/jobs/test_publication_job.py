@@ -4,7 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from plastron.context import PlastronContext
-from plastron.handles import HandleInfo
+from plastron.handles import HandleInfo, HandleServiceClient
 from plastron.jobs.publicationjob import PublicationJob, PublicationAction
 from plastron.repo import Repository, RepositoryError
 from plastron.repo.publish import PublishableResource
@@ -74,3 +74,41 @@ def test_publication_job(action, with_errors, expected_status, expected_done, ex
     assert result['count']['total'] == 2
     assert result['count']['done'] == expected_done
     assert result['count']['errors'] == expected_errors
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_publication_job_workers(workers):
+    uris = [f'http://fcrepo-local:8080/fcrepo/rest/{n}' for n in range(250)]
+    resources = {}
+
+    def get_resource(key):
+        uri = key.start
+        mock_resource = MagicMock(spec=PublishableResource, publication_status='Published')
+        mock_resource.read.return_value = mock_resource
+        if uri.endswith('/13'):
+            mock_resource.publish.side_effect = RepositoryError(f'Unable to publish {uri}')
+        else:
+            mock_resource.publish.return_value = f'1903.1/{uri.rsplit("/", 1)[-1]}'
+        resources[uri] = mock_resource
+        return mock_resource
+
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.__getitem__.side_effect = get_resource
+    mock_handle_client = MagicMock(spec=HandleServiceClient)
+    mock_context = MagicMock(spec=PlastronContext, repo=mock_repo, handle_client=mock_handle_client)
+
+    job = PublicationJob(context=mock_context, action=PublicationAction.PUBLISH, uris=uris, workers=workers)
+    results = []
+    result = JobRunner(job, callback=lambda status: 'result' in status and results.append(status['result'])).run()
+
+    assert result['type'] == 'publish_incomplete'
+    assert result['count']['done'] == 249
+    assert result['count']['errors'] == 1
+    # results are reported in the same order as the URIs
+    assert [r.get('uri') for r in results] == [None if uri.endswith('/13') else uri for uri in uris]
+    assert results[13] == {'error': 'Unable to publish http://fcrepo-local:8080/fcrepo/rest/13'}
+    assert results[42]['handle'] == '1903.1/42'
+    # handles are looked up in batches
+    assert [c.args[0] for c in mock_handle_client.find_handles.call_args_list] == [
+        uris[0:100], uris[100:200], uris[200:250]
+    ]
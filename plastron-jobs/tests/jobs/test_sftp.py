@@ -0,0 +1,96 @@
+from io import BytesIO
+from unittest.mock import MagicMock
+from zipfile import ZipFile
+
+import pytest
+
+from plastron.jobs.sftp import SFTPUploadError, SFTPWriter
+
+
+class RemoteFile:
+    """Stand-in for an `SFTPFile` that stores its contents in `server`, and
+    drops the connection on the write numbers listed in `failures`."""
+    def __init__(self, server: dict, path: str, mode: str, failures: list[int]):
+        self.server = server
+        self.path = path
+        if mode == 'w':
+            server[path] = bytearray()
+        self.position = 0
+        self.failures = failures
+
+    def set_pipelined(self, pipelined: bool):
+        pass
+
+    def write(self, data: bytes):
+        self.server['writes'] += 1
+        if self.server['writes'] in self.failures:
+            # part of the data reaches the server before the connection drops
+            data = data[:len(data) // 2]
+            self.server[self.path][self.position:self.position + len(data)] = data
+            raise EOFError('connection lost')
+        self.server[self.path][self.position:self.position + len(data)] = data
+        self.position += len(data)
+
+    def truncate(self, size: int):
+        del self.server[self.path][size:]
+
+    def seek(self, offset: int):
+        self.position = offset
+
+    def flush(self):
+        pass
+
+    def stat(self):
+        return MagicMock(st_size=len(self.server[self.path]))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    return {'writes': 0}
+
+
+@pytest.fixture
+def get_writer(monkeypatch, server):
+    def _get_writer(failures: list[int], **kwargs) -> SFTPWriter:
+        sftp_client = MagicMock()
+        sftp_client.open.side_effect = lambda path, mode, bufsize: RemoteFile(server, path, mode, failures)
+        monkeypatch.setattr('plastron.jobs.sftp.get_ssh_client', MagicMock())
+        monkeypatch.setattr('plastron.jobs.sftp.SFTPClient.from_transport', MagicMock(return_value=sftp_client))
+        return SFTPWriter('sftp://user@example.com/exports/foo.zip', **kwargs)
+
+    return _get_writer
+
+
+def test_sftp_writer(server, get_writer):
+    with get_writer(failures=[], checkpoint_size=10) as writer:
+        for _ in range(5):
+            writer.write(b'abcdef')
+    assert server['/exports/foo.zip'] == b'abcdef' * 5
+    assert writer.checkpoint == 30
+
+
+def test_sftp_writer_resumes(server, get_writer):
+    # the connection drops during the 2nd and 5th writes
+    with get_writer(failures=[2, 5], checkpoint_size=10) as writer:
+        for n in range(5):
+            writer.write(f'chunk{n}'.encode())
+    assert server['/exports/foo.zip'] == b'chunk0chunk1chunk2chunk3chunk4'
+
+
+def test_sftp_writer_gives_up(get_writer):
+    writer = get_writer(failures=[2, 3, 4, 5], max_retries=3)
+    writer.write(b'foo')
+    with pytest.raises(SFTPUploadError):
+        writer.write(b'bar')
+
+
+def test_sftp_writer_zip_file(server, get_writer):
+    with get_writer(failures=[3], checkpoint_size=100) as writer:
+        with ZipFile(writer, mode='w') as zip_file:
+            zip_file.writestr('foo/bar.txt', b'Hello, world!' * 20)
+
+    with ZipFile(BytesIO(server['/exports/foo.zip'])) as zip_file:
+        assert zip_file.read('foo/bar.txt') == b'Hello, world!' * 20
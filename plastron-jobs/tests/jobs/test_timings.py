@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from plastron.jobs.timings import PhaseTimer, format_timings, load_timings, percentile
+
+
+def test_percentile():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 90) == 90.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 50) == 3.0
+
+
+def test_phase_timer_summary():
+    timer = PhaseTimer(slowest_items=2)
+    for n in range(1, 11):
+        timer.record('validate', n / 10, item=f'row {n}')
+    timer.record('commit', 5.0)
+
+    summary = timer.summary()
+    # the phase with the most total time is listed first
+    assert list(summary.keys()) == ['validate', 'commit']
+    validate = summary['validate']
+    assert validate['count'] == 10
+    assert validate['total'] == pytest.approx(5.5)
+    assert validate['mean'] == pytest.approx(0.55)
+    assert validate['p50'] == 0.5
+    assert validate['p90'] == 0.9
+    assert validate['max'] == 1.0
+    assert validate['slowest'] == [{'item': 'row 10', 'seconds': 1.0}, {'item': 'row 9', 'seconds': 0.9}]
+    assert summary['commit']['slowest'] == []
+
+
+def test_phase_timer_keeps_bounded_sample():
+    timer = PhaseTimer(slowest_items=2, reservoir_size=100)
+    for n in range(1, 10001):
+        timer.record('validate', n / 1000, item=f'row {n}')
+
+    assert len(timer._phases['validate'].reservoir) == 100
+    validate = timer.summary()['validate']
+    # count, total, max, and slowest items are exact; percentiles are estimated
+    assert validate['count'] == 10000
+    assert validate['total'] == pytest.approx(50005.0)
+    assert validate['max'] == 10.0
+    assert validate['slowest'] == [{'item': 'row 10000', 'seconds': 10.0}, {'item': 'row 9999', 'seconds': 9.999}]
+    assert 2.5 < validate['p50'] < 7.5
+    assert validate['p50'] <= validate['p90'] <= validate['p99'] <= validate['max']
+
+
+def test_phase_timer_records_failures():
+    timer = PhaseTimer()
+    with pytest.raises(RuntimeError):
+        with timer.time('create_resource', item='row 1'):
+            raise RuntimeError
+    assert timer.summary()['create_resource']['count'] == 1
+
+
+def test_phase_timer_threads():
+    timer = PhaseTimer()
+
+    def work(n):
+        with timer.time('download', item=n):
+            pass
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(work, range(1000)))
+    assert timer.summary()['download']['count'] == 1000
+
+
+def test_phase_timer_save(tmp_path):
+    assert load_timings(tmp_path) is None
+    timer = PhaseTimer()
+    timer.record('serialize', 0.25, item='http://example.com/1')
+    timer.save(tmp_path)
+    timings = load_timings(tmp_path)
+    assert timings == timer.summary()
+    assert format_timings(timings) == [
+        'serialize: 0.25s total over 1, mean 0.250s, p50 0.250s, p90 0.250s, p99 0.250s, max 0.250s '
+        '(http://example.com/1)'
+    ]
@@ -0,0 +1,126 @@
+from contextlib import nullcontext
+from unittest.mock import MagicMock
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.plugins.sparql import prepareUpdate
+
+from plastron.jobs.updatejob import UpdateError, UpdateJob
+from plastron.namespaces import dcterms
+from plastron.rdfmapping.descriptors import DataProperty
+from plastron.rdfmapping.resources import RDFResource
+from plastron.repo import Repository, RepositoryResource
+
+SPARQL_UPDATE = 'INSERT { ?s <http://purl.org/dc/terms/subject> "foo" } WHERE { ?s ?p ?o }'
+
+
+class Titled(RDFResource):
+    title = DataProperty(dcterms.title, required=True)
+    subject = DataProperty(dcterms.subject, required=True)
+
+
+def mock_resource(url: str) -> RepositoryResource:
+    resource = MagicMock(spec=RepositoryResource, url=url, description_url=None)
+    resource.graph = Graph()
+    resource.graph.add((URIRef(url), dcterms.title, Literal(f'Title of {url}')))
+    resource.describe.side_effect = lambda model: model(uri=URIRef(url), graph=resource.graph)
+    resource.client.patch.return_value = MagicMock(ok=True, headers={'date': 'Mon, 01 Jan 2024 12:00:00 GMT'})
+    return resource
+
+
+@pytest.fixture
+def trees() -> dict[str, list[RepositoryResource]]:
+    return {
+        f'http://localhost:8080/fcrepo/rest/{n}': [
+            mock_resource(f'http://localhost:8080/fcrepo/rest/{n}'),
+            *(mock_resource(f'http://localhost:8080/fcrepo/rest/{n}/{m}') for m in range(3)),
+        ]
+        for n in range(5)
+    }
+
+
+@pytest.fixture
+def repo(trees) -> Repository:
+    repo = MagicMock(spec=Repository)
+    repo.__getitem__.side_effect = lambda uri: MagicMock(walk=MagicMock(return_value=iter(trees[uri])))
+    repo.transaction.side_effect = lambda: nullcontext()
+    return repo
+
+
+def run_job(job: UpdateJob) -> dict:
+    run = job.run()
+    while True:
+        try:
+            next(run)
+        except StopIteration as e:
+            return e.value
+
+
+@pytest.mark.parametrize(
+    ('workers', 'resource_workers', 'batch_size', 'transactions'),
+    [
+        (1, 1, None, 5),
+        (3, 1, None, 5),
+        (1, 4, None, 5),
+        (3, 2, None, 5),
+        (1, 1, 6, 4),
+        (2, 3, 6, 4),
+    ]
+)
+def test_update_job(repo, trees, workers, resource_workers, batch_size, transactions):
+    job = UpdateJob(
+        repo=repo,
+        uris=list(trees.keys()),
+        sparql_update=SPARQL_UPDATE,
+        model_class=Titled,
+        completed=[],
+        workers=workers,
+        resource_workers=resource_workers,
+        batch_size=batch_size,
+    )
+    result = run_job(job)
+    assert result['type'] == 'update_complete'
+    # results are recorded in the same order as a sequential update
+    expected_urls = [resource.url for tree in trees.values() for resource in tree]
+    assert result['stats']['updated'] == expected_urls
+    assert [entry['uri'] for entry in job.completed] == expected_urls
+    assert repo.transaction.call_count == transactions
+    for tree in trees.values():
+        for resource in tree:
+            # the update is applied in memory for validation
+            assert (URIRef(resource.url), dcterms.subject, Literal('foo')) in resource.graph
+            resource.client.patch.assert_called_once()
+
+
+def test_update_job_batch_uses_transaction_client(repo, trees):
+    txn_client = MagicMock()
+    txn_client.patch.return_value = MagicMock(ok=True, headers={'date': 'Mon, 01 Jan 2024 12:00:00 GMT'})
+    repo.transaction.side_effect = lambda: nullcontext(txn_client)
+    job = UpdateJob(
+        repo=repo,
+        uris=list(trees.keys()),
+        sparql_update=SPARQL_UPDATE,
+        model_class=None,
+        batch_size=10,
+    )
+    run_job(job)
+    assert txn_client.patch.call_count == 20
+
+
+def test_update_job_parses_update_once(repo, trees, monkeypatch):
+    mock_prepare = MagicMock(side_effect=prepareUpdate)
+    monkeypatch.setattr('plastron.jobs.updatejob.prepareUpdate', mock_prepare)
+    job = UpdateJob(repo=repo, uris=list(trees.keys()), sparql_update=SPARQL_UPDATE, model_class=Titled)
+    run_job(job)
+    mock_prepare.assert_called_once_with(SPARQL_UPDATE)
+
+
+@pytest.mark.parametrize('model_class', [Titled, None])
+def test_update_job_invalid_sparql(repo, trees, model_class):
+    job = UpdateJob(repo=repo, uris=list(trees.keys()), sparql_update='NOT SPARQL', model_class=model_class)
+    with pytest.raises(UpdateError):
+        next(job.run())
+    # the job fails before any resource is updated
+    for tree in trees.values():
+        for resource in tree:
+            resource.client.patch.assert_not_called()
@@ -38,19 +38,14 @@ class Message:
     @classmethod
     def read(cls, filename):
         headers = {}
-        body = ''
-        in_body = False
         with open(filename, 'r') as fh:
             for line in fh:
-                if in_body:
-                    body += line
-                else:
-                    if line.rstrip() == '':
-                        in_body = True
-                        continue
-                    else:
-                        (key, value) = line.split(':', 1)
-                        headers[key] = value.strip()
+                if line.rstrip() == '':
+                    break
+                (key, value) = line.split(':', 1)
+                headers[key] = value.strip()
+            # read the rest of the file in one go, instead of line by line
+            body = fh.read()
         return cls(headers=headers, body=body)
 
     def __init__(self, message_id=None, persistent=None, headers=None, body=''):
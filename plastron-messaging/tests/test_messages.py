@@ -99,3 +99,12 @@ def test_plastron_command_message_with_args():
     assert msg.headers['PlastronArg-size'] == 38
     assert msg.headers['PlastronArg-color'] == 'blue'
     assert msg.headers['persistent'] == 'true'
+
+
+def test_plastron_command_message_read(tmp_path):
+    msg = PlastronCommandMessage(job_id='1', command='import', body='a,b\n1,2\n\n3,4\n')
+    filename = tmp_path / 'message'
+    filename.write_text(str(msg))
+    read_msg = PlastronCommandMessage.read(filename)
+    assert read_msg.headers == msg.headers
+    assert read_msg.body == 'a,b\n1,2\n\n3,4\n'
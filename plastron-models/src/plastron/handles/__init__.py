@@ -1,7 +1,10 @@
 import dataclasses
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from time import monotonic
+from typing import Any, Iterable, Optional
 
 from requests import Session
 from requests_jwtauth import HTTPBearerAuth
@@ -13,6 +16,12 @@ from plastron.validation.rules import is_handle
 
 logger = logging.getLogger(__name__)
 
+HANDLE_CACHE_TTL = 300
+"""Number of seconds that handle service lookup results are cached."""
+
+HANDLE_LOOKUP_WORKERS = 8
+"""Maximum number of concurrent requests to the handle service in a batched lookup."""
+
 
 def parse_handle_string(handle: str) -> list[str]:
     if handle.startswith('hdl:'):
@@ -55,14 +64,70 @@ class HandleInfo:
 
 
 class HandleServiceClient:
-    def __init__(self, endpoint_url: str, jwt_token: str, default_prefix: str = None, default_repo: str = None):
+    """Client for the handle service. Existing handles found by `get_info()` and
+    `find_handle()` are cached for `cache_ttl` seconds; handles created or updated
+    through this client replace their cached entries. Lookups that find no handle
+    are not cached, since another client may create the handle at any time. A
+    `cache_ttl` of 0 disables the cache."""
+    def __init__(
+            self,
+            endpoint_url: str,
+            jwt_token: str,
+            default_prefix: str = None,
+            default_repo: str = None,
+            cache_ttl: float = HANDLE_CACHE_TTL,
+            lookup_workers: int = HANDLE_LOOKUP_WORKERS,
+    ):
         self.endpoint_url = endpoint_url
         self.default_prefix = default_prefix
         self.default_repo = default_repo
+        self.cache_ttl = cache_ttl
+        self.lookup_workers = lookup_workers
         self.session = Session()
         self.session.auth = HTTPBearerAuth(jwt_token)
+        self._cache: dict[tuple, tuple[float, HandleInfo]] = {}
+        self._cache_lock = threading.Lock()
+
+    def _get_cached(self, key: tuple) -> Optional[HandleInfo]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, handle_info = entry
+            if monotonic() >= expires:
+                del self._cache[key]
+                return None
+            return handle_info
+
+    def _set_cached(self, handle_info: HandleInfo, *keys: tuple):
+        if self.cache_ttl <= 0:
+            return
+        expires = monotonic() + self.cache_ttl
+        with self._cache_lock:
+            for key in keys:
+                self._cache[key] = (expires, handle_info)
+
+    def _remember(self, handle_info: HandleInfo, *keys: tuple):
+        """If `handle_info` is an existing handle, cache it under the given `keys`,
+        and under the keys for looking it up by handle and by repository id."""
+        if not handle_info.exists:
+            return
+        if handle_info.prefix and handle_info.suffix:
+            keys += (('info', handle_info.prefix, handle_info.suffix),)
+        if handle_info.repo and handle_info.repo_id:
+            keys += (('exists', handle_info.repo, handle_info.repo_id),)
+        self._set_cached(handle_info, *keys)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
 
     def get_info(self, prefix: str, suffix: str):
+        key = ('info', prefix, suffix)
+        handle_info = self._get_cached(key)
+        if handle_info is not None:
+            return handle_info
+
         url = self.endpoint_url + '/handles/info'
         response = self.session.get(
             url=url,
@@ -74,9 +139,16 @@ class HandleServiceClient:
         if not response.ok:
             raise HandleServerError(str(response))
 
-        return HandleInfo(**parse_result(response.json()))
+        handle_info = HandleInfo(**parse_result(response.json()))
+        self._remember(handle_info, key)
+        return handle_info
 
     def find_handle(self, repo_id: str, repo: str = None) -> HandleInfo:
+        key = ('exists', repo or self.default_repo, repo_id)
+        handle_info = self._get_cached(key)
+        if handle_info is not None:
+            return handle_info
+
         url = self.endpoint_url + '/handles/exists'
         response = self.session.get(
             url=url,
@@ -88,7 +160,32 @@ class HandleServiceClient:
         if not response.ok:
             raise HandleServerError(str(response))
 
-        return HandleInfo(**parse_result(response.json()))
+        handle_info = HandleInfo(**parse_result(response.json()))
+        self._remember(handle_info, key)
+        return handle_info
+
+    def find_handles(self, repo_ids: Iterable[str], repo: str = None) -> dict[str, HandleInfo]:
+        """Look up the handles for several repository ids at once, returning a
+        dictionary of `HandleInfo` objects keyed by repository id. Ids that are
+        not already cached are looked up concurrently, using up to
+        `lookup_workers` requests at a time. Raises the first `HandleServerError`
+        encountered, after the other lookups have finished."""
+        found = {}
+        uncached = []
+        for repo_id in dict.fromkeys(repo_ids):
+            handle_info = self._get_cached(('exists', repo or self.default_repo, repo_id))
+            if handle_info is None:
+                uncached.append(repo_id)
+            else:
+                found[repo_id] = handle_info
+
+        if len(uncached) > 1 and self.lookup_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.lookup_workers, len(uncached))) as executor:
+                futures = [executor.submit(self.find_handle, repo_id, repo) for repo_id in uncached]
+            found.update((repo_id, future.result()) for repo_id, future in zip(uncached, futures))
+        else:
+            found.update((repo_id, self.find_handle(repo_id, repo)) for repo_id in uncached)
+        return found
 
     def create_handle(self, repo_id: str, url: str, prefix: str = None, repo: str = None) -> HandleInfo:
         request = {
@@ -104,7 +201,9 @@ class HandleServiceClient:
         if not response.ok:
             raise HandleServerError(str(response))
 
-        return HandleInfo(exists=True, **parse_result(response.json()))
+        handle_info = HandleInfo(exists=True, **parse_result(response.json()))
+        self._remember(handle_info, ('exists', request['repo'], repo_id))
+        return handle_info
 
     def update_handle(self, handle_info: HandleInfo, **fields) -> HandleInfo:
         updated_handle_info = dataclasses.replace(handle_info, **fields)
@@ -115,6 +214,10 @@ class HandleServiceClient:
         if not response.ok:
             raise HandleServerError(str(response))
 
+        with self._cache_lock:
+            # the handle is no longer registered under its old repository id
+            self._cache.pop(('exists', handle_info.repo, handle_info.repo_id), None)
+        self._remember(updated_handle_info)
         return updated_handle_info
 
 
@@ -121,3 +121,82 @@ def test_update_handle_error(handle, handle_client):
     )
     with pytest.raises(HandleServerError):
         handle_client.update_handle(handle_info=handle, url='http://example.com/new-url')
+
+
+def exists_response(request, uri, response_headers):
+    repo_id = request.querystring['repo_id'][0]
+    if repo_id.endswith('/new'):
+        return [200, response_headers, json.dumps({'exists': False})]
+    body = {
+        'exists': True,
+        'prefix': '1903.1',
+        'suffix': repo_id.rsplit('/', 1)[-1],
+        'repo': 'fcrepo',
+        'repo_id': repo_id,
+    }
+    return [200, response_headers, json.dumps(body)]
+
+
+@httpretty.activate
+def test_find_handle_is_cached(handle_client):
+    httpretty.register_uri(httpretty.GET, uri='http://handle-local:3000/handles/exists', body=exists_response)
+    handle = handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo')
+    assert handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo') == handle
+    # an existing handle found by repository id is also cached by handle
+    assert handle_client.get_info('1903.1', '123') == handle
+    assert len(httpretty.latest_requests()) == 1
+
+    handle_client.clear_cache()
+    handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo')
+    assert len(httpretty.latest_requests()) == 2
+
+
+@httpretty.activate
+def test_find_handle_missing_is_not_cached(handle_client):
+    httpretty.register_uri(httpretty.GET, uri='http://handle-local:3000/handles/exists', body=exists_response)
+    assert not handle_client.find_handle('http://localhost/fcrepo/new', repo='fcrepo').exists
+    assert not handle_client.find_handle('http://localhost/fcrepo/new', repo='fcrepo').exists
+    assert len(httpretty.latest_requests()) == 2
+
+
+@httpretty.activate
+def test_find_handle_cache_disabled():
+    handle_client = HandleServiceClient('http://handle-local:3000', jwt_token='TOKEN', cache_ttl=0)
+    httpretty.register_uri(httpretty.GET, uri='http://handle-local:3000/handles/exists', body=exists_response)
+    handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo')
+    handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo')
+    assert len(httpretty.latest_requests()) == 2
+
+
+@httpretty.activate
+def test_find_handles(handle_client):
+    httpretty.register_uri(httpretty.GET, uri='http://handle-local:3000/handles/exists', body=exists_response)
+    handle_client.find_handle('http://localhost/fcrepo/1', repo='fcrepo')
+    repo_ids = [f'http://localhost/fcrepo/{n}' for n in range(1, 11)] + ['http://localhost/fcrepo/new']
+    handles = handle_client.find_handles(repo_ids, repo='fcrepo')
+    assert set(handles.keys()) == set(repo_ids)
+    assert str(handles['http://localhost/fcrepo/7']) == '1903.1/7'
+    assert not handles['http://localhost/fcrepo/new'].exists
+    # the already cached handle is not looked up again
+    assert len(httpretty.latest_requests()) == 11
+
+
+@httpretty.activate
+def test_find_handles_error(handle_client):
+    httpretty.register_uri(
+        httpretty.GET,
+        uri='http://handle-local:3000/handles/exists',
+        status=HTTPStatus.BAD_REQUEST,
+    )
+    with pytest.raises(HandleServerError):
+        handle_client.find_handles(['http://localhost/fcrepo/1', 'http://localhost/fcrepo/2'])
+
+
+@httpretty.activate
+def test_update_handle_replaces_cached_handle(handle_client):
+    httpretty.register_uri(httpretty.GET, uri='http://handle-local:3000/handles/exists', body=exists_response)
+    httpretty.register_uri(httpretty.PATCH, uri='http://handle-local:3000/handles/1903.1/123', body='{}')
+    handle = handle_client.find_handle('http://localhost/fcrepo/123', repo='fcrepo')
+    handle_client.update_handle(handle, url='http://example.com/new-url')
+    assert handle_client.get_info('1903.1', '123').url == 'http://example.com/new-url'
+    assert [r.method for r in httpretty.latest_requests()].count('GET') == 1
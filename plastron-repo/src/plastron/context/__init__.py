@@ -13,8 +13,8 @@ import pysolr
 
 from plastron.client import Endpoint, Client
 from plastron.client.auth import get_authenticator
-from plastron.client.proxied import ProxiedClient
-from plastron.handles import HandleServiceClient
+from plastron.client.proxied import ORIGIN_RETRY_INTERVAL, ProxiedClient
+from plastron.handles import HANDLE_CACHE_TTL, HandleServiceClient
 from plastron.messaging.broker import Broker, ServerTuple, HeartbeatTuple
 from plastron.models.fedora import FedoraResource
 from plastron.repo import Repository, RepositoryResource, RepositoryError
@@ -59,6 +59,8 @@ class PlastronContext:
                 return ProxiedClient(
                     endpoint=self.endpoint,
                     origin_endpoint=Endpoint(url=repo_config['ORIGIN']),
+                    read_endpoints=[Endpoint(url=url) for url in repo_config.get('READ_ORIGINS') or []],
+                    retry_interval=float(repo_config.get('ORIGIN_RETRY_INTERVAL', ORIGIN_RETRY_INTERVAL)),
                     auth=authenticator,
                     ua_string=f'plastron/{self.version}',
                     on_behalf_of=delegated_user,
@@ -85,6 +87,13 @@ class PlastronContext:
             args = Namespace(delegated_user=delegated_user, ua_string=ua_string)
         yield dataclasses.replace(self, args=args)
 
+    def clone(self) -> 'PlastronContext':
+        """Returns a new context with the same configuration and arguments, but with
+        its own client, repository, and other connections. Worker threads do not need
+        this to run their own transactions, since transactions are bound to the thread
+        that started them (see `Repository.transaction()`)."""
+        return dataclasses.replace(self)
+
     @cached_property
     def broker(self) -> Broker:
         broker_config = self.config.get('MESSAGE_BROKER', {})
@@ -121,6 +130,7 @@ class PlastronContext:
                 jwt_token=config['HANDLE_JWT_TOKEN'],
                 default_prefix=config['HANDLE_PREFIX'],
                 default_repo=config['HANDLE_REPO'],
+                cache_ttl=float(config.get('HANDLE_CACHE_TTL', HANDLE_CACHE_TTL)),
             )
         except KeyError as e:
             raise RuntimeError(f"Missing configuration key {e} in section 'PUBLICATION_WORKFLOW'")
@@ -1,22 +1,33 @@
 import hashlib
 import io
 import logging
+import os
+import posixpath
 import re
+import stat
+import threading
 import urllib
 import zipfile
-from contextlib import contextmanager
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
 from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
 from io import BytesIO
 from mimetypes import guess_type
 from os.path import basename, isfile, splitext
-from typing import Mapping, Any, Protocol
+from shutil import copyfileobj
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from typing import Iterator, Mapping, Any, Optional, Protocol, Sequence
 from urllib.parse import urlsplit
 
 from paramiko import SFTPClient, SSHClient, AutoAddPolicy, SSHException
 from paramiko.config import SSH_PORT
 from rdflib import URIRef
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
 
 from plastron.client import ClientError
 from plastron.models.pcdm import PCDMFile
@@ -25,6 +36,15 @@ from plastron.repo import RepositoryResource, RepositoryError
 
 logger = logging.getLogger(__name__)
 
+SPOOL_CHUNK_SIZE = 1024 * 1024
+"""Size of the blocks (in bytes) to use when streaming remote files or copying them to a local spool file."""
+
+HTTP_POOL_SIZE = 16
+"""Maximum number of connections kept open per host by the shared HTTP session."""
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
 USAGE_TAGS: dict[str, set[URIRef]] = {
     'preservation': {pcdmuse.PreservationMasterFile},
     'ocr': {pcdmuse.ExtractedText},
@@ -78,6 +98,18 @@ class BinaryResource(RepositoryResource):
 
         yield BytesIO(response.content)
 
+    def iter_content(self, chunk_size: int = SPOOL_CHUNK_SIZE) -> Iterator[bytes]:
+        """Request the resource, and iterate over its content in chunks of (at most)
+        `chunk_size` bytes, without reading the whole response into memory. The
+        response is closed when the iteration finishes or is abandoned."""
+        response = self.client.get(self.url, stream=True)
+        try:
+            if not response.ok:
+                raise RepositoryError(response)
+            yield from response.iter_content(chunk_size)
+        finally:
+            response.close()
+
     def update_binary(self, source: 'BinarySource', mime_type: str = None):
         try:
             headers = {
@@ -145,11 +177,23 @@ class BinarySourceNotFoundError(BinarySourceError):
     pass
 
 
+@dataclass
+class BinarySourceInfo:
+    """Result of probing a binary source for its existence and basic metadata.
+    The `size` (in bytes) and `mtime` (as a POSIX timestamp) are `None` when the
+    source does not exist, or when the source type cannot report them."""
+    exists: bool
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+
+
 class BinarySource:
     """
     Base class for reading binary content from arbitrary locations.
     """
     filename: str
+    info: Optional[BinarySourceInfo] = None
+    """Result of the most recent `probe()` of this source, if any."""
 
     def __enter__(self):
         return self.open()
@@ -176,6 +220,26 @@ class BinarySource:
         """Returns `True` if this source exists, otherwise returns `False`."""
         raise NotImplementedError()
 
+    def probe(self) -> BinarySourceInfo:
+        """Check whether this source exists, and gather its size and modification
+        time if the source type is able to report them. The result is also stored
+        as the `info` attribute. The default implementation only calls `exists()`."""
+        self.info = BinarySourceInfo(exists=self.exists())
+        return self.info
+
+    @property
+    def batch_key(self) -> Optional[tuple]:
+        """Key identifying the group of sources that can be probed together with
+        a single `probe_batch()` call. Sources that cannot be batched return `None`."""
+        return None
+
+    @classmethod
+    def probe_batch(cls, sources: Sequence['BinarySource']) -> list[BinarySourceInfo]:
+        """Probe a sequence of sources that all share the same `batch_key`. Returns
+        a list of `BinarySourceInfo` objects in the same order as `sources`. The
+        default implementation probes each source individually."""
+        return [source.probe() for source in sources]
+
     def digest(self) -> str:
         """Generates the SHA-1 checksum. Returns a hex-encoded SHA-1 digest,
         prepended with the string "sha1="."""
@@ -232,6 +296,11 @@ class StringSource(BinarySource):
         """Always returns `True`."""
         return True
 
+    def probe(self) -> BinarySourceInfo:
+        """Always exists; the size is the length of the encoded `content` string."""
+        self.info = BinarySourceInfo(exists=True, size=len(self._content.encode()))
+        return self.info
+
 
 class LocalFileSource(BinarySource):
     """
@@ -247,7 +316,7 @@ class LocalFileSource(BinarySource):
         self._file = None
 
     def __str__(self):
-        return self.localpath
+        return str(self.localpath)
 
     def open(self):
         """Opens `localpath` with mode `rb` and returns the handle. If `localpath`
@@ -271,19 +340,64 @@ class LocalFileSource(BinarySource):
         """Returns true if `localpath` exists and is a file."""
         return isfile(self.localpath)
 
+    def probe(self) -> BinarySourceInfo:
+        """Uses a single `stat()` call to get the existence, size, and mtime of `localpath`."""
+        try:
+            st = os.stat(self.localpath)
+        except OSError:
+            self.info = BinarySourceInfo(exists=False)
+        else:
+            if stat.S_ISREG(st.st_mode):
+                self.info = BinarySourceInfo(exists=True, size=st.st_size, mtime=st.st_mtime)
+            else:
+                self.info = BinarySourceInfo(exists=False)
+        return self.info
+
+
+def get_http_session() -> Session:
+    """Returns the `requests.Session` shared by all `HTTPFileSource` objects. It is
+    created on first use, with a connection pool large enough for concurrent
+    workers, so that requests to the same host reuse their connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            _http_session.mount('http://', adapter)
+            _http_session.mount('https://', adapter)
+        return _http_session
+
 
 class HTTPFileSource(BinarySource):
     """A binary retrievable over HTTP at the given URI. Any additional keyword arguments
-    are stored and added to all `requests.request()` calls."""
-    def __init__(self, uri, **kwargs):
+    are stored and added to all `requests.request()` calls.
+
+    If `spool` is `True`, the resource is only fetched once: the first call to `open()`
+    or `digest()` downloads it into a local temporary file while computing its SHA-1
+    digest, and subsequent calls use that file until `close()` is called."""
+    def __init__(
+            self,
+            uri,
+            chunk_size: int = SPOOL_CHUNK_SIZE,
+            spool: bool = False,
+            session: DoesHTTPRequest = None,
+            **kwargs,
+    ):
         self.uri = uri
         """URI of the remote resource."""
+        self.chunk_size = chunk_size
+        """Default number of bytes to read at a time when streaming the resource."""
+        self.spool = spool
+        """Whether to download the resource once into a local temporary file."""
         self.kwargs = kwargs
         """Additional keyword arguments that are added to all `requests.request()` calls."""
         self.filename = basename(self.uri)
         """Filename-only portion of `uri`."""
         self._mimetype = None
-        self._client = Session()
+        self._head_response = None
+        self._spool_file = None
+        self._digest = None
+        self._client = session or get_http_session()
 
     def __str__(self):
         return str(self.uri)
@@ -293,16 +407,21 @@ class HTTPFileSource(BinarySource):
         return the response."""
         return self._client.request(method, self.uri, **self.kwargs, stream=stream)
 
+    def head(self) -> Response:
+        """Returns the response to a `HEAD` request to `uri`. The response is cached,
+        so `exists()`, `mimetype()`, and `probe()` together send at most one request."""
+        if self._head_response is None:
+            self._head_response = self.request('HEAD')
+        return self._head_response
+
     def mimetype(self) -> str:
         """Returns the `Content-Type` header for a `HEAD` request to `uri`."""
         if self._mimetype is None:
-            response = self.request('HEAD')
-            self._mimetype = response.headers['Content-Type']
+            self._mimetype = self.head().headers['Content-Type']
         return self._mimetype
 
-    def open(self, chunk_size: int = 512):
-        """Returns an iterator over the source's data, with the given
-        `chunk_size` (defaults to `512`).
+    def get(self) -> Response:
+        """Send a streaming `GET` request to `uri`.
 
         If the response to the request is `404 Not Found`, raises a
         `BinarySourceNotFoundError`. If the response status is any other
@@ -313,22 +432,83 @@ class HTTPFileSource(BinarySource):
                 raise BinarySourceNotFoundError(f'{response.status_code} {response.reason}: {self.uri}')
             else:
                 raise BinarySourceError(response)
-        return response.iter_content(chunk_size)
+        return response
+
+    def fetch(self):
+        """Download the resource into a local temporary file, computing its SHA-1
+        digest along the way. Does nothing if the resource is already spooled."""
+        if self._spool_file is not None and not self._spool_file.closed:
+            return
+        sha1 = hashlib.sha1()
+        spool = SpooledTemporaryFile(max_size=self.chunk_size, prefix='plastron-')
+        try:
+            with closing(self.get()) as response:
+                for chunk in response.iter_content(self.chunk_size):
+                    sha1.update(chunk)
+                    spool.write(chunk)
+        except (BinarySourceError, IOError):
+            spool.close()
+            raise
+        self._spool_file = spool
+        self._digest = 'sha1=' + sha1.hexdigest()
+
+    def open(self, chunk_size: int = None):
+        """If `spool` is `True`, returns a file-like object over the spooled copy of
+        the resource. Otherwise, returns an iterator over the source's data, with the
+        given `chunk_size` (defaults to the `chunk_size` of this source).
+
+        If the response to the request is `404 Not Found`, raises a
+        `BinarySourceNotFoundError`. If the response status is any other
+        error status (>= 400), raises a `BinarySourceError`."""
+        if self.spool:
+            self.fetch()
+            self._spool_file.seek(0)
+            return self._spool_file
+        return self.get().iter_content(chunk_size or self.chunk_size)
 
     def close(self):
-        """This method does nothing (there is no special cleanup for HTTP requests)."""
-        pass
+        """Discards the spooled copy of the resource, if there is one."""
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+            self._digest = None
+
+    def digest(self) -> str:
+        """Generates the SHA-1 checksum. When spooling, the digest computed while
+        downloading is reused, and the resource is not requested again."""
+        if self.spool:
+            self.fetch()
+            return self._digest
+        sha1 = hashlib.sha1()
+        for block in self.open():
+            sha1.update(block)
+        return 'sha1=' + sha1.hexdigest()
 
     def exists(self) -> bool:
         """Returns `True` if a `HEAD` request to `uri` is successful."""
-        return self.request('HEAD').ok
+        return self.head().ok
+
+    def probe(self) -> BinarySourceInfo:
+        """Uses a single `HEAD` request to `uri`, and takes the size and mtime from
+        the `Content-Length` and `Last-Modified` headers of the response, if present."""
+        response = self.head()
+        if not response.ok:
+            self.info = BinarySourceInfo(exists=False)
+            return self.info
+        size = response.headers.get('Content-Length')
+        last_modified = response.headers.get('Last-Modified')
+        self.info = BinarySourceInfo(
+            exists=True,
+            size=int(size) if size is not None else None,
+            mtime=parsedate_to_datetime(last_modified).timestamp() if last_modified is not None else None,
+        )
+        return self.info
 
 
 class RepositoryFileSource(HTTPFileSource):
     """A binary stored in a repository."""
     def __init__(self, uri: str, client: DoesHTTPRequest, **kwargs):
-        super().__init__(uri, **kwargs)
-        self._client = client
+        super().__init__(uri, session=client, **kwargs)
 
 
 class RemoteFileSource(BinarySource):
@@ -404,24 +584,184 @@ class RemoteFileSource(BinarySource):
         (_, stdout, _) = self.ssh().exec_command(f'test -f "{self.sftp_uri.path}"')
         return stdout.channel.recv_exit_status() == 0
 
+    @property
+    def batch_key(self) -> Optional[tuple]:
+        """Sources on the same host, accessed by the same user, and in the same remote
+        directory are probed together."""
+        return (
+            type(self),
+            self.sftp_uri.hostname,
+            self.sftp_uri.username,
+            self.sftp_uri.port,
+            posixpath.dirname(self.sftp_uri.path),
+        )
+
+    @classmethod
+    def probe_batch(cls, sources: Sequence['RemoteFileSource']) -> list[BinarySourceInfo]:
+        """Lists the shared remote directory once, using a single SFTP `listdir_attr`
+        call over the connection of the first source, instead of making an SSH round
+        trip for every source."""
+        connection = sources[0]
+        directory = posixpath.dirname(connection.sftp_uri.path)
+        try:
+            entries = {attr.filename: attr for attr in connection.sftp().listdir_attr(directory)}
+        except IOError as e:
+            logger.warning(f'Unable to list remote directory {directory}: {e}')
+            entries = {}
+        finally:
+            connection.close()
+
+        results = []
+        for source in sources:
+            attr = entries.get(posixpath.basename(source.sftp_uri.path))
+            if attr is not None and stat.S_ISREG(attr.st_mode or 0):
+                source.info = BinarySourceInfo(exists=True, size=attr.st_size, mtime=attr.st_mtime)
+            else:
+                source.info = BinarySourceInfo(exists=False)
+            results.append(source.info)
+        return results
+
+
+def get_archive_source(location: str, ssh_options: Mapping[str, Any] = None) -> BinarySource:
+    """Return a `BinarySource` for a whole archive file at `location`, which may be
+    an SFTP URI, an HTTP(S) URI, or a local file path."""
+    if location.startswith('sftp:'):
+        return RemoteFileSource(location, 'application/zip', ssh_options)
+    elif location.startswith('http:') or location.startswith('https:'):
+        return HTTPFileSource(location)
+    else:
+        return LocalFileSource(location, 'application/zip')
+
+
+class ZipFileRegistry:
+    """Holds a single open `zipfile.ZipFile`, with its parsed central directory,
+    for each archive location used during a job. Remote archives (SFTP or HTTP)
+    are downloaded once to a local spool file, instead of once per member.
+
+    An archive is opened (and spooled) outside the registry lock, so a slow
+    download only blocks the threads that are waiting for that same archive.
+    Member reads from the shared `ZipFile` objects are safe to do from multiple
+    threads, since each call to `ZipFile.open()` gets its own file position.
+
+    Use `close()` (or use the registry as a context manager) to close the archives
+    and remove any spool files."""
+    def __init__(self, spool_dir: str = None):
+        self.spool_dir = spool_dir
+        """Directory to create spool files in; defaults to the system temp directory."""
+        self._zip_files: dict[str, Future] = {}
+        self._spools = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, location: str) -> bool:
+        return str(location) in self._zip_files
+
+    def __len__(self) -> int:
+        return len(self._zip_files)
+
+    def get(self, location: str, ssh_options: Mapping[str, Any] = None) -> zipfile.ZipFile:
+        """Return the `ZipFile` for `location`, opening it (and spooling it to local
+        disk if it is remote) the first time it is requested. Other threads that
+        request the same location in the meantime wait for it to be opened.
+
+        Raises a `BinarySourceNotFoundError` if the archive cannot be found, or a
+        `BinarySourceError` if it is not a valid ZIP file. A location that could not
+        be opened is tried again the next time it is requested."""
+        location = str(location)
+        with self._lock:
+            future = self._zip_files.get(location)
+            opening = future is None
+            if opening:
+                future = self._zip_files[location] = Future()
+        if opening:
+            try:
+                future.set_result(self._open(location, ssh_options))
+            except BaseException as e:
+                with self._lock:
+                    self._zip_files.pop(location, None)
+                future.set_exception(e)
+        return future.result()
+
+    def _open(self, location: str, ssh_options: Mapping[str, Any] = None) -> zipfile.ZipFile:
+        source = get_archive_source(location, ssh_options)
+        if isinstance(source, LocalFileSource):
+            try:
+                return open_zip_file(source.localpath, location)
+            except FileNotFoundError as e:
+                raise BinarySourceNotFoundError(f'Zip file {location} not found') from e
+
+        logger.info(f'Spooling zip file {location} to local disk')
+        spool = NamedTemporaryFile(prefix='plastron-', suffix='.zip', dir=self.spool_dir)
+        try:
+            try:
+                if isinstance(source, HTTPFileSource):
+                    for chunk in source.open(chunk_size=SPOOL_CHUNK_SIZE):
+                        spool.write(chunk)
+                else:
+                    with source as stream:
+                        # request all the blocks of the remote file ahead of time
+                        stream.prefetch()
+                        copyfileobj(stream, spool, length=SPOOL_CHUNK_SIZE)
+                spool.flush()
+            except (BinarySourceError, IOError) as e:
+                raise BinarySourceNotFoundError(f'Zip file {location} not found: {e}') from e
+            zip_file = open_zip_file(spool.name, location)
+        except BaseException:
+            # remove the spool file of an archive that could not be opened
+            spool.close()
+            raise
+        logger.debug(f'Spooled zip file {location} to {spool.name}')
+        with self._lock:
+            self._spools.append(spool)
+        return zip_file
+
+    def close(self):
+        """Close all the `ZipFile` objects, and remove the spool files."""
+        with self._lock:
+            for future in self._zip_files.values():
+                if future.done() and future.exception() is None:
+                    future.result().close()
+            self._zip_files.clear()
+            for spool in self._spools:
+                spool.close()
+            self._spools.clear()
+
+
+def open_zip_file(filename: str | os.PathLike, location: str) -> zipfile.ZipFile:
+    """Open the ZIP file `filename` (the local copy of the archive at `location`),
+    raising a `BinarySourceError` if it is not a valid ZIP file."""
+    try:
+        return zipfile.ZipFile(filename)
+    except zipfile.BadZipFile as e:
+        raise BinarySourceError(f'Zip file {location} is not a valid zip file: {e}') from e
+
 
 class ZipFileSource(BinarySource):
     """
     A binary contained in a ZIP file.
     """
-    def __init__(self, zip_file, path, mimetype=None, ssh_options=None):
+    def __init__(self, zip_file, path, mimetype=None, ssh_options=None, registry: ZipFileRegistry = None):
         """
         :param zip_file: ZIP file. This may be a zipfile.ZipFile object,
-            a string filename, an SFTP URI, or a readable file-like object.
+            a string filename, an SFTP URI, an HTTP(S) URI, or a readable file-like object.
         :param path: Path to a single binary stored within the ZIP file.
         :param mimetype: MIME type of the single binary. If not given,
             will attempt to guess based on the path given.
         :param ssh_options: additional options to pass as keyword arguments to SSHClient.connect
             (used when the zip_file is an SFTP URI)
+        :param registry: shared registry of open ZIP files; if given, the ZIP file is
+            opened (and, if remote, downloaded) at most once for all the sources using
+            this registry
         """
         self.ssh_options = ssh_options or {}
         self.zip_filename = None
         self.source = None
+        self.registry = registry
 
         self.path = path
         self.filename = basename(path)
@@ -439,11 +779,19 @@ class ZipFileSource(BinarySource):
             # the filesystem, network, etc., until asked to read
             # from the zip file
             self.zip_file = None
-            if isinstance(zip_file, str) and zip_file.startswith('sftp:'):
+            if self.registry is not None and isinstance(zip_file, (str, os.PathLike)):
+                # the registry handles opening (and spooling) the ZIP file
+                self.zip_filename = str(zip_file)
+            elif isinstance(zip_file, str) and zip_file.startswith('sftp:'):
                 self.source = RemoteFileSource(zip_file, self._mimetype, self.ssh_options)
+            elif isinstance(zip_file, str) and (zip_file.startswith('http:') or zip_file.startswith('https:')):
+                self.source = HTTPFileSource(zip_file)
             else:
                 self.source = LocalFileSource(zip_file, self._mimetype, self.filename)
 
+    def __str__(self):
+        return f'{self.zip_filename or self.source}!{self.path}'
+
     def close(self):
         if self.file is not None:
             self.file.close()
@@ -455,6 +803,10 @@ class ZipFileSource(BinarySource):
     def get_zip_file(self):
         if self.zip_file is not None:
             return self.zip_file
+        if self.registry is not None and self.source is None:
+            # shared ZipFile; closing this source does not close the ZipFile
+            self.zip_file = self.registry.get(self.zip_filename, self.ssh_options)
+            return self.zip_file
         if self.source is not None:
             try:
                 self.zip_file = zipfile.ZipFile(self.source.open())
@@ -468,7 +820,9 @@ class ZipFileSource(BinarySource):
             self.file = self.get_zip_file().open(self.path, 'r')
             return self.file
         except KeyError as e:
-            raise BinarySourceNotFoundError(f"'{self.path}' not found in file '{self.source}'") from e
+            raise BinarySourceNotFoundError(
+                f"'{self.path}' not found in file '{self.zip_filename or self.source}'"
+            ) from e
 
     def mimetype(self):
         return self._mimetype
@@ -485,6 +839,62 @@ class ZipFileSource(BinarySource):
         except KeyError:
             return False
 
+    @property
+    def batch_key(self) -> Optional[tuple]:
+        """Members of the same ZIP file are probed together."""
+        return type(self), str(self.zip_filename or self.source)
+
+    @classmethod
+    def probe_batch(cls, sources: Sequence['ZipFileSource']) -> list[BinarySourceInfo]:
+        """Reads the central directory of the shared ZIP file once, and looks up
+        the size and modification time of each member in it."""
+        zip_source = sources[0]
+        try:
+            if zip_source.source:
+                with zip_source.source:
+                    members = {info.filename: info for info in zip_source.get_zip_file().infolist()}
+            else:
+                members = {info.filename: info for info in zip_source.get_zip_file().infolist()}
+        except (BinarySourceNotFoundError, zipfile.BadZipFile) as e:
+            logger.warning(f'Unable to read ZIP file {zip_source.zip_filename or zip_source.source}: {e}')
+            members = {}
+
+        results = []
+        for source in sources:
+            member = members.get(source.path)
+            if member is not None and not member.is_dir():
+                source.info = BinarySourceInfo(
+                    exists=True,
+                    size=member.file_size,
+                    mtime=datetime(*member.date_time).timestamp(),
+                )
+            else:
+                source.info = BinarySourceInfo(exists=False)
+            results.append(source.info)
+        return results
+
+
+def probe_sources(sources: Sequence[BinarySource]) -> list[BinarySourceInfo]:
+    """Probe many binary sources at once. Sources that share a `batch_key` are
+    probed with one `probe_batch()` call for their class (e.g., one directory
+    listing per remote directory, or one read of a ZIP file's central directory).
+    Returns a list of `BinarySourceInfo` objects in the same order as `sources`."""
+    results: list[Optional[BinarySourceInfo]] = [None] * len(sources)
+    batches = defaultdict(list)
+    for index, source in enumerate(sources):
+        key = source.batch_key
+        if key is None:
+            results[index] = source.probe()
+        else:
+            batches[key].append(index)
+
+    for indexes in batches.values():
+        batch = [sources[i] for i in indexes]
+        for index, info in zip(indexes, type(batch[0]).probe_batch(batch)):
+            results[index] = info
+
+    return results
+
 
 @dataclass
 class FileSpec:
@@ -541,3 +951,11 @@ class FileGroup:
             if file.name == name:
                 return file
         raise RuntimeError(f'{name} is not in file group {self}')
+
+    def probe(self) -> dict[str, BinarySourceInfo]:
+        """Probe the sources of all files in this group together using `probe_sources()`.
+        Returns a dictionary mapping file names to `BinarySourceInfo` objects. Files that
+        do not have a `BinarySource` set are omitted."""
+        files = [file for file in self.files if isinstance(file.source, BinarySource)]
+        infos = probe_sources([file.source for file in files])
+        return {file.name: info for file, info in zip(files, infos)}
@@ -1,7 +1,9 @@
 import logging
 from contextlib import contextmanager
+from contextvars import ContextVar
 from http import HTTPStatus
-from typing import Optional, Type, TypeVar, Iterator, Union
+from types import MappingProxyType
+from typing import Mapping, Optional, Type, TypeVar, Iterator, Union
 from uuid import uuid4
 
 import yaml
@@ -13,7 +15,7 @@ from urlobject import URLObject
 
 from plastron.client import Client, Endpoint, ClientError
 from plastron.client.auth import get_authenticator
-from plastron.client.transactions import transaction
+from plastron.client.transactions import TransactionClient, transaction
 from plastron.rdfmapping.graph import TrackChangesGraph
 from plastron.rdfmapping.resources import RDFResourceBase, RDFResourceType
 
@@ -31,6 +33,14 @@ def is_http_uri(uri: str) -> bool:
 
 ResourceType = TypeVar('ResourceType', bound='RepositoryResource')
 
+# the transactions in progress in the current thread (or asyncio task), keyed by
+# repository; a new mapping is set each time a transaction starts, so that the
+# mapping seen by other threads and tasks is never changed
+_transaction_clients: ContextVar[Mapping['Repository', TransactionClient]] = ContextVar(
+    'plastron.repo.transaction_clients',
+    default=MappingProxyType({}),
+)
+
 
 class Repository:
     @classmethod
@@ -56,10 +66,17 @@ class Repository:
     def __init__(self, client: Client):
         self._client = client
         self.endpoint = client.endpoint
-        self._txn_client = None
+
+    @property
+    def _txn_client(self) -> Optional[TransactionClient]:
+        # the transaction in progress is bound to the current thread (or asyncio
+        # task), so that many transactions can run through this one repository
+        return _transaction_clients.get().get(self)
 
     @property
     def client(self):
+        """The client for the transaction in progress in the current thread or task,
+        if there is one; otherwise, the client for this repository."""
         return self._txn_client or self._client
 
     def get_resource(self, path: str, resource_class: Type[ResourceType] = None) -> ResourceType:
@@ -115,17 +132,31 @@ class Repository:
             raise TypeError(f'Cannot use a key of type "{type(item).__name__}" here')
         return self.get_resource(path, resource_class=resource_class)
 
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the current thread or task has a transaction in progress."""
+        return self._txn_client is not None
+
     @contextmanager
     def transaction(self, keep_alive: int = 90):
-        try:
-            with transaction(self.client, keep_alive) as txn_client:
-                self._txn_client = txn_client
-                yield self._txn_client
-        finally:
-            # always clear the transaction client; otherwise the client
-            # will raise an exception the next time it tries to create
-            # a transaction
-            self._txn_client = None
+        """Start a transaction, and use it for all requests made through this
+        repository by the current thread (or asyncio task) until the context exits.
+        Other threads and tasks are not affected, and may run their own transactions
+        through this repository at the same time. If the current thread or task
+        already has a transaction in progress, join it instead; it is committed (or
+        rolled back) by the outermost context."""
+        if self.in_transaction:
+            yield self._txn_client
+            return
+        with transaction(self._client, keep_alive) as txn_client:
+            token = _transaction_clients.set(MappingProxyType({**_transaction_clients.get(), self: txn_client}))
+            try:
+                yield txn_client
+            finally:
+                # always unbind the transaction client; otherwise the client
+                # will raise an exception the next time it tries to create
+                # a transaction
+                _transaction_clients.reset(token)
 
     def create(self, resource_class: Type[ResourceType] = None, **kwargs) -> ResourceType:
         resource_uri = self.client.create(**kwargs)
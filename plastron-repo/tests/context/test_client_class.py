@@ -27,3 +27,21 @@ def test_client_class(repo_config, expected_class):
     config = {'REPOSITORY': repo_config}
     context = PlastronContext(config)
     assert isinstance(context.client, expected_class)
+
+
+def test_client_read_origins():
+    config = {
+        'REPOSITORY': {
+            'REST_ENDPOINT': 'https://fcrepo.lib.umd.edu/fcrepo/rest',
+            'ORIGIN': 'http://fcrepo-webapp-0:8080/fcrepo/rest',
+            'READ_ORIGINS': ['http://fcrepo-webapp-1:8080/fcrepo/rest', 'http://fcrepo-webapp-2:8080/fcrepo/rest'],
+            'ORIGIN_RETRY_INTERVAL': 10,
+        }
+    }
+    client = PlastronContext(config).client
+    assert [str(origin) for origin in client.read_origins] == [
+        'http://fcrepo-webapp-0:8080/fcrepo/rest',
+        'http://fcrepo-webapp-1:8080/fcrepo/rest',
+        'http://fcrepo-webapp-2:8080/fcrepo/rest',
+    ]
+    assert client.retry_interval == 10
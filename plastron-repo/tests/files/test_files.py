@@ -1,6 +1,8 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, PropertyMock, patch
 from tempfile import TemporaryFile
 from uuid import uuid4
 from zipfile import ZipFile
@@ -8,7 +10,22 @@ from zipfile import ZipFile
 import httpretty
 import pytest
 
-from plastron.files import HTTPFileSource, LocalFileSource, RemoteFileSource, ZipFileSource, StringSource
+from paramiko import SFTPAttributes
+
+from plastron.files import (
+    BinaryResource,
+    BinarySourceError,
+    BinarySourceNotFoundError,
+    FileGroup,
+    FileSpec,
+    HTTPFileSource,
+    LocalFileSource,
+    RemoteFileSource,
+    StringSource,
+    ZipFileRegistry,
+    ZipFileSource,
+    probe_sources,
+)
 from plastron.namespaces import pcdmuse
 
 
@@ -121,3 +138,228 @@ def test_zip_file_source_exists_closes_remote_file_source_when_file_does_not_exi
 )
 def test_rdf_types(source, expected_rdf_types):
     assert source.rdf_types == expected_rdf_types
+
+
+def test_local_file_source_probe(tmp_path):
+    local_file = tmp_path / 'foo.txt'
+    local_file.write_text('foo')
+    info = LocalFileSource(str(local_file)).probe()
+    assert info.exists
+    assert info.size == 3
+    assert info.mtime == local_file.stat().st_mtime
+
+
+def test_zip_file_sources_probe_batch(datadir):
+    sources = [
+        ZipFileSource(datadir / 'sample.zip', 'sample_image.jpg'),
+        ZipFileSource(datadir / 'sample.zip', 'does_not_exist.jpg'),
+    ]
+    with patch('zipfile.ZipFile', wraps=ZipFile) as mock_zip_file:
+        infos = probe_sources(sources)
+        # the central directory is read only once for the whole batch
+        assert mock_zip_file.call_count == 1
+
+    assert infos[0].exists
+    assert infos[0].size > 0
+    assert infos[0].mtime is not None
+    assert not infos[1].exists
+    assert sources[0].info is infos[0]
+
+
+def make_sftp_attributes(filename: str, size: int, mode: int = 0o100644) -> SFTPAttributes:
+    attr = SFTPAttributes()
+    attr.filename = filename
+    attr.st_size = size
+    attr.st_mtime = 1700000000
+    attr.st_mode = mode
+    return attr
+
+
+def test_remote_file_sources_probe_batch():
+    sources = [
+        RemoteFileSource('sftp://user@example.com/data/foo.jpg'),
+        RemoteFileSource('sftp://user@example.com/data/bar.jpg'),
+        RemoteFileSource('sftp://user@example.com/data/subdir'),
+        RemoteFileSource('sftp://user@example.com/data/missing.jpg'),
+    ]
+    mock_sftp = MagicMock()
+    mock_sftp.listdir_attr.return_value = [
+        make_sftp_attributes('foo.jpg', 100),
+        make_sftp_attributes('bar.jpg', 200),
+        make_sftp_attributes('subdir', 0, mode=0o040755),
+    ]
+    sources[0]._sftp_client = mock_sftp
+
+    infos = probe_sources(sources)
+
+    # one directory listing for all the sources in the same directory
+    mock_sftp.listdir_attr.assert_called_once_with('/data')
+    assert [info.exists for info in infos] == [True, True, False, False]
+    assert infos[0].size == 100
+    assert infos[1].size == 200
+    assert infos[0].mtime == 1700000000
+
+
+def test_probe_sources_preserves_order(tmp_path):
+    (tmp_path / 'a.txt').write_text('a')
+    sources = [
+        StringSource('foo'),
+        LocalFileSource(str(tmp_path / 'a.txt')),
+        LocalFileSource(str(tmp_path / 'b.txt')),
+    ]
+    assert [info.exists for info in probe_sources(sources)] == [True, True, False]
+
+
+def test_file_group_probe(tmp_path):
+    (tmp_path / 'foo.jpg').write_text('foo')
+    file_group = FileGroup(rootname='foo', files=[
+        FileSpec(name='foo.jpg', source=LocalFileSource(str(tmp_path / 'foo.jpg'))),
+        FileSpec(name='foo.tif', source=LocalFileSource(str(tmp_path / 'foo.tif'))),
+        FileSpec(name='foo.txt'),
+    ])
+    infos = file_group.probe()
+    assert set(infos.keys()) == {'foo.jpg', 'foo.tif'}
+    assert infos['foo.jpg'].exists
+    assert not infos['foo.tif'].exists
+
+
+def test_zip_file_registry_opens_archive_once(datadir):
+    with ZipFileRegistry() as registry:
+        sources = [
+            ZipFileSource(str(datadir / 'sample.zip'), 'sample_image.jpg', registry=registry),
+            ZipFileSource(str(datadir / 'sample.zip'), 'sample_image.jpg', registry=registry),
+        ]
+        with patch('zipfile.ZipFile', wraps=ZipFile) as mock_zip_file:
+            for source in sources:
+                assert source.exists()
+                with source as stream:
+                    assert len(stream.read()) > 0
+                source.close()
+            assert mock_zip_file.call_count == 1
+        assert len(registry) == 1
+        assert str(datadir / 'sample.zip') in registry
+    assert len(registry) == 0
+
+
+def test_zip_file_registry_spools_remote_archive(datadir):
+    registry = ZipFileRegistry()
+    zip_data = (datadir / 'sample.zip').open('rb')
+    remote_source_mock = MagicMock(spec=RemoteFileSource)
+    remote_source_mock.__enter__.return_value.read.side_effect = zip_data.read
+    with patch('plastron.files.get_archive_source', return_value=remote_source_mock) as mock_get_source:
+        for _ in range(3):
+            source = ZipFileSource('sftp://user@example.com/sample.zip', 'sample_image.jpg', registry=registry)
+            assert source.exists()
+        # downloaded only once
+        assert mock_get_source.call_count == 1
+    remote_source_mock.__enter__.return_value.prefetch.assert_called_once()
+    registry.close()
+    zip_data.close()
+
+
+def test_zip_file_registry_missing_archive(tmp_path):
+    with ZipFileRegistry() as registry:
+        source = ZipFileSource(str(tmp_path / 'missing.zip'), 'foo.jpg', registry=registry)
+        with pytest.raises(BinarySourceNotFoundError):
+            source.open()
+
+
+@pytest.mark.parametrize('remote', [False, True])
+def test_zip_file_registry_invalid_archive(tmp_path, remote):
+    bad_zip = tmp_path / 'bad.zip'
+    bad_zip.write_bytes(b'not a zip file')
+    spool_dir = tmp_path / 'spool'
+    spool_dir.mkdir()
+    with ZipFileRegistry(spool_dir=str(spool_dir)) as registry:
+        if remote:
+            remote_source_mock = MagicMock(spec=RemoteFileSource)
+            remote_source_mock.__enter__.return_value.read.side_effect = bad_zip.open('rb').read
+            with patch('plastron.files.get_archive_source', return_value=remote_source_mock):
+                with pytest.raises(BinarySourceError):
+                    registry.get('sftp://user@example.com/bad.zip')
+        else:
+            with pytest.raises(BinarySourceError):
+                registry.get(str(bad_zip))
+        assert len(registry) == 0
+    # the spool file is removed
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_zip_file_registry_spools_outside_lock(datadir):
+    spooling = threading.Event()
+    finish_spooling = threading.Event()
+    zip_data = (datadir / 'sample.zip').open('rb')
+
+    def slow_read(*args):
+        spooling.set()
+        finish_spooling.wait(timeout=2)
+        return zip_data.read(*args)
+
+    remote_source_mock = MagicMock(spec=RemoteFileSource)
+    remote_source_mock.__enter__.return_value.read.side_effect = slow_read
+
+    def get_archive_source(location, _ssh_options):
+        return remote_source_mock if location.startswith('sftp:') else LocalFileSource(location)
+
+    with ZipFileRegistry() as registry, ThreadPoolExecutor(max_workers=2) as executor:
+        with patch('plastron.files.get_archive_source', side_effect=get_archive_source):
+            remote = executor.submit(registry.get, 'sftp://user@example.com/sample.zip')
+            waiting = executor.submit(registry.get, 'sftp://user@example.com/sample.zip')
+            assert spooling.wait(timeout=10)
+            # a different archive can be opened while the remote one is being spooled
+            assert registry.get(str(datadir / 'sample.zip')).namelist()
+            assert not remote.done()
+            finish_spooling.set()
+            assert remote.result() is waiting.result()
+        assert remote_source_mock.__enter__.call_count == 1
+    zip_data.close()
+
+
+def test_http_file_sources_share_session():
+    assert HTTPFileSource('http://example.com/a.jpg')._client is HTTPFileSource('http://example.com/b.jpg')._client
+
+
+@httpretty.activate
+def test_http_file_source_head_request_is_cached():
+    uri = 'http://www.example.com/test.jpg'
+    httpretty.register_uri(
+        uri=uri,
+        method=httpretty.HEAD,
+        adding_headers={'Content-Type': 'image/jpeg', 'Content-Length': '4'},
+    )
+    f = HTTPFileSource(uri)
+    assert f.exists()
+    assert f.mimetype() == 'image/jpeg'
+    assert f.probe().size == 4
+    assert len(httpretty.latest_requests()) == 1
+
+
+@httpretty.activate
+def test_http_file_source_spool_fetches_once():
+    uri = 'http://www.example.com/test.txt'
+    httpretty.register_uri(uri=uri, method=httpretty.GET, body=b'Hello world')
+    f = HTTPFileSource(uri, spool=True)
+    assert f.digest() == 'sha1=7b502c3a1f48c8609ae212cdfb639dee39673f5e'
+    with f as stream:
+        assert stream.read() == b'Hello world'
+    assert len(httpretty.latest_requests()) == 1
+
+
+@httpretty.activate
+def test_http_file_source_streams_in_chunks():
+    uri = 'http://www.example.com/test.txt'
+    httpretty.register_uri(uri=uri, method=httpretty.GET, body=b'Hello world')
+    f = HTTPFileSource(uri, chunk_size=4)
+    assert list(f.open()) == [b'Hell', b'o wo', b'rld']
+    assert f.digest() == 'sha1=7b502c3a1f48c8609ae212cdfb639dee39673f5e'
+
+
+def test_binary_resource_iter_content():
+    response = MagicMock(ok=True)
+    response.iter_content.return_value = iter([b'foo', b'bar'])
+    type(response).content = PropertyMock(side_effect=AssertionError('content must not be read into memory'))
+    resource = BinaryResource(repo=MagicMock(), path='/foo')
+    resource.repo.client.get.return_value = response
+    assert list(resource.iter_content(3)) == [b'foo', b'bar']
+    response.iter_content.assert_called_once_with(3)
+    response.close.assert_called_once()
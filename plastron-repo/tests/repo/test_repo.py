@@ -1,3 +1,10 @@
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from threading import Barrier
+from unittest.mock import MagicMock
+
 import pytest
 
 from plastron.repo import Repository, RepositoryResource, ContainerResource, Tombstone
@@ -60,3 +67,51 @@ def test_walk_include_tombstones(repository, monkeypatch_request):
     monkeypatch_request(MockGoneResponse)
     resource = next(origin.walk(include_tombstones=True))
     assert isinstance(resource, Tombstone)
+
+
+def test_transactions_are_bound_to_thread(repository, monkeypatch):
+    monkeypatch.setattr('plastron.repo.transaction', lambda *_args: nullcontext(MagicMock()))
+    base_client = repository.client
+    barrier = Barrier(3)
+
+    def run_transaction():
+        with repository.transaction() as txn_client:
+            # wait until every thread is in a transaction
+            barrier.wait()
+            return repository.client is txn_client
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert all(executor.map(lambda _: run_transaction(), range(3)))
+    assert repository.client is base_client
+    assert not repository.in_transaction
+
+
+def test_nested_transaction_joins_outer(repository, monkeypatch):
+    mock_transaction = MagicMock(return_value=nullcontext('txn_client'))
+    monkeypatch.setattr('plastron.repo.transaction', mock_transaction)
+    with repository.transaction() as outer:
+        assert repository.in_transaction
+        with repository.transaction() as inner:
+            assert inner is outer
+    assert not repository.in_transaction
+    mock_transaction.assert_called_once()
+
+
+def test_transactions_are_bound_to_repository(repository, monkeypatch):
+    monkeypatch.setattr('plastron.repo.transaction', lambda *_args: nullcontext(MagicMock()))
+    other_repository = Repository.from_url('http://localhost:8080/fcrepo/rest')
+    with repository.transaction():
+        assert repository.in_transaction
+        assert not other_repository.in_transaction
+    assert not repository.in_transaction
+
+
+def test_repository_is_not_kept_after_transaction(monkeypatch):
+    monkeypatch.setattr('plastron.repo.transaction', lambda *_args: nullcontext(MagicMock()))
+    repository = Repository.from_url('http://localhost:8080/fcrepo/rest')
+    with repository.transaction():
+        pass
+    ref = weakref.ref(repository)
+    del repository
+    gc.collect()
+    assert ref() is None
@@ -1,5 +1,7 @@
 import logging
+from pathlib import Path
 from typing import Generator, Any
+from urllib.parse import quote
 
 from plastron.context import PlastronContext
 from plastron.jobs.exportjob import ExportJob
@@ -13,16 +15,51 @@ def export(
         context: PlastronContext,
         message: PlastronCommandMessage,
 ) -> Generator[dict[str, Any], None, dict[str, Any]]:
-    ssh_key = context.config.get('COMMANDS', {}).get('EXPORT', {}).get('SSH_PRIVATE_KEY', None)
-    export_job = ExportJob(
-        context=context,
-        export_binaries=bool(strtobool(message.args.get('export-binaries', 'false'))),
-        binary_types=message.args.get('binary-types'),
-        uris=message.body.strip().split('\n'),
-        export_format=message.args.get('format', 'text/turtle'),
-        output_dest=message.args.get('output-dest'),
-        uri_template=message.args.get('uri-template'),
-        key=ssh_key,
-    )
+    config = context.config.get('COMMANDS', {}).get('EXPORT', {})
+    ssh_key = config.get('SSH_PRIVATE_KEY', None)
+    workers = int(message.args.get('workers', 1))
+    download_workers = int(message.args.get('download-workers', 1))
+    resume = bool(strtobool(message.args.get('resume', 'false')))
+    log_batch_size = int(message.args.get('log-batch-size', 1))
+    log_fsync_interval = message.args.get('log-fsync-interval')
+    if log_fsync_interval is not None:
+        log_fsync_interval = float(log_fsync_interval)
+    checkpoint = bool(strtobool(message.args.get('checkpoint', 'false')))
+    job_dir = None
+    if resume or checkpoint:
+        if message.job_id is None:
+            raise RuntimeError('Checkpointing or resuming an export requires a job id')
+        job_dir = str(Path(config.get('JOBS_DIR', 'jobs')) / quote(message.job_id, safe=''))
+
+    if resume:
+        export_job = ExportJob.resume_from(
+            context=context,
+            job_dir=job_dir,
+            key=ssh_key,
+            workers=workers,
+            download_workers=download_workers,
+            log_batch_size=log_batch_size,
+            log_fsync_interval=log_fsync_interval,
+        )
+    else:
+        compress_level = message.args.get('compress-level')
+        export_job = ExportJob(
+            context=context,
+            export_binaries=bool(strtobool(message.args.get('export-binaries', 'false'))),
+            binary_types=message.args.get('binary-types'),
+            uris=message.body.strip().split('\n'),
+            export_format=message.args.get('format', 'text/turtle'),
+            output_dest=message.args.get('output-dest'),
+            uri_template=message.args.get('uri-template'),
+            key=ssh_key,
+            workers=workers,
+            download_workers=download_workers,
+            compress_level=int(compress_level) if compress_level is not None else None,
+            previous_export=message.args.get('previous-export'),
+            skip_unchanged=bool(strtobool(message.args.get('skip-unchanged', 'false'))),
+            job_dir=job_dir,
+            log_batch_size=log_batch_size,
+            log_fsync_interval=log_fsync_interval,
+        )
     logger.info(f'Received message to initiate export job {message.job_id} containing {len(export_job.uris)} items')
     return export_job.run()
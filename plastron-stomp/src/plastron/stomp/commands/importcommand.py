@@ -1,18 +1,29 @@
 import io
 import logging
 from argparse import ArgumentTypeError
-from typing import Any, Generator, Optional
+from typing import Any, Callable, Generator, Optional
 
 from rdflib import URIRef
 
 from plastron.context import PlastronContext
 from plastron.jobs import Jobs
-from plastron.jobs.importjob import ImportConfig, ImportJob
+from plastron.jobs.importjob import SHARD_POLL_INTERVAL, SHARD_STALE_AFTER, ImportConfig, ImportJob, RetryPolicy
 from plastron.messaging.messages import PlastronCommandMessage
 from plastron.utils import datetimestamp, strtobool, uri_or_curie
 
 logger = logging.getLogger(__name__)
 
+COORDINATOR_ARGS = (
+    'shards',
+    'shard-poll-interval',
+    'shard-timeout',
+    'shard-stale-after',
+    'limit',
+    'percent',
+    'resume',
+)
+"""Arguments of a sharded import that are used by the coordinator, and not passed on to the shards."""
+
 
 def get_access_uri(access) -> Optional[URIRef]:
     if access is None:
@@ -23,6 +34,26 @@ def get_access_uri(access) -> Optional[URIRef]:
         raise RuntimeError(f'PlastronArg-access {e}')
 
 
+def shard_dispatcher(
+        context: PlastronContext,
+        job: ImportJob,
+        args: dict[str, str],
+) -> Callable[[int, ImportJob], None]:
+    """Returns a function that sends a message to run a shard of `job` to the jobs
+    queue, where it can be picked up by any plastrond instance. The message has the
+    same `args` as the coordinator's message, except for those in `COORDINATOR_ARGS`."""
+    shard_args = {k: v for k, v in args.items() if k not in COORDINATOR_ARGS}
+
+    def dispatch(number: int, shard: ImportJob):
+        context.broker['JOBS'].send(PlastronCommandMessage(
+            job_id=shard.id,
+            command='import',
+            args={**shard_args, 'shard-of': job.id, 'shard': str(number)},
+        ))
+
+    return dispatch
+
+
 def importcommand(
         context: PlastronContext,
         message: PlastronCommandMessage,
@@ -34,17 +65,55 @@ def importcommand(
     :param message:
     """
     job_id = message.job_id
+    config = context.config.get('COMMANDS', {}).get('IMPORT', {})
+    jobs = Jobs(directory=config.get('JOBS_DIR', 'jobs'))
+    message.body = message.body.encode('utf-8').decode('utf-8-sig')
 
     # per-request options that are NOT saved to the config
     limit = message.args.get('limit', None)
     if limit is not None:
         limit = int(limit)
-    message.body = message.body.encode('utf-8').decode('utf-8-sig')
     percentage = message.args.get('percent', None)
     validate_only = bool(strtobool(message.args.get('validate-only', 'false')))
     publish = bool(strtobool(message.args.get('publish', 'false')))
     resume = bool(strtobool(message.args.get('resume', 'false')))
-    import_file = io.StringIO(message.body)
+    workers = int(message.args.get('workers', 1))
+    processes = int(message.args.get('processes', 1))
+    prefetch = int(message.args.get('prefetch', 0))
+    batch_size = int(message.args.get('batch-size', 1))
+    batch_timeout = message.args.get('batch-timeout', None)
+    if batch_timeout is not None:
+        batch_timeout = float(batch_timeout)
+    retries = int(message.args.get('retries', RetryPolicy.retries))
+    retry_backoff = float(message.args.get('retry-backoff', RetryPolicy.backoff))
+    log_batch_size = int(message.args.get('log-batch-size', 1))
+    log_fsync_interval = message.args.get('log-fsync-interval', None)
+    if log_fsync_interval is not None:
+        log_fsync_interval = float(log_fsync_interval)
+    shards = int(message.args.get('shards', 1))
+    # an uploaded job already has its metadata file (and possibly binaries) in the job directory
+    uploaded = bool(strtobool(message.args.get('uploaded', 'false')))
+    import_file = None if uploaded else io.StringIO(message.body)
+
+    shard_of = message.args.get('shard-of')
+    if shard_of is not None:
+        # run one shard of a sharded import; its config and metadata are already stored
+        shard = jobs.get_job(ImportJob, job_id=shard_of).get_shard(int(message.args['shard']))
+        shard.ssh_private_key = config.get('SSH_PRIVATE_KEY', None)
+        return shard.run_shard(
+            context=context,
+            validate_only=validate_only,
+            publish=publish,
+            workers=workers,
+            processes=processes,
+            prefetch=prefetch,
+            batch_size=batch_size,
+            batch_timeout=batch_timeout,
+            retries=retries,
+            retry_backoff=retry_backoff,
+            log_batch_size=log_batch_size,
+            log_fsync_interval=log_fsync_interval,
+        )
 
     # options that are saved to the config
     job_config_args = {
@@ -58,22 +127,41 @@ def importcommand(
 
     if resume and job_id is None:
         raise RuntimeError('Resuming a job requires a job id')
+    if uploaded and job_id is None:
+        raise RuntimeError('Importing an uploaded job requires a job id')
 
     if job_id is None:
         # TODO: generate a more unique id? add in user and hostname?
         job_id = f"import-{datetimestamp()}"
 
-    config = context.config.get('COMMANDS', {}).get('IMPORT', {})
-    jobs = Jobs(directory=config.get('JOBS_DIR', 'jobs'))
-    if resume:
+    if resume or uploaded:
         job = jobs.get_job(ImportJob, job_id=job_id)
+        if uploaded and job_config_args['binaries_location'] is None and job.binaries_file.exists():
+            job_config_args['binaries_location'] = f'zip:{job.binaries_file}'
         # update the config with any changes in this request
         job.update_config(job_config_args)
+        if uploaded:
+            # the uploaded job was created with only a job id
+            job.config.save(job.config_filename)
     else:
         job = jobs.create_job(ImportJob, config=ImportConfig(**job_config_args))
 
     job.ssh_private_key = config.get('SSH_PRIVATE_KEY', None)
 
+    if shards > 1:
+        if limit is not None or percentage is not None:
+            raise RuntimeError('A sharded import cannot be combined with a limit or percentage')
+        timeout = message.args.get('shard-timeout', None)
+        return job.run_sharded(
+            shards=shards,
+            dispatch=shard_dispatcher(context, job, message.args),
+            import_file=import_file,
+            validate_only=validate_only,
+            poll_interval=float(message.args.get('shard-poll-interval', SHARD_POLL_INTERVAL)),
+            timeout=float(timeout) if timeout is not None else None,
+            stale_after=float(message.args.get('shard-stale-after', SHARD_STALE_AFTER)),
+        )
+
     return job.run(
         context=context,
         import_file=import_file,
@@ -81,4 +169,13 @@ def importcommand(
         percentage=percentage,
         validate_only=validate_only,
         publish=publish,
+        workers=workers,
+        processes=processes,
+        prefetch=prefetch,
+        batch_size=batch_size,
+        batch_timeout=batch_timeout,
+        retries=retries,
+        retry_backoff=retry_backoff,
+        log_batch_size=log_batch_size,
+        log_fsync_interval=log_fsync_interval,
     )
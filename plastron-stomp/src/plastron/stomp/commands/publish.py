@@ -16,5 +16,6 @@ def publish(
         action=PublicationAction.PUBLISH,
         force_hidden=bool(strtobool(message.args.get('hidden', 'false'))),
         force_visible=bool(strtobool(message.args.get('visible', 'false'))),
+        workers=int(message.args.get('workers', 1)),
     )
     return job.run()
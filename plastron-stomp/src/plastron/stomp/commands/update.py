@@ -27,6 +27,7 @@ def parse_message(message: PlastronCommandMessage) -> dict[str, Any]:
     model_class = get_model_from_name(model) if model else None
 
     traverse = parse_predicate_list(recursive) if recursive is not None else []
+    batch_size = message.args.get('batch-size', None)
     return {
         'uris': uris,
         'sparql_update': sparql_update,
@@ -35,6 +36,9 @@ def parse_message(message: PlastronCommandMessage) -> dict[str, Any]:
         'dry_run': bool(strtobool(message.args.get('dry-run', 'false'))),
         # Default to no transactions, due to LIBFCREPO-842
         'use_transactions': not bool(strtobool(message.args.get('no-transactions', 'true'))),
+        'workers': int(message.args.get('workers', 1)),
+        'resource_workers': int(message.args.get('resource-workers', 1)),
+        'batch_size': int(batch_size) if batch_size is not None else None,
     }
 
 
@@ -7,6 +7,7 @@ from typing import Any, Callable, Generator, Iterator
 from stomp.listener import ConnectionListener
 
 from plastron.context import PlastronContext
+from plastron.jobs.progress import PROGRESS_INTERVAL, PROGRESS_STEP, ProgressAggregator
 from plastron.messaging.broker import Destination
 from plastron.messaging.messages import MessageBox, PlastronCommandMessage, PlastronMessage, PlastronResponseMessage
 from plastron.stomp.commands import get_command_module, get_module_name
@@ -101,7 +102,11 @@ class MessageProcessor:
         self.context = context
         # cache for command instances
         self.commands = {}
-        self.result = None
+        broker_config = context.config.get('MESSAGE_BROKER', {}) if context.config else {}
+        self.aggregator = ProgressAggregator(
+            interval=float(broker_config.get('PROGRESS_INTERVAL', PROGRESS_INTERVAL)),
+            step=int(broker_config.get('PROGRESS_STEP', PROGRESS_STEP)),
+        )
 
     def __call__(self, message: PlastronCommandMessage, progress_topic: Destination):
         if message.job_id is None:
@@ -119,13 +124,22 @@ class MessageProcessor:
         if delegated_user is not None:
             logger.info(f'Running repository operations on behalf of {delegated_user}')
 
-        # run the command, and send a progress message over STOMP every time it yields
-        # the _run() delegating generator captures the final status in self.result
+        # messages are processed concurrently, so the final status of this command
+        # is kept local to this call, captured by the run() delegating generator
+        result = {}
+
+        def run(statuses: Generator[dict, None, dict]) -> Iterator[dict[str, Any]]:
+            # each progress step is passed to the loop below, and the return
+            # value from the command is stored as the result
+            result.update((yield from statuses) or {})
+
+        # run the command, and send a progress message over STOMP every time the
+        # aggregator yields a (possibly coalesced) status update
         with self.context.repo_configuration(
             delegated_user=delegated_user,
             ua_string=f'plastron/{version}',
         ) as run_context:
-            for status in self._run(command(run_context, message)):
+            for status in run(self.aggregator(command(run_context, message))):
                 progress_topic.send(
                     PlastronResponseMessage(
                         job_id=message.job_id,
@@ -136,9 +150,4 @@ class MessageProcessor:
         logger.info(f'Job {message.job_id} complete')
 
         # default message state is "Done"
-        return message.response(state=self.result.get('type', 'Done'), body=self.result)
-
-    def _run(self, command: Generator[dict, None, dict]) -> Iterator[dict[str, Any]]:
-        # delegating generator; each progress step is passed to the calling
-        # method, and the return value from the command is stored as the result
-        self.result = yield from command
+        return message.response(state=result.get('type', 'Done'), body=result)
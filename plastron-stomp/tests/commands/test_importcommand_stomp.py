@@ -40,6 +40,15 @@ def mock_repo():
                 'percentage': None,
                 'validate_only': False,
                 'publish': False,
+                'workers': 1,
+                'processes': 1,
+                'prefetch': 0,
+                'batch_size': 1,
+                'batch_timeout': None,
+                'retries': 2,
+                'retry_backoff': 5.0,
+                'log_batch_size': 1,
+                'log_fsync_interval': None,
             },
         ),
         (
@@ -50,7 +59,16 @@ def mock_repo():
                 'PlastronArg-dry-run': 'False',
                 'PlastronArg-no-transactions': 'True',
                 'PlastronArg-validate-only': 'True',
-                'PlastronArg-publish': 'True'
+                'PlastronArg-publish': 'True',
+                'PlastronArg-workers': '4',
+                'PlastronArg-processes': '2',
+                'PlastronArg-prefetch': '10',
+                'PlastronArg-batch-size': '20',
+                'PlastronArg-batch-timeout': '30',
+                'PlastronArg-retries': '5',
+                'PlastronArg-retry-backoff': '0.5',
+                'PlastronArg-log-batch-size': '100',
+                'PlastronArg-log-fsync-interval': '2',
             },
             # expected args
             {
@@ -60,6 +78,15 @@ def mock_repo():
                 'percentage': None,
                 'validate_only': True,
                 'publish': True,
+                'workers': 4,
+                'processes': 2,
+                'prefetch': 10,
+                'batch_size': 20,
+                'batch_timeout': 30.0,
+                'retries': 5,
+                'retry_backoff': 0.5,
+                'log_batch_size': 100,
+                'log_fsync_interval': 2.0,
             },
         ),
     ],
@@ -83,3 +110,92 @@ def test_publish(create_job, headers, expected_args):
 
     # Assert that the job.run method was called with correct value for publish
     mock_job.run.assert_called_with(**expected_args)
+
+
+@patch.object(Jobs, "create_job")
+def test_sharded_import(create_job):
+    mock_job = MagicMock(id='test')
+    create_job.return_value = mock_job
+    headers = {
+        'PlastronJobId': 'test',
+        'PlastronCommand': 'import',
+        'PlastronArg-shards': '3',
+        'PlastronArg-workers': '4',
+        'PlastronArg-on-behalf-of': 'jdoe',
+    }
+    message = PlastronCommandMessage(headers=headers, body='')
+    mock_context = MagicMock(spec=PlastronContext, config={'COMMANDS': {'IMPORT': {'JOBS_DIR': 'some_jobs_dir'}}})
+
+    importcommand(mock_context, message)
+
+    mock_job.run.assert_not_called()
+    kwargs = mock_job.run_sharded.call_args.kwargs
+    assert kwargs['shards'] == 3
+    assert kwargs['poll_interval'] == 5.0
+    assert kwargs['timeout'] is None
+
+    # each shard is sent to the jobs queue with the per-request options of the coordinator
+    kwargs['dispatch'](2, MagicMock(id='test/shards/2'))
+    shard_message = mock_context.broker['JOBS'].send.call_args.args[0]
+    assert shard_message.job_id == 'test/shards/2'
+    assert shard_message.command == 'import'
+    assert shard_message.args == {'workers': '4', 'on-behalf-of': 'jdoe', 'shard-of': 'test', 'shard': '2'}
+
+
+def test_sharded_import_cannot_use_limit():
+    headers = {
+        'PlastronJobId': 'test',
+        'PlastronCommand': 'import',
+        'PlastronArg-shards': '3',
+        'PlastronArg-limit': '10',
+    }
+    message = PlastronCommandMessage(headers=headers, body='')
+    mock_context = MagicMock(spec=PlastronContext, config={'COMMANDS': {'IMPORT': {'JOBS_DIR': 'some_jobs_dir'}}})
+
+    with patch.object(Jobs, "create_job"), pytest.raises(RuntimeError):
+        importcommand(mock_context, message)
+
+
+@patch.object(Jobs, "get_job")
+def test_import_shard(get_job):
+    mock_shard = MagicMock()
+    get_job.return_value.get_shard.return_value = mock_shard
+    headers = {
+        'PlastronJobId': 'test/shards/2',
+        'PlastronCommand': 'import',
+        'PlastronArg-shard-of': 'test',
+        'PlastronArg-shard': '2',
+        'PlastronArg-workers': '4',
+    }
+    message = PlastronCommandMessage(headers=headers, body='')
+    mock_context = MagicMock(spec=PlastronContext, config={'COMMANDS': {'IMPORT': {'JOBS_DIR': 'some_jobs_dir'}}})
+
+    importcommand(mock_context, message)
+
+    get_job.assert_called_once_with(ANY, job_id='test')
+    get_job.return_value.get_shard.assert_called_once_with(2)
+    assert mock_shard.run_shard.call_args.kwargs['workers'] == 4
+    assert 'import_file' not in mock_shard.run_shard.call_args.kwargs
+
+
+@patch.object(Jobs, "get_job")
+def test_import_uploaded(get_job, tmp_path):
+    mock_job = MagicMock(binaries_file=tmp_path / 'binaries.zip', config_filename=tmp_path / 'config.yml')
+    mock_job.binaries_file.write_bytes(b'PK')
+    get_job.return_value = mock_job
+    headers = {
+        'PlastronJobId': 'test',
+        'PlastronCommand': 'import',
+        'PlastronArg-uploaded': 'true',
+        'PlastronArg-model': 'Item',
+    }
+    message = PlastronCommandMessage(headers=headers, body='')
+    mock_context = MagicMock(spec=PlastronContext, config={'COMMANDS': {'IMPORT': {'JOBS_DIR': 'some_jobs_dir'}}})
+
+    importcommand(mock_context, message)
+
+    job_config_args = mock_job.update_config.call_args.args[0]
+    assert job_config_args['model'] == 'Item'
+    assert job_config_args['binaries_location'] == f'zip:{tmp_path / "binaries.zip"}'
+    mock_job.config.save.assert_called_once_with(mock_job.config_filename)
+    assert mock_job.run.call_args.kwargs['import_file'] is None
@@ -66,6 +66,9 @@ def mock_repo(client):
                 'dry_run': True,
                 # Default to no transactions, due to LIBFCREPO-842
                 'use_transactions': True,
+                'workers': 1,
+                'resource_workers': 1,
+                'batch_size': None,
             },
         ),
         (
@@ -87,6 +90,9 @@ def mock_repo(client):
                 'dry_run': False,
                 # Default to no transactions, due to LIBFCREPO-842
                 'use_transactions': True,
+                'workers': 1,
+                'resource_workers': 1,
+                'batch_size': None,
             },
         ),
         (
@@ -107,6 +113,9 @@ def mock_repo(client):
                 'dry_run': False,
                 # Default to no transactions, due to LIBFCREPO-842
                 'use_transactions': False,
+                'workers': 1,
+                'resource_workers': 1,
+                'batch_size': None,
             },
         ),
         (
@@ -125,6 +134,31 @@ def mock_repo(client):
                 'dry_run': False,
                 # Default to no transactions, due to LIBFCREPO-842
                 'use_transactions': False,
+                'workers': 1,
+                'resource_workers': 1,
+                'batch_size': None,
+            },
+        ),
+        (
+            # headers
+            {
+                'PlastronJobId': 'test',
+                'PlastronCommand': 'update',
+                'PlastronArg-workers': '4',
+                'PlastronArg-resource-workers': '2',
+                'PlastronArg-batch-size': '50',
+            },
+            # expected_args
+            {
+                'uris': ['test'],
+                'sparql_update': '',
+                'model_class': None,
+                'traverse': [],
+                'dry_run': False,
+                'use_transactions': False,
+                'workers': 4,
+                'resource_workers': 2,
+                'batch_size': 50,
             },
         ),
     ],
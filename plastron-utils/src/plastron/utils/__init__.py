@@ -3,8 +3,12 @@ import os
 import platform
 import re
 from argparse import ArgumentTypeError
+from collections import deque
+from concurrent.futures import Executor
+from contextvars import copy_context
 from datetime import datetime
-from typing import Mapping, Optional
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Mapping, Optional, TypeVar
 
 from rdflib import URIRef
 from rdflib.term import Node
@@ -174,3 +178,31 @@ def parse_predicate_list(string: str, delimiter: str = ',') -> Optional[list[Nod
         return None
     manager = namespaces.get_manager()
     return [from_n3(p, nsm=manager) for p in string.split(delimiter)]
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def ordered_map(executor: Optional[Executor], fn: Callable[[T], R], items: Iterable[T], limit: int) -> Iterator[R]:
+    """Like `executor.map()`, but it only takes items from `items` as they are needed
+    to keep at most `limit` calls in progress. If `executor` is `None`, the calls are
+    made in the current thread. Otherwise, each call runs in a copy of the current
+    context, so that it uses any transaction in progress in the current thread."""
+    if executor is None:
+        yield from map(fn, items)
+        return
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(copy_context().run, fn, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split `items` into lists of up to `size` items each."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -1,10 +1,12 @@
 import pytest
 
 from argparse import ArgumentParser, ArgumentTypeError
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
 
 from plastron.namespaces import dcterms, rdf, pcdm
 from plastron.cli import parse_data_property, parse_object_property
-from plastron.utils import uri_or_curie
+from plastron.utils import batched, ordered_map, uri_or_curie
 from rdflib.term import URIRef, Literal
 
 INVALID_URI_OR_CURIE_ARGS = [
@@ -85,3 +87,23 @@ def test_parse_data_property(p, o, expected):
 )
 def test_parse_object_property(p, o, expected):
     assert parse_object_property(p, o) == expected
+
+
+def test_ordered_map_runs_in_current_context():
+    var = ContextVar('var', default=None)
+
+    def run():
+        var.set('txn')
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return list(ordered_map(executor, lambda _: var.get(), range(4), limit=2))
+
+    assert copy_context().run(run) == ['txn'] * 4
+
+
+def test_ordered_map_without_executor():
+    assert list(ordered_map(None, str, range(3), limit=2)) == ['0', '1', '2']
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
@@ -1,13 +1,19 @@
+import base64
+import binascii
+import codecs
+import hashlib
 import importlib.metadata
 import logging
 import os
 import urllib.parse
 from argparse import Namespace
+from itertools import islice
 from pathlib import Path
+from typing import Any, IO, Optional
 
 import yaml
-from flask import Flask, url_for
-from werkzeug.exceptions import NotFound, HTTPException
+from flask import Flask, request, url_for
+from werkzeug.exceptions import BadRequest, NotFound, HTTPException
 
 from plastron.web.flask_problem import problem_detail_response
 from plastron.context import PlastronContext
@@ -20,30 +26,150 @@ __version__ = importlib.metadata.version('plastron-web')
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+"""Number of bytes of an uploaded file that are read and written at a time."""
+DIGEST_ALGORITHMS = {'sha-256': 'sha256', 'sha-512': 'sha512'}
+"""Supported `Content-Digest` algorithms, and their names in `hashlib`."""
+
 
 def job_url(job_id):
     return url_for('show_job', _external=True, job_id=job_id)
 
 
-def items(log):
+def items(log, count: Optional[int] = None, page: int = 1, per_page: int = DEFAULT_PAGE_SIZE) -> dict[str, Any]:
+    """The total `count` of items in `log` (counting them if it is not given), and
+    the items on the given page. Only the log rows up to the end of that page are read."""
+    start = (page - 1) * per_page
     return {
-        'count': len(log),
-        'items': [c for c in log]
+        'count': len(log) if count is None else count,
+        'items': list(islice(log, start, start + per_page)),
     }
 
 
-def latest_dropped_items(job: ImportJob):
+def latest_dropped_items(
+        job: ImportJob,
+        summary: Optional[dict[str, Any]] = None,
+        page: int = 1,
+        per_page: int = DEFAULT_PAGE_SIZE,
+) -> dict[str, Any]:
     latest_run = job.latest_run()
     if latest_run is None:
         return {}
 
+    # the counts in the summary are only for the dropped items of the latest run
+    counts = summary.get('count', {}) if summary and summary.get('run') == latest_run.timestamp else {}
     return {
         'timestamp': latest_run.timestamp,
-        'failed': items(latest_run.failed_items),
-        'invalid': items(latest_run.invalid_items)
+        # rows that could not be read or processed, and rows that failed to import,
+        # are both logged as failed
+        'failed': items(
+            latest_run.failed_items,
+            counts.get('errors', 0) + counts.get('items_with_errors', 0) if counts else None,
+            page,
+            per_page,
+        ),
+        'invalid': items(latest_run.invalid_items, counts.get('invalid_items'), page, per_page),
     }
 
 
+def latest_timings(job: ImportJob) -> Optional[dict[str, Any]]:
+    latest_run = job.latest_run()
+    if latest_run is None:
+        return None
+
+    return latest_run.timings
+
+
+def get_int_arg(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        raise BadRequest(f'Parameter "{name}" must be an integer')
+    if value < minimum:
+        raise BadRequest(f'Parameter "{name}" must be at least {minimum}')
+    return value
+
+
+def sort_summaries(summaries: list[dict], sort: str) -> list[dict]:
+    """Sort the job summaries by the given field name; a leading "-" sorts in
+    descending order. Summaries without a value for that field always sort last."""
+    reverse = sort.startswith('-')
+    field = sort.lstrip('-')
+    present = [s for s in summaries if s.get(field) is not None]
+    missing = [s for s in summaries if s.get(field) is None]
+    try:
+        present.sort(key=lambda s: s[field], reverse=reverse)
+    except TypeError:
+        present.sort(key=lambda s: str(s[field]), reverse=reverse)
+    return present + missing
+
+
+def parse_content_digest(header: str) -> dict[str, bytes]:
+    """Parse a `Content-Digest` header ([RFC 9530](https://www.rfc-editor.org/rfc/rfc9530))
+    into a dictionary of algorithm names and digest values."""
+    digests = {}
+    for member in header.split(','):
+        algorithm, _, value = member.strip().partition('=')
+        if len(value) < 2 or not (value.startswith(':') and value.endswith(':')):
+            raise BadRequest(f'Invalid Content-Digest header: {header}')
+        try:
+            digests[algorithm.lower()] = base64.b64decode(value[1:-1], validate=True)
+        except binascii.Error:
+            raise BadRequest(f'Invalid Content-Digest header: {header}')
+    return digests
+
+
+def save_upload(
+        stream: IO[bytes],
+        filename: Path,
+        expected_digests: dict[str, bytes],
+        strip_bom: bool = False,
+) -> dict[str, Any]:
+    """Copy the uploaded `stream` to `filename`, one chunk at a time, computing its
+    SHA-256 digest (and any other digests in `expected_digests`) along the way. The
+    upload is written to a temporary file, which only replaces `filename` if its
+    digests match the expected digests.
+
+    If `strip_bom` is true, a leading UTF-8 byte order mark is not written to
+    `filename`. The size and digests are always those of the bytes as uploaded."""
+    algorithms = [algorithm for algorithm in expected_digests if algorithm in DIGEST_ALGORITHMS]
+    if expected_digests and not algorithms:
+        raise BadRequest(f'Content-Digest must use one of these algorithms: {", ".join(DIGEST_ALGORITHMS)}')
+    hashes = {algorithm: hashlib.new(DIGEST_ALGORITHMS[algorithm]) for algorithm in {'sha-256', *algorithms}}
+
+    size = 0
+    # bytes held back until we know whether they start with a BOM
+    head = b'' if strip_bom else None
+    tmp_file = filename.with_name(f'.{filename.name}.upload')
+    try:
+        with tmp_file.open(mode='wb') as fh:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                for digest in hashes.values():
+                    digest.update(chunk)
+                if head is not None:
+                    head += chunk
+                    if len(head) < len(codecs.BOM_UTF8) and codecs.BOM_UTF8.startswith(head):
+                        continue
+                    chunk = head.removeprefix(codecs.BOM_UTF8)
+                    head = None
+                fh.write(chunk)
+            if head:
+                fh.write(head)
+        for algorithm in algorithms:
+            if hashes[algorithm].digest() != expected_digests[algorithm]:
+                raise BadRequest(f'Uploaded file does not match its {algorithm} Content-Digest')
+        os.replace(tmp_file, filename)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+    sha256 = base64.b64encode(hashes['sha-256'].digest()).decode()
+    logger.info(f'Saved upload of {size} bytes to {filename}')
+    return {'size': size, 'digest': f'sha-256=:{sha256}:'}
+
+
 def create_app(config_file: str):
     app = Flask(__name__)
     with open(config_file, "r") as stream:
@@ -64,11 +190,27 @@ def create_app(config_file: str):
 
     @app.route('/jobs')
     def list_jobs():
+        page = get_int_arg('page', 1)
+        per_page = min(get_int_arg('per_page', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
         if not jobs_dir.exists():
             logger.warning(f'Jobs directory "{jobs_dir.absolute()}" does not exist; returning empty list')
-            return {'jobs': []}
-        job_ids = sorted(f.name for f in jobs_dir.iterdir() if f.is_dir())
-        return {'jobs': [{'@id': job_url(job_id), 'job_id': job_id} for job_id in job_ids]}
+            return {'jobs': [], 'page': page, 'per_page': per_page, 'total': 0}
+
+        # the listing is built from each job's summary file, so it never has
+        # to open the (potentially large) job logs or metadata files
+        summaries = jobs.summaries()
+        if 'state' in request.args:
+            summaries = [s for s in summaries if s.get('state') == request.args['state']]
+        if 'sort' in request.args:
+            summaries = sort_summaries(summaries, request.args['sort'])
+
+        start = (page - 1) * per_page
+        return {
+            'jobs': [{'@id': job_url(s['job_id']), **s} for s in summaries[start:start + per_page]],
+            'page': page,
+            'per_page': per_page,
+            'total': len(summaries),
+        }
 
     @app.route('/jobs/<path:job_id>')
     def show_job(job_id):
@@ -83,18 +225,51 @@ def create_app(config_file: str):
             # TODO: more complete information in the response body?
             raise NotFound
 
+        page = get_int_arg('page', 1)
+        per_page = min(get_int_arg('per_page', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
         try:
+            # counts come from the summary file when the job has one, and the
+            # completed and dropped item lists are paged, so that a large job
+            # does not have to be read in full
+            summary = job.load_summary() or {}
             return {
                 '@id': job_url(job_id),
                 **vars(job.config),
                 'runs': job.runs,
-                'completed': items(job.completed_log),
-                'dropped': latest_dropped_items(job),
-                'total': job.get_metadata().total
+                'completed': items(job.completed_log, summary.get('completed'), page, per_page),
+                'dropped': latest_dropped_items(job, summary, page, per_page),
+                'timings': latest_timings(job),
+                'total': summary['total'] if 'total' in summary else job.get_metadata().total,
+                'state': summary.get('state'),
+                'page': page,
+                'per_page': per_page,
             }
         except JobError as e:
             raise NotFound from e
 
+    @app.route('/jobs/<path:job_id>/<any(source, binaries):name>', methods=['PUT'])
+    def upload_job_file(job_id, name):
+        """Stream the metadata CSV file (`source`) or ZIP file of binaries (`binaries`)
+        of an import job into the job directory, creating the job if it does not exist."""
+        expected_digests = {}
+        if 'Content-Digest' in request.headers:
+            expected_digests = parse_content_digest(request.headers['Content-Digest'])
+        try:
+            job = get_job(job_id)
+            created = False
+        except JobNotFoundError:
+            job = jobs.create_job(ImportJob, job_id=urllib.parse.unquote(job_id))
+            created = True
+        except JobConfigError:
+            logger.warning(f'Cannot open config file for job {job_id}')
+            raise NotFound
+
+        filename = job.metadata_file if name == 'source' else job.binaries_file
+        # spreadsheet programs often save CSV files with a BOM, which would otherwise
+        # end up as part of the first column header
+        upload = save_upload(request.stream, filename, expected_digests, strip_bom=(name == 'source'))
+        return {'@id': job_url(job_id), 'file': filename.name, **upload}, 201 if created else 200
+
     app.register_error_handler(HTTPException, problem_detail_response)
 
     return app
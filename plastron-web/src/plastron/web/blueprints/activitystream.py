@@ -1,10 +1,12 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 from flask import Blueprint, current_app, jsonify, request
 from rdflib import Graph
 
+from plastron.handles import HandleError
 from plastron.namespaces import activitystreams, rdf, umdact
 from plastron.repo.publish import PublishableResource
 
@@ -12,13 +14,18 @@ logger = logging.getLogger(__name__)
 
 blueprint = Blueprint('activitystream', __name__, template_folder='templates')
 
+PUBLICATION_WORKERS = 4
+"""Default number of resources in an activity that are published or unpublished at once."""
+
 
 @blueprint.route('/inbox', methods=['POST'])
 def new_activity():
     try:
         activity = Activity(from_json=request.get_json())
         ctx = current_app.config['CONTEXT']
-        for uri in activity.objects:
+        workers = int(ctx.config.get('PUBLICATION_WORKFLOW', {}).get('WORKERS', PUBLICATION_WORKERS))
+
+        def process(uri: str):
             resource: PublishableResource = ctx.repo[uri:PublishableResource].read()
             if activity.publish:
                 resource.publish(
@@ -32,6 +39,18 @@ def new_activity():
                     force_hidden=activity.force_hidden,
                     force_visible=False,
                 )
+
+        # create the shared connections before starting any worker threads
+        _ = ctx.repo
+        if activity.publish:
+            try:
+                ctx.handle_client.find_handles(activity.objects)
+            except HandleError as e:
+                # each resource looks up its own handle again when it is published
+                logger.warning(f'Unable to look up handles for {len(activity.objects)} resource(s): {e}')
+        with ThreadPoolExecutor(max_workers=max(min(workers, len(activity.objects)), 1)) as executor:
+            # re-raises the first exception, if any
+            list(executor.map(process, activity.objects))
         return {}, 201
     except ValidationError as e:
         logger.error(f'Exception: {e}')
@@ -1,5 +1,12 @@
+import base64
+import codecs
+import hashlib
+import io
+from unittest.mock import patch
+
 import pytest
 
+from plastron.jobs import ItemLog
 from plastron.web import create_app
 
 
@@ -63,6 +70,7 @@ def test_valid_job(app_client):
     assert len(data['dropped']) == 0
     assert 'runs' in data
     assert len(data['runs']) == 0
+    assert data['timings'] is None
     assert data['access'] is None
     assert data['binaries_location'] == 'data'
     assert data['container'] == '/dc/2021/2'
@@ -90,6 +98,8 @@ def test_valid_completed_job(app_client):
     assert 'runs' in data
     assert len(data['runs']) == 1
     assert data['runs'][0] == '20210505143008'
+    assert data['timings']['create_resource']['total'] == 4.5
+    assert data['timings']['create_resource']['slowest'][0]['item'] == 'source.csv:4'
     assert data['access'] is None
     assert data['binaries_location'] == 'data'
     assert data['container'] == '/dc/2021/2'
@@ -97,3 +107,152 @@ def test_valid_completed_job(app_client):
     assert data['member_of'] == 'https://fcrepo.lib.umd.edu/fcrepo/rest/dc/2021/2'
     assert data['model'] == 'Item'
     assert data['total'] == 9
+
+
+def test_valid_completed_job_pagination(app_client):
+    client = app_client('jobs')
+    data = client.get('/jobs/validcompletedjob?per_page=4&page=3').get_json()
+    assert data['page'] == 3
+    assert data['per_page'] == 4
+    assert data['completed']['count'] == 9
+    assert len(data['completed']['items']) == 1
+    assert data['dropped']['failed'] == {'count': 0, 'items': []}
+
+    response = client.get('/jobs/validcompletedjob?per_page=0')
+    assert response.status_code == 400
+
+
+def test_job_counts_from_summary(app_client):
+    client = app_client('jobswithsummaries')
+    # the completed log is not read in full to count or page the items
+    with patch.object(ItemLog, '_load_keys', side_effect=AssertionError('completed log was read in full')):
+        response = client.get('/jobs/import-b?per_page=2')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['completed']['count'] == 20
+    assert [item['id'] for item in data['completed']['items']] == ['item-1', 'item-2']
+    assert data['total'] == 25
+    assert data['state'] == 'import_incomplete'
+
+
+def test_job_failed_count_includes_import_failures(app_client):
+    data = app_client('jobswithdropped').get('/jobs/import-failed').get_json()
+    # one row that caused an error, and two rows that failed to import
+    assert data['dropped']['failed']['count'] == 3
+    assert len(data['dropped']['failed']['items']) == 3
+    assert data['dropped']['invalid'] == {'count': 0, 'items': []}
+
+
+def test_jobs_listing_includes_summaries(app_client):
+    response = app_client('jobswithsummaries').get('/jobs')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total'] == 4
+    assert data['page'] == 1
+    assert [job['job_id'] for job in data['jobs']] == ['import-a', 'import-b', 'import-c', 'import-d']
+    assert data['jobs'][1]['state'] == 'import_incomplete'
+    assert data['jobs'][1]['completed'] == 20
+    # job without a summary file
+    assert 'state' not in data['jobs'][3]
+
+
+def test_jobs_listing_pagination(app_client):
+    client = app_client('jobswithsummaries')
+    data = client.get('/jobs?per_page=3').get_json()
+    assert data['total'] == 4
+    assert [job['job_id'] for job in data['jobs']] == ['import-a', 'import-b', 'import-c']
+    data = client.get('/jobs?per_page=3&page=2').get_json()
+    assert [job['job_id'] for job in data['jobs']] == ['import-d']
+    data = client.get('/jobs?per_page=3&page=3').get_json()
+    assert data['jobs'] == []
+
+
+@pytest.mark.parametrize(
+    ('sort', 'expected_ids'),
+    [
+        ('run', ['import-a', 'import-c', 'import-b', 'import-d']),
+        ('-run', ['import-b', 'import-c', 'import-a', 'import-d']),
+        ('-total', ['import-b', 'import-a', 'import-c', 'import-d']),
+    ]
+)
+def test_jobs_listing_sort(app_client, sort, expected_ids):
+    data = app_client('jobswithsummaries').get(f'/jobs?sort={sort}').get_json()
+    assert [job['job_id'] for job in data['jobs']] == expected_ids
+
+
+def test_jobs_listing_filter_by_state(app_client):
+    data = app_client('jobswithsummaries').get('/jobs?state=import_complete').get_json()
+    assert data['total'] == 2
+    assert [job['job_id'] for job in data['jobs']] == ['import-a', 'import-c']
+
+
+@pytest.mark.parametrize('query', ['page=0', 'page=foo', 'per_page=-1'])
+def test_jobs_listing_bad_parameters(app_client, query):
+    response = app_client('jobswithsummaries').get(f'/jobs?{query}')
+    assert response.status_code == 400
+
+
+def content_digest(data: bytes, algorithm: str = 'sha256') -> str:
+    return f"{algorithm.replace('sha', 'sha-')}=:{base64.b64encode(hashlib.new(algorithm, data).digest()).decode()}:"
+
+
+@pytest.mark.parametrize('algorithm', ['sha256', 'sha512'])
+def test_upload_source_creates_job(app_client, datadir, algorithm):
+    data = b'Identifier,Title\nfoo,Foo\n' * 1000
+    client = app_client('jobsempty')
+    response = client.put(
+        '/jobs/uploaded-job/source',
+        data=io.BytesIO(data),
+        headers={'Content-Digest': content_digest(data, algorithm)},
+    )
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['file'] == 'source.csv'
+    assert body['size'] == len(data)
+    assert body['digest'] == content_digest(data)
+    job_dir = datadir / 'jobsempty' / 'uploaded-job'
+    assert (job_dir / 'source.csv').read_bytes() == data
+    assert (job_dir / 'config.yml').exists()
+
+    # uploading to an existing job replaces the file
+    response = client.put('/jobs/uploaded-job/binaries', data=io.BytesIO(b'PK'))
+    assert response.status_code == 200
+    assert (job_dir / 'binaries.zip').read_bytes() == b'PK'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 1024])
+def test_upload_source_strips_bom(app_client, datadir, monkeypatch, chunk_size):
+    monkeypatch.setattr('plastron.web.UPLOAD_CHUNK_SIZE', chunk_size)
+    data = b'Identifier,Title\nfoo,Foo\n'
+    response = app_client('jobsempty').put(
+        '/jobs/bom-job/source',
+        data=io.BytesIO(codecs.BOM_UTF8 + data),
+        headers={'Content-Digest': content_digest(codecs.BOM_UTF8 + data)},
+    )
+    assert response.status_code == 201
+    body = response.get_json()
+    # size and digest are of the file as uploaded
+    assert body['size'] == len(codecs.BOM_UTF8 + data)
+    assert body['digest'] == content_digest(codecs.BOM_UTF8 + data)
+    assert (datadir / 'jobsempty' / 'bom-job' / 'source.csv').read_bytes() == data
+
+
+@pytest.mark.parametrize(
+    'digest',
+    [
+        content_digest(b'something else'),
+        'sha-256=not-base64',
+        'md5=:rL0Y20zC+Fzt72VPzMSk2A==:',
+    ]
+)
+def test_upload_source_bad_digest(app_client, datadir, digest):
+    response = app_client('jobs').put(
+        '/jobs/validjob/source',
+        data=io.BytesIO(b'Identifier,Title\n'),
+        headers={'Content-Digest': digest},
+    )
+    assert response.status_code == 400
+    assert response.content_type == 'application/problem+json'
+    # the existing metadata file is not replaced
+    assert (datadir / 'jobs' / 'validjob' / 'source.csv').read_bytes() != b'Identifier,Title\n'
+    assert not (datadir / 'jobs' / 'validjob' / '.source.csv.upload').exists()